@@ -17,32 +17,91 @@ ROTAS:
     - /cadastro : Registro de novo usuário
     - /dashboard : Painel principal do usuário
     - /api/tarefas : CRUD de tarefas (GET, POST, PUT, DELETE)
+    - /api/estatisticas : Totais de tarefas do usuário
+    - /api/exportar : Download de relatório em streaming
+    - /api/exportacoes : Exportações em segundo plano (enviar, situação, arquivo)
+    - /api/relatorios/cache : Contadores do cache de relatórios
+    - /api/tendencias : Tarefas criadas/concluídas/atrasadas por dia ou semana
     - /api/relatorios : Geração de relatórios
     - /logout : Encerrar sessão
+
+USUÁRIO DA REQUISIÇÃO:
+    Cada rota passa o usuário da SUA sessão (_usuario_da_sessao()) para
+    as funções de tarefas.py; nada depende da variável global
+    usuarios.USUARIO_LOGADO (que é da linha de comando). Por isso o
+    servidor pode atender várias requisições ao mesmo tempo: threaded=True
+    no servidor de desenvolvimento ou vários workers/threads no gunicorn
+    (ex: gunicorn -w 4 --threads 8 app:app).
+
+GET CONDICIONAL (ETag / Last-Modified):
+    O painel, os relatórios e as leituras da API (/api/tarefas,
+    /api/tarefas/busca, /api/estatisticas, /api/tendencias) respondem com
+    ETag e Last-Modified (decorador _get_condicional). Se o cliente manda
+    If-None-Match com a ETag atual, a resposta é 304 sem corpo, e nada é
+    consultado nem renderizado: um cliente que consulta de tempos em
+    tempos quase não custa nada enquanto as tarefas dele não mudam.
+    A ETag vem da etiqueta das tarefas do usuário (utils/arquivos.py:
+    etiqueta_dados()), que é a mesma em todos os workers e não muda com
+    alterações de outros usuários.
+
+ARQUIVOS ESTÁTICOS (utils/estaticos.py):
+    url_for('static', filename='style.css') gera o nome com o hash do
+    conteúdo ('style.3f2a9c1b0d.css'), servido com cache imutável de 1 ano
+    e já comprimido com gzip para quem aceitar. Tudo é preparado em
+    memória quando o servidor inicia; não há etapa de build.
 ================================================================================
 """
 
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify
-from datetime import datetime
+from flask import (Flask, Response, abort, render_template, request, redirect, url_for, session,
+                   jsonify, make_response, send_file, stream_with_context)
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import is_resource_modified
+from datetime import datetime, timezone
+from functools import wraps
+import hashlib
 import os
 
 # Importa módulos existentes do sistema
-from usuarios import (
-    cadastrar_usuario, autenticar_usuario, logout, 
-    get_usuario_logado, USUARIO_LOGADO
-)
+from usuarios import cadastrar_usuario, verificar_credenciais
 from tarefas import (
-    criar_tarefa, listar_tarefas, editar_tarefa, 
-    concluir_tarefa, excluir_tarefa, _carregar_tarefas, _encontrar_tarefa
+    criar_tarefa, listar_tarefas, listar_pagina_tarefas, buscar_tarefas, editar_tarefa, 
+    concluir_tarefa, excluir_tarefa,
+    ORDENS, ORDEM_PADRAO, FILTROS_STATUS
 )
 from relatorios import (
-    tarefas_concluidas, tarefas_pendentes, tarefas_atrasadas
+    iterar_relatorio, relatorio, estatisticas_usuario, estatisticas_cache_relatorios,
+    tendencias, TIPOS_RELATORIO
+)
+from exportacoes import (
+    FORMATOS_EXPORTACAO, partes_exportacao, enviar_exportacao,
+    situacao_exportacao, arquivo_exportacao, SITUACAO_CONCLUIDA
 )
-import usuarios
+from utils.arquivos import ARQUIVO_TAREFAS, etiqueta_dados, modificacao_dados
+from utils.datas import ordinal_hoje
+from utils.estaticos import CACHE_IMUTAVEL, carregar_estaticos, nome_versionado, obter_estatico
+from utils.modelos import Tarefa, para_json
+from utils.paginacao import tamanho_da_pagina
+
 
-app = Flask(__name__)
+class ProvedorJSON(DefaultJSONProvider):
+    """Permite que jsonify() receba Tarefa/Usuario (utils/modelos.py)"""
+    
+    @staticmethod
+    def default(o):
+        try:
+            return para_json(o)
+        except TypeError:
+            return DefaultJSONProvider.default(o)
+
+
+# static_folder=None: a rota /static é a própria (ver estatico())
+app = Flask(__name__, static_folder=None)
+app.json = ProvedorJSON(app)
 app.secret_key = 'taskflow-secret-key-2025'  # Chave para sessões
 
+PASTA_ESTATICOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+carregar_estaticos(PASTA_ESTATICOS)
+
 # ==================== FILTROS PERSONALIZADOS ====================
 
 @app.template_filter('format_date')
@@ -55,8 +114,11 @@ def format_date(date_string):
         return date_string
 
 @app.template_filter('is_overdue')
-def is_overdue(prazo, status):
-    """Verifica se tarefa está atrasada"""
+def is_overdue(prazo, status=None):
+    """Verifica se tarefa está atrasada (recebe a tarefa ou o texto do prazo)"""
+    if isinstance(prazo, Tarefa):
+        # Prazo já convertido na leitura: só compara números
+        return prazo.status != 'Concluída' and prazo.prazo_vencido(ordinal_hoje())
     if status == 'Concluída':
         return False
     try:
@@ -66,6 +128,109 @@ def is_overdue(prazo, status):
     except:
         return False
 
+# ==================== GET CONDICIONAL ====================
+
+def _versao_aplicacao():
+    """
+    Hash do código que gera as respostas (.py e templates), que entra na
+    ETag: depois de uma atualização do sistema, as páginas guardadas pelos
+    navegadores deixam de valer mesmo que as tarefas não tenham mudado.
+    Calculado do conteúdo, então é o mesmo em todos os workers.
+    """
+    raiz = os.path.dirname(os.path.abspath(__file__))
+    resumo = hashlib.blake2b(digest_size=8)
+    for pasta in (raiz, os.path.join(raiz, 'utils'), os.path.join(raiz, 'templates')):
+        for nome in sorted(os.listdir(pasta)):
+            if nome.endswith(('.py', '.html')):
+                with open(os.path.join(pasta, nome), 'rb') as f:
+                    resumo.update(f.read())
+    return resumo.hexdigest()
+
+VERSAO_APLICACAO = _versao_aplicacao()
+
+def validadores(usuario, url):
+    """
+    ETag e Last-Modified de uma leitura do usuário.
+    
+    PARÂMETROS:
+        usuario (dict): Usuário da sessão (ver _usuario_da_sessao())
+        url (str): Caminho + '?' + parâmetros, como request.full_path
+    
+    A ETag muda quando muda qualquer coisa que entra na resposta: as
+    tarefas do usuário (etiqueta_dados), o dia (tarefas atrasadas), a URL
+    com os parâmetros, o nome na sessão e o código do sistema.
+    Last-Modified é a última gravação dos dados (ou a meia-noite de hoje,
+    se for mais recente), em segundos inteiros, como vai no cabeçalho.
+    Também usada pela API assíncrona (asgi.py): as ETags são as mesmas.
+    """
+    usuario_id = usuario['id']
+    chave = '|'.join(map(str, (VERSAO_APLICACAO, etiqueta_dados(ARQUIVO_TAREFAS, usuario_id),
+                               ordinal_hoje(), url, usuario_id,
+                               usuario['nome'], usuario['login'])))
+    etag = hashlib.blake2b(chave.encode('utf-8'), digest_size=16).hexdigest()
+    meia_noite = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+    modificacao = max(modificacao_dados(ARQUIVO_TAREFAS, usuario_id), meia_noite)
+    return etag, datetime.fromtimestamp(int(modificacao), timezone.utc)
+
+def _get_condicional(view):
+    """
+    Decorador das rotas de leitura: responde 304 (sem chamar a rota) se o
+    cliente já tem a versão atual, e marca as respostas 200 com ETag,
+    Last-Modified e Cache-Control: no-cache (o navegador guarda, mas
+    sempre confirma antes de usar).
+    
+    Sem usuário logado a rota é chamada normalmente (redireciona ou
+    responde 401).
+    """
+    @wraps(view)
+    def get_condicional(*args, **kwargs):
+        if 'user_id' not in session:
+            return view(*args, **kwargs)
+        etag, ultima_modificacao = validadores(_usuario_da_sessao(), request.full_path)
+        if not is_resource_modified(request.environ, etag=etag, last_modified=ultima_modificacao):
+            response = Response(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        response.last_modified = ultima_modificacao
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.vary.add('Cookie')
+        return response
+    return get_condicional
+
+# ==================== ARQUIVOS ESTÁTICOS ====================
+
+@app.url_defaults
+def _versionar_estaticos(endpoint, values):
+    """url_for('static', filename=...) -> nome com o hash do conteúdo"""
+    if endpoint == 'static' and 'filename' in values:
+        values['filename'] = nome_versionado(PASTA_ESTATICOS, values['filename'])
+
+@app.route('/static/<path:filename>', endpoint='static')
+def estatico(filename):
+    """
+    Arquivo estático: pelo nome versionado (cache imutável) ou pelo
+    original (o navegador confirma a ETag a cada uso), em gzip se o
+    cliente aceitar
+    """
+    arquivo = obter_estatico(PASTA_ESTATICOS, filename)
+    if arquivo is None:
+        abort(404)
+    usar_gzip = arquivo['gzip'] is not None and request.accept_encodings['gzip'] > 0
+    response = Response(arquivo['gzip'] if usar_gzip else arquivo['conteudo'],
+                        mimetype=arquivo['tipo'])
+    if arquivo['gzip'] is not None:
+        response.vary.add('Accept-Encoding')
+    if usar_gzip:
+        response.content_encoding = 'gzip'
+    # Cada codificação é uma representação diferente: ETags diferentes
+    response.set_etag(arquivo['etag'] + ('-gzip' if usar_gzip else ''))
+    response.last_modified = int(arquivo['modificacao'])
+    response.headers['Cache-Control'] = CACHE_IMUTAVEL if arquivo['versionado'] else 'public, no-cache'
+    return response.make_conditional(request)
+
 # ==================== ROTAS DE PÁGINAS ====================
 
 @app.route('/')
@@ -82,16 +247,14 @@ def login():
         login_input = request.form.get('login')
         senha = request.form.get('senha')
         
-        # Autentica usando módulo existente
-        usuario = autenticar_usuario(login_input, senha)
+        # Confere as credenciais sem tocar no usuário global da linha de comando
+        usuario = verificar_credenciais(login_input, senha)
         
         if usuario:
             # Salva na sessão do Flask
             session['user_id'] = usuario['id']
             session['user_nome'] = usuario['nome']
             session['user_login'] = usuario['login']
-            # Atualiza variável global para compatibilidade
-            usuarios.USUARIO_LOGADO = usuario
             return redirect(url_for('dashboard'))
         else:
             return render_template('login.html', erro='Login ou senha inválidos')
@@ -116,79 +279,55 @@ def cadastro():
     return render_template('cadastro.html')
 
 @app.route('/dashboard')
+@_get_condicional
 def dashboard():
     """Painel principal do usuário - requer autenticação"""
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    # Sincroniza USUARIO_LOGADO para compatibilidade
-    if not usuarios.USUARIO_LOGADO or usuarios.USUARIO_LOGADO['id'] != session['user_id']:
-        usuarios.USUARIO_LOGADO = {
-            'id': session['user_id'],
-            'nome': session['user_nome'],
-            'login': session['user_login']
-        }
-    
-    # Carrega tarefas do usuário
-    tarefas = listar_tarefas(filtrar_por_responsavel=True)
-    
-    # Estatísticas
-    total = len(tarefas)
-    concluidas = len([t for t in tarefas if t['status'] == 'Concluída'])
-    pendentes = len([t for t in tarefas if t['status'] == 'Pendente'])
-    
-    # Calcula atrasadas
-    atrasadas = 0
-    hoje = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    for t in tarefas:
-        if t['status'] == 'Pendente':
-            try:
-                prazo_dt = datetime.strptime(t['prazo'], '%d/%m/%Y')
-                if prazo_dt < hoje:
-                    atrasadas += 1
-            except:
-                pass
+    # Ordenação e filtro vêm da URL; valores desconhecidos voltam ao padrão
+    ordem, status = _ordem_e_status()
+    if ordem not in ORDENS:
+        ordem = ORDEM_PADRAO
+    if status not in FILTROS_STATUS:
+        status = None
     
+    # Carrega só a primeira página; as demais vêm de /api/tarefas ("Carregar mais")
+    tarefas, proximo_cursor = listar_pagina_tarefas(ordem=ordem, status=status,
+                                                    usuario=_usuario_da_sessao())
+    
+    # Estatísticas: contadores mantidos pelo armazenamento (O(1))
     return render_template('dashboard.html', 
                          tarefas=tarefas,
-                         stats={
-                             'total': total,
-                             'concluidas': concluidas,
-                             'pendentes': pendentes,
-                             'atrasadas': atrasadas
-                         })
+                         proximo_cursor=proximo_cursor,
+                         ordem=ordem,
+                         status=status or 'all',
+                         stats=estatisticas_usuario(session['user_id']))
 
 @app.route('/relatorios')
+@_get_condicional
 def relatorios():
     """Página de relatórios"""
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    # Sincroniza USUARIO_LOGADO
-    if not usuarios.USUARIO_LOGADO or usuarios.USUARIO_LOGADO['id'] != session['user_id']:
-        usuarios.USUARIO_LOGADO = {
-            'id': session['user_id'],
-            'nome': session['user_nome'],
-            'login': session['user_login']
-        }
-    
     tipo = request.args.get('tipo', 'concluidas')
+    periodo = _periodo_da_requisicao()
     
-    if tipo == 'concluidas':
-        todas = tarefas_concluidas()
-    elif tipo == 'pendentes':
-        todas = tarefas_pendentes()
-    elif tipo == 'atrasadas':
-        todas = tarefas_atrasadas()
-    else:
-        todas = []
-    
-    # Filtra apenas tarefas do usuário logado
-    tarefas_filtradas = [t for t in todas if t['responsavel_id'] == session['user_id']]
+    # Apenas tarefas do usuário logado: o filtro vai para dentro da consulta
+    # (e o resultado fica em cache até alguma tarefa dele mudar)
+    try:
+        tarefas_filtradas = relatorio(tipo, responsavel_id=session['user_id'],
+                                      prazo_de=periodo.get('de'),
+                                      prazo_ate=periodo.get('ate')) or []
+    except ValueError as e:
+        return render_template('relatorios.html', tarefas=[], tipo=tipo,
+                               periodo=periodo, erro=str(e))
     
     return render_template('relatorios.html', 
                          tarefas=tarefas_filtradas,
-                         tipo=tipo)
+                         tipo=tipo,
+                         periodo=periodo)
 
 @app.route('/perfil')
 def perfil():
@@ -211,7 +350,8 @@ def api_atualizar_perfil():
     if 'user_id' not in session:
         return jsonify({'erro': 'Não autenticado'}), 401
     
-    from usuarios import _carregar_usuarios, _salvar_usuarios
+    from usuarios import get_usuario_por_id
+    from utils.arquivos import atualizar_registro, ARQUIVO_USUARIOS
     
     data = request.get_json()
     nome = data.get('nome')
@@ -220,17 +360,13 @@ def api_atualizar_perfil():
     if not nome or not email:
         return jsonify({'erro': 'Nome e email são obrigatórios'}), 400
     
-    usuarios_list = _carregar_usuarios()
-    usuario = next((u for u in usuarios_list if u['id'] == session['user_id']), None)
+    usuario = get_usuario_por_id(session['user_id'])
     
     if not usuario:
         return jsonify({'erro': 'Usuário não encontrado'}), 404
     
     # Atualiza dados
-    usuario['nome'] = nome
-    usuario['email'] = email
-    
-    if _salvar_usuarios(usuarios_list):
+    if atualizar_registro(ARQUIVO_USUARIOS, usuario['id'], {'nome': nome, 'email': email}):
         # Atualiza sessão
         session['user_nome'] = nome
         return jsonify({'sucesso': True, 'mensagem': 'Perfil atualizado'})
@@ -240,28 +376,106 @@ def api_atualizar_perfil():
 @app.route('/logout')
 def logout_route():
     """Encerra sessão do usuário"""
-    logout()
     session.clear()
     return redirect(url_for('login'))
 
 # ==================== API REST (JSON) ====================
 
 @app.route('/api/tarefas', methods=['GET'])
+@_get_condicional
 def api_listar_tarefas():
-    """API: Lista tarefas do usuário"""
+    """
+    API: Lista tarefas do usuário, uma página por vez
+    
+    PARÂMETROS (URL):
+        limit: Tarefas por página (padrão 50, máximo 200)
+        cursor: 'proximo_cursor' da resposta anterior
+        sort: criacao-desc (padrão), criacao-asc, prazo-asc, prazo-desc,
+              titulo-asc ou titulo-desc
+        status: pendente, concluida, atrasada ou all (padrão)
+    
+    RESPOSTA:
+        {'tarefas': [...], 'proximo_cursor': '...' ou null na última página}
+        304 sem corpo se If-None-Match trouxer a ETag atual (ver
+        _get_condicional)
+    """
+    if 'user_id' not in session:
+        return jsonify({'erro': 'Não autenticado'}), 401
+    
+    try:
+        limite = tamanho_da_pagina(request.args.get('limit'))
+        ordem, status = _ordem_e_status()
+        tarefas, proximo_cursor = listar_pagina_tarefas(limite, request.args.get('cursor'),
+                                                        ordem, status, _usuario_da_sessao())
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    return jsonify({'tarefas': tarefas, 'proximo_cursor': proximo_cursor})
+
+@app.route('/api/tarefas/busca', methods=['GET'])
+@_get_condicional
+def api_buscar_tarefas():
+    """
+    API: Busca textual nas tarefas do usuário (título e descrição)
+    
+    PARÂMETROS (URL):
+        q: Texto da busca (sem diferença de acentos e maiúsculas; cada
+           palavra pode ser só o começo)
+        limit, cursor: Paginação, como em GET /api/tarefas
+    
+    RESPOSTA:
+        {'tarefas': [...] (mais relevantes primeiro), 'proximo_cursor': ...}
+    """
+    if 'user_id' not in session:
+        return jsonify({'erro': 'Não autenticado'}), 401
+    
+    try:
+        limite = tamanho_da_pagina(request.args.get('limit'))
+        tarefas, proximo_cursor = buscar_tarefas(request.args.get('q', ''), limite,
+                                                 request.args.get('cursor'),
+                                                 _usuario_da_sessao())
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    return jsonify({'tarefas': tarefas, 'proximo_cursor': proximo_cursor})
+
+@app.route('/api/tendencias', methods=['GET'])
+@_get_condicional
+def api_tendencias():
+    """
+    API: Produtividade do usuário por período, para gráficos
+    
+    Parâmetros: ?agrupar=dia|semana&quantidade=N (períodos até hoje)
+    """
+    if 'user_id' not in session:
+        return jsonify({'erro': 'Não autenticado'}), 401
+    
+    agrupar = request.args.get('agrupar', 'dia')
+    quantidade = request.args.get('quantidade')
+    try:
+        quantidade = int(quantidade) if quantidade else None
+    except ValueError:
+        return jsonify({'erro': 'O parâmetro quantidade deve ser um número inteiro'}), 400
+    try:
+        periodos = tendencias(session['user_id'], agrupar, quantidade)
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    return jsonify({'agrupar': agrupar, 'periodos': periodos})
+
+@app.route('/api/relatorios/cache', methods=['GET'])
+def api_cache_relatorios():
+    """API: Contadores do cache de relatórios (acertos, falhas, descartes)"""
     if 'user_id' not in session:
         return jsonify({'erro': 'Não autenticado'}), 401
     
-    # Sincroniza USUARIO_LOGADO
-    if not usuarios.USUARIO_LOGADO or usuarios.USUARIO_LOGADO['id'] != session['user_id']:
-        usuarios.USUARIO_LOGADO = {
-            'id': session['user_id'],
-            'nome': session['user_nome'],
-            'login': session['user_login']
-        }
+    return jsonify(estatisticas_cache_relatorios())
+
+@app.route('/api/estatisticas', methods=['GET'])
+@_get_condicional
+def api_estatisticas():
+    """API: Totais de tarefas do usuário (total, concluídas, pendentes, atrasadas)"""
+    if 'user_id' not in session:
+        return jsonify({'erro': 'Não autenticado'}), 401
     
-    tarefas = listar_tarefas(filtrar_por_responsavel=True)
-    return jsonify(tarefas)
+    return jsonify(estatisticas_usuario(session['user_id']))
 
 @app.route('/api/tarefas', methods=['POST'])
 def api_criar_tarefa():
@@ -269,14 +483,6 @@ def api_criar_tarefa():
     if 'user_id' not in session:
         return jsonify({'erro': 'Não autenticado'}), 401
     
-    # Sincroniza USUARIO_LOGADO
-    if not usuarios.USUARIO_LOGADO or usuarios.USUARIO_LOGADO['id'] != session['user_id']:
-        usuarios.USUARIO_LOGADO = {
-            'id': session['user_id'],
-            'nome': session['user_nome'],
-            'login': session['user_login']
-        }
-    
     data = request.get_json()
     titulo = data.get('titulo')
     descricao = data.get('descricao')
@@ -285,7 +491,7 @@ def api_criar_tarefa():
     if not titulo or not descricao or not prazo:
         return jsonify({'erro': 'Dados incompletos'}), 400
     
-    if criar_tarefa(titulo, descricao, prazo):
+    if criar_tarefa(titulo, descricao, prazo, _usuario_da_sessao()):
         return jsonify({'sucesso': True, 'mensagem': 'Tarefa criada'})
     else:
         return jsonify({'erro': 'Erro ao criar tarefa'}), 500
@@ -296,20 +502,12 @@ def api_editar_tarefa(tarefa_id):
     if 'user_id' not in session:
         return jsonify({'erro': 'Não autenticado'}), 401
     
-    # Sincroniza USUARIO_LOGADO
-    if not usuarios.USUARIO_LOGADO or usuarios.USUARIO_LOGADO['id'] != session['user_id']:
-        usuarios.USUARIO_LOGADO = {
-            'id': session['user_id'],
-            'nome': session['user_nome'],
-            'login': session['user_login']
-        }
-    
     data = request.get_json()
     titulo = data.get('titulo')
     descricao = data.get('descricao')
     prazo = data.get('prazo')
     
-    if editar_tarefa(tarefa_id, titulo, descricao, prazo):
+    if editar_tarefa(tarefa_id, titulo, descricao, prazo, _usuario_da_sessao()):
         return jsonify({'sucesso': True, 'mensagem': 'Tarefa atualizada'})
     else:
         return jsonify({'erro': 'Erro ao editar tarefa'}), 500
@@ -320,15 +518,7 @@ def api_concluir_tarefa(tarefa_id):
     if 'user_id' not in session:
         return jsonify({'erro': 'Não autenticado'}), 401
     
-    # Sincroniza USUARIO_LOGADO
-    if not usuarios.USUARIO_LOGADO or usuarios.USUARIO_LOGADO['id'] != session['user_id']:
-        usuarios.USUARIO_LOGADO = {
-            'id': session['user_id'],
-            'nome': session['user_nome'],
-            'login': session['user_login']
-        }
-    
-    if concluir_tarefa(tarefa_id):
+    if concluir_tarefa(tarefa_id, _usuario_da_sessao()):
         return jsonify({'sucesso': True, 'mensagem': 'Tarefa concluída'})
     else:
         return jsonify({'erro': 'Erro ao concluir tarefa'}), 500
@@ -339,85 +529,154 @@ def api_excluir_tarefa(tarefa_id):
     if 'user_id' not in session:
         return jsonify({'erro': 'Não autenticado'}), 401
     
-    # Sincroniza USUARIO_LOGADO
-    if not usuarios.USUARIO_LOGADO or usuarios.USUARIO_LOGADO['id'] != session['user_id']:
-        usuarios.USUARIO_LOGADO = {
-            'id': session['user_id'],
-            'nome': session['user_nome'],
-            'login': session['user_login']
-        }
-    
-    if excluir_tarefa(tarefa_id):
+    if excluir_tarefa(tarefa_id, _usuario_da_sessao()):
         return jsonify({'sucesso': True, 'mensagem': 'Tarefa excluída'})
     else:
         return jsonify({'erro': 'Erro ao excluir tarefa'}), 500
 
+# Tamanho mínimo (em caracteres) de cada parte enviada ao cliente
+TAMANHO_PARTE_EXPORTACAO = 16 * 1024
+
 @app.route('/api/exportar/<tipo>/<formato>')
 def api_exportar_relatorio(tipo, formato):
-    """API: Exporta relatório em JSON ou CSV"""
+    """
+    API: Exporta relatório em JSON, JSON Lines (jsonl) ou CSV
+    
+    A resposta é enviada em partes (streaming), conforme as tarefas são
+    lidas: a memória usada no servidor não cresce com o tamanho do
+    relatório e o download começa imediatamente.
+    """
     if 'user_id' not in session:
         return jsonify({'erro': 'Não autenticado'}), 401
     
-    # Sincroniza USUARIO_LOGADO
-    if not usuarios.USUARIO_LOGADO or usuarios.USUARIO_LOGADO['id'] != session['user_id']:
-        usuarios.USUARIO_LOGADO = {
-            'id': session['user_id'],
-            'nome': session['user_nome'],
-            'login': session['user_login']
-        }
-    
-    # Carrega tarefas
-    if tipo == 'concluidas':
-        todas = tarefas_concluidas()
-    elif tipo == 'pendentes':
-        todas = tarefas_pendentes()
-    elif tipo == 'atrasadas':
-        todas = tarefas_atrasadas()
-    else:
+    # Carrega em streaming apenas as tarefas do usuário (filtro na consulta)
+    periodo = _periodo_da_requisicao()
+    try:
+        tarefas_filtradas = iterar_relatorio(tipo, responsavel_id=session['user_id'],
+                                             prazo_de=periodo.get('de'),
+                                             prazo_ate=periodo.get('ate'))
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    if tarefas_filtradas is None:
         return jsonify({'erro': 'Tipo inválido'}), 400
     
-    # Filtra por usuário
-    tarefas_filtradas = [t for t in todas if t['responsavel_id'] == session['user_id']]
+    if formato not in FORMATOS_EXPORTACAO:
+        return jsonify({'erro': 'Formato inválido'}), 400
     
-    if formato == 'json':
-        from flask import make_response
-        import json
-        
-        response = make_response(json.dumps(tarefas_filtradas, ensure_ascii=False, indent=2))
-        response.headers['Content-Type'] = 'application/json; charset=utf-8'
-        response.headers['Content-Disposition'] = f'attachment; filename=relatorio_{tipo}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
-        return response
-        
-    elif formato == 'csv':
-        from flask import make_response
-        import csv
-        from io import StringIO
-        
-        si = StringIO()
-        writer = csv.writer(si)
-        
-        # Cabeçalho
-        writer.writerow(['ID', 'Título', 'Descrição', 'Prazo', 'Status', 'Criação', 'Responsável'])
-        
-        # Dados
-        for t in tarefas_filtradas:
-            writer.writerow([
-                t['id'],
-                t['titulo'],
-                t['descrição'],
-                t['prazo'],
-                t['status'],
-                t['criacao'],
-                t['responsavel_nome']
-            ])
-        
-        output = si.getvalue()
-        response = make_response(output)
-        response.headers['Content-Type'] = 'text/csv; charset=utf-8'
-        response.headers['Content-Disposition'] = f'attachment; filename=relatorio_{tipo}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-        return response
+    _, _, _, content_type, extensao = FORMATOS_EXPORTACAO[formato]
+    partes = _agrupar_partes(partes_exportacao(formato, tarefas_filtradas,
+                                               f"Relatório de {TIPOS_RELATORIO[tipo]}"))
     
-    return jsonify({'erro': 'Formato inválido'}), 400
+    # stream_with_context: a sessão continua acessível enquanto o gerador roda
+    response = Response(stream_with_context(partes), content_type=content_type)
+    response.headers['Content-Disposition'] = f'attachment; filename=relatorio_{tipo}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extensao}'
+    return response
+
+@app.route('/api/exportacoes', methods=['POST'])
+def api_enviar_exportacao():
+    """
+    API: Coloca uma exportação na fila (gerada em segundo plano)
+    
+    Corpo (JSON): {"tipos": ["concluidas", ...], "formatos": ["csv", ...],
+                   "de": "DD/MM/AAAA", "ate": "DD/MM/AAAA"}
+    Responde 202 na hora; acompanhe em GET /api/exportacoes/<id> e baixe
+    em GET /api/exportacoes/<id>/arquivo quando a situação for 'concluida'.
+    """
+    if 'user_id' not in session:
+        return jsonify({'erro': 'Não autenticado'}), 401
+    
+    data = request.get_json(silent=True) or {}
+    tipos, formatos = data.get('tipos'), data.get('formatos')
+    if not isinstance(tipos, list) or not isinstance(formatos, list):
+        return jsonify({'erro': 'Informe as listas tipos e formatos'}), 400
+    
+    try:
+        trabalho = enviar_exportacao(tipos, formatos, responsavel_id=session['user_id'],
+                                     prazo_de=data.get('de'), prazo_ate=data.get('ate'))
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    
+    response = jsonify(_exportacao_publica(trabalho))
+    response.status_code = 202
+    response.headers['Location'] = url_for('api_situacao_exportacao', trabalho_id=trabalho['id'])
+    return response
+
+@app.route('/api/exportacoes/<trabalho_id>', methods=['GET'])
+def api_situacao_exportacao(trabalho_id):
+    """API: Situação de uma exportação (na_fila, processando, concluida, erro)"""
+    if 'user_id' not in session:
+        return jsonify({'erro': 'Não autenticado'}), 401
+    
+    trabalho = situacao_exportacao(trabalho_id, session['user_id'])
+    if trabalho is None:
+        return jsonify({'erro': 'Exportação não encontrada'}), 404
+    return jsonify(_exportacao_publica(trabalho))
+
+@app.route('/api/exportacoes/<trabalho_id>/arquivo', methods=['GET'])
+def api_arquivo_exportacao(trabalho_id):
+    """API: Download do resultado de uma exportação concluída"""
+    if 'user_id' not in session:
+        return jsonify({'erro': 'Não autenticado'}), 401
+    
+    if situacao_exportacao(trabalho_id, session['user_id']) is None:
+        return jsonify({'erro': 'Exportação não encontrada'}), 404
+    resultado = arquivo_exportacao(trabalho_id, session['user_id'])
+    if resultado is None:
+        return jsonify({'erro': 'Exportação ainda não concluída'}), 409
+    
+    caminho, nome, content_type = resultado
+    return send_file(os.path.abspath(caminho), mimetype=content_type,
+                     as_attachment=True, download_name=nome)
+
+def _exportacao_publica(trabalho):
+    """Situação de uma exportação como enviada ao cliente (sem caminhos internos)"""
+    publica = {chave: valor for chave, valor in trabalho.items()
+               if chave not in ('arquivo', 'responsavel_id', 'processo')}
+    publica['url_situacao'] = url_for('api_situacao_exportacao', trabalho_id=trabalho['id'])
+    if trabalho['situacao'] == SITUACAO_CONCLUIDA:
+        publica['url_arquivo'] = url_for('api_arquivo_exportacao', trabalho_id=trabalho['id'])
+    return publica
+
+def _usuario_da_sessao():
+    """Usuário da requisição atual (sessão Flask), para as funções de tarefas.py"""
+    return {
+        'id': session['user_id'],
+        'nome': session['user_nome'],
+        'login': session['user_login']
+    }
+
+def _ordem_e_status():
+    """Lê a ordenação (?sort=) e o filtro de status (?status=) da URL"""
+    status = request.args.get('status') or None
+    if status == 'all':
+        status = None
+    return request.args.get('sort') or ORDEM_PADRAO, status
+
+def _periodo_da_requisicao():
+    """Lê o período de prazo (?de=DD/MM/AAAA&ate=DD/MM/AAAA) da URL"""
+    return {chave: request.args[chave] for chave in ('de', 'ate') if request.args.get(chave)}
+
+def _agrupar_partes(partes, tamanho=None):
+    """
+    Junta partes pequenas (uma por tarefa) em blocos de ~TAMANHO_PARTE_EXPORTACAO.
+    
+    A primeira parte é enviada imediatamente, para o download começar
+    sem esperar o primeiro bloco encher.
+    """
+    tamanho = tamanho or TAMANHO_PARTE_EXPORTACAO
+    partes = iter(partes)
+    for primeira in partes:
+        yield primeira
+        break
+    bloco, acumulado = [], 0
+    for parte in partes:
+        bloco.append(parte)
+        acumulado += len(parte)
+        if acumulado >= tamanho:
+            yield ''.join(bloco)
+            bloco, acumulado = [], 0
+    if bloco:
+        yield ''.join(bloco)
 
 # ==================== INICIALIZAÇÃO ====================
 
@@ -432,4 +691,6 @@ if __name__ == '__main__':
     print("Acesse: http://localhost:5000")
     print("="*60 + "\n")
     
-    app.run(debug=True, port=5000)
+    # threaded=True: cada requisição em uma thread (o usuário vem da sessão
+    # de cada uma, então requisições simultâneas não se misturam)
+    app.run(debug=True, port=5000, threaded=True)
@@ -0,0 +1,545 @@
+"""
+================================================================================
+MÓDULO: asgi.py - API ASSÍNCRONA (ASGI)
+================================================================================
+DESCRIÇÃO:
+    Ponto de entrada ASGI do TaskFlow. As rotas JSON de tarefas rodam em
+    um loop asyncio, e o acesso ao armazenamento (utils/arquivos.py, que
+    é síncrono) vai para um pool de threads de tamanho fixo. Um cliente
+    lento ou uma conexão de long-polling esperando não ocupa nenhuma
+    thread: só as leituras e gravações ocupam, pelo tempo que duram.
+
+    Não depende de nenhum pacote além do Flask: a aplicação é escrita
+    diretamente sobre o protocolo ASGI. Para servir, use um servidor ASGI:
+        uvicorn asgi:app --workers 4
+        hypercorn asgi:app
+
+ROTAS ASSÍNCRONAS (mesmas respostas de app.py):
+    - GET /api/tarefas, /api/tarefas/busca, /api/estatisticas e
+      /api/tendencias, com as mesmas ETags de app.py (If-None-Match -> 304)
+    - POST /api/tarefas, PUT /api/tarefas/<id>,
+      POST /api/tarefas/<id>/concluir, DELETE /api/tarefas/<id>
+    - GET /api/tarefas/mudancas (só aqui: long-polling, ver abaixo)
+
+    As demais rotas (páginas, login, perfil, exportações, arquivos
+    estáticos) são repassadas ao app Flask (app.py), rodando em um pool de
+    threads SEPARADO (_executar_wsgi()). Uma resposta do Flask ocupa a sua
+    thread até o fim do envio, no ritmo do cliente (ex: download de uma
+    exportação): com pools separados, downloads lentos nunca deixam a API
+    assíncrona sem threads para o armazenamento. O login é o do Flask: a
+    sessão é o mesmo cookie assinado, lido aqui por _usuario_da_sessao().
+
+LONG-POLLING (GET /api/tarefas/mudancas?etiqueta=...&espera=30):
+    Responde assim que as tarefas do usuário ficarem diferentes da
+    'etiqueta' informada (a da resposta anterior) ou, sem mudança, depois
+    de 'espera' segundos (máximo ESPERA_MAXIMA). Sem 'etiqueta', responde
+    na hora com a atual.
+        {'etiqueta': '...', 'mudou': true | false}
+    Alterações feitas por este processo acordam as esperas na hora; as de
+    outros processos são percebidas a cada INTERVALO_CONFERENCIA segundos.
+    Esperas do mesmo usuário compartilham a mesma conferência.
+
+CONFIGURAÇÃO:
+    TASKFLOW_ASGI_THREADS: threads do pool de acesso ao armazenamento
+    (padrão 8)
+    TASKFLOW_ASGI_THREADS_FLASK: threads do pool das rotas repassadas ao
+    Flask, ou seja, quantas respostas do Flask são enviadas ao mesmo tempo;
+    as demais esperam na fila (padrão 8)
+================================================================================
+"""
+
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import parse_qs
+
+from itsdangerous import BadSignature
+from werkzeug.http import http_date, is_resource_modified, parse_cookie, quote_etag
+
+from app import app as app_flask, validadores
+from relatorios import estatisticas_usuario, tendencias
+from tarefas import (
+    listar_pagina_tarefas, buscar_tarefas, criar_tarefa, editar_tarefa,
+    concluir_tarefa, excluir_tarefa, ORDEM_PADRAO
+)
+from utils.arquivos import ARQUIVO_TAREFAS, etiqueta_dados
+from utils.paginacao import tamanho_da_pagina
+
+# Threads do pool que executa as funções síncronas de armazenamento
+THREADS_ARMAZENAMENTO = int(os.environ.get('TASKFLOW_ASGI_THREADS', '8'))
+
+# Threads do pool que atende as rotas repassadas ao Flask
+THREADS_FLASK = int(os.environ.get('TASKFLOW_ASGI_THREADS_FLASK', '8'))
+
+# Long-polling: espera padrão e máxima (segundos) e intervalo entre as
+# conferências de alterações feitas por outros processos
+ESPERA_PADRAO = 30
+ESPERA_MAXIMA = 60
+INTERVALO_CONFERENCIA = 1.0
+
+# Tamanho máximo do corpo de uma requisição (bytes)
+TAMANHO_MAXIMO_CORPO = 1024 * 1024
+
+_POOL = ThreadPoolExecutor(THREADS_ARMAZENAMENTO, thread_name_prefix='taskflow-asgi')
+_POOL_FLASK = ThreadPoolExecutor(THREADS_FLASK, thread_name_prefix='taskflow-asgi-flask')
+
+# Leituras de etiqueta em andamento: ID do usuário -> Future
+_LEITURAS = {}
+
+# Evento da próxima alteração feita por este processo (ver _avisar_alteracao())
+_ALTERACAO = None
+
+
+class Requisicao:
+    """
+    Dados de uma requisição HTTP, lidos do 'scope' ASGI.
+
+    ATRIBUTOS:
+        metodo, caminho (str): Ex: 'GET', '/api/tarefas'
+        query_string (str): Parâmetros sem o '?'
+        args (dict): Parâmetros da URL (primeiro valor de cada um)
+        cabecalhos (dict): Nome em minúsculas -> valor
+        corpo (bytes): Corpo completo
+        usuario (dict): Usuário da sessão, ou None sem login
+        receive: Canal ASGI (para perceber a desconexão do cliente)
+    """
+
+    def __init__(self, scope, corpo, receive):
+        self.metodo = scope['method']
+        self.caminho = scope['path']
+        self.query_string = scope.get('query_string', b'').decode('utf-8', 'replace')
+        self.args = {chave: valores[0] for chave, valores
+                     in parse_qs(self.query_string, keep_blank_values=True).items()}
+        self.cabecalhos = {}
+        for nome, valor in scope.get('headers', []):
+            nome, valor = nome.decode('latin-1').lower(), valor.decode('latin-1')
+            self.cabecalhos[nome] = f'{self.cabecalhos[nome]}, {valor}' if nome in self.cabecalhos else valor
+        self.corpo = corpo
+        self.usuario = _usuario_da_sessao(self.cabecalhos.get('cookie'))
+        self.receive = receive
+
+    @property
+    def full_path(self):
+        """Caminho + '?' + parâmetros, como request.full_path do Flask"""
+        return f'{self.caminho}?{self.query_string}'
+
+    def json(self):
+        """Corpo como objeto JSON (dict), ou None se não for um"""
+        try:
+            dados = json.loads(self.corpo)
+        except ValueError:
+            return None
+        return dados if isinstance(dados, dict) else None
+
+
+def _usuario_da_sessao(cookies):
+    """
+    Usuário da sessão do Flask (cookie assinado com app.secret_key), no
+    mesmo formato de app._usuario_da_sessao(); None sem login válido.
+    """
+    interface = app_flask.session_interface
+    valor = parse_cookie(cookies or '').get(interface.get_cookie_name(app_flask))
+    serializador = interface.get_signing_serializer(app_flask)
+    if not valor or serializador is None:
+        return None
+    try:
+        sessao = serializador.loads(valor, max_age=int(app_flask.permanent_session_lifetime.total_seconds()))
+    except BadSignature:
+        return None
+    if 'user_id' not in sessao:
+        return None
+    return {'id': sessao['user_id'], 'nome': sessao.get('user_nome'), 'login': sessao.get('user_login')}
+
+
+async def _em_thread(funcao, *args):
+    """Executa uma função síncrona no pool, sem bloquear o loop"""
+    return await asyncio.get_running_loop().run_in_executor(_POOL, funcao, *args)
+
+
+# ==================== AVISO DE ALTERAÇÕES ====================
+
+def _evento_alteracao():
+    """Evento que será disparado pela próxima alteração deste processo"""
+    global _ALTERACAO
+    if _ALTERACAO is None:
+        _ALTERACAO = asyncio.Event()
+    return _ALTERACAO
+
+
+def _avisar_alteracao():
+    """Acorda as esperas de /api/tarefas/mudancas (alteração feita aqui)"""
+    global _ALTERACAO
+    if _ALTERACAO is not None:
+        _ALTERACAO.set()
+        _ALTERACAO = None
+
+
+async def _etiqueta(usuario_id):
+    """
+    Etiqueta atual das tarefas do usuário (utils/arquivos.py).
+
+    Esperas simultâneas do mesmo usuário aguardam a MESMA leitura, em vez
+    de uma thread do pool para cada uma. shield(): uma espera cancelada
+    (cliente desconectou) não cancela a leitura das outras.
+    """
+    leitura = _LEITURAS.get(usuario_id)
+    if leitura is None:
+        leitura = asyncio.ensure_future(_em_thread(etiqueta_dados, ARQUIVO_TAREFAS, usuario_id))
+        _LEITURAS[usuario_id] = leitura
+        leitura.add_done_callback(lambda _: _LEITURAS.pop(usuario_id, None))
+    return await asyncio.shield(leitura)
+
+
+async def _aguardar_desconexao(receive):
+    """Termina quando o cliente fecha a conexão"""
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+# ==================== ROTAS ====================
+
+def _ordem_e_status(args):
+    """Ordenação (?sort=) e filtro de status (?status=), como em app.py"""
+    status = args.get('status') or None
+    if status == 'all':
+        status = None
+    return args.get('sort') or ORDEM_PADRAO, status
+
+
+async def _listar_tarefas(requisicao):
+    """GET /api/tarefas (ver app.api_listar_tarefas())"""
+    try:
+        limite = tamanho_da_pagina(requisicao.args.get('limit'))
+        ordem, status = _ordem_e_status(requisicao.args)
+        tarefas, proximo_cursor = await _em_thread(
+            listar_pagina_tarefas, limite, requisicao.args.get('cursor'), ordem, status,
+            requisicao.usuario)
+    except ValueError as e:
+        return 400, {'erro': str(e)}
+    return 200, {'tarefas': tarefas, 'proximo_cursor': proximo_cursor}
+
+
+async def _buscar_tarefas(requisicao):
+    """GET /api/tarefas/busca (ver app.api_buscar_tarefas())"""
+    try:
+        limite = tamanho_da_pagina(requisicao.args.get('limit'))
+        tarefas, proximo_cursor = await _em_thread(
+            buscar_tarefas, requisicao.args.get('q', ''), limite, requisicao.args.get('cursor'),
+            requisicao.usuario)
+    except ValueError as e:
+        return 400, {'erro': str(e)}
+    return 200, {'tarefas': tarefas, 'proximo_cursor': proximo_cursor}
+
+
+async def _estatisticas(requisicao):
+    """GET /api/estatisticas"""
+    return 200, await _em_thread(estatisticas_usuario, requisicao.usuario['id'])
+
+
+async def _tendencias(requisicao):
+    """GET /api/tendencias (ver app.api_tendencias())"""
+    agrupar = requisicao.args.get('agrupar', 'dia')
+    quantidade = requisicao.args.get('quantidade')
+    try:
+        quantidade = int(quantidade) if quantidade else None
+    except ValueError:
+        return 400, {'erro': 'O parâmetro quantidade deve ser um número inteiro'}
+    try:
+        periodos = await _em_thread(tendencias, requisicao.usuario['id'], agrupar, quantidade)
+    except ValueError as e:
+        return 400, {'erro': str(e)}
+    return 200, {'agrupar': agrupar, 'periodos': periodos}
+
+
+async def _criar_tarefa(requisicao):
+    """POST /api/tarefas"""
+    dados = requisicao.json()
+    if dados is None:
+        return 400, {'erro': 'O corpo deve ser um objeto JSON'}
+    titulo, descricao, prazo = dados.get('titulo'), dados.get('descricao'), dados.get('prazo')
+    if not titulo or not descricao or not prazo:
+        return 400, {'erro': 'Dados incompletos'}
+    if await _em_thread(criar_tarefa, titulo, descricao, prazo, requisicao.usuario):
+        _avisar_alteracao()
+        return 200, {'sucesso': True, 'mensagem': 'Tarefa criada'}
+    return 500, {'erro': 'Erro ao criar tarefa'}
+
+
+async def _editar_tarefa(requisicao, tarefa_id):
+    """PUT /api/tarefas/<id>"""
+    dados = requisicao.json()
+    if dados is None:
+        return 400, {'erro': 'O corpo deve ser um objeto JSON'}
+    if await _em_thread(editar_tarefa, tarefa_id, dados.get('titulo'), dados.get('descricao'),
+                        dados.get('prazo'), requisicao.usuario):
+        _avisar_alteracao()
+        return 200, {'sucesso': True, 'mensagem': 'Tarefa atualizada'}
+    return 500, {'erro': 'Erro ao editar tarefa'}
+
+
+async def _concluir_tarefa(requisicao, tarefa_id):
+    """POST /api/tarefas/<id>/concluir"""
+    if await _em_thread(concluir_tarefa, tarefa_id, requisicao.usuario):
+        _avisar_alteracao()
+        return 200, {'sucesso': True, 'mensagem': 'Tarefa concluída'}
+    return 500, {'erro': 'Erro ao concluir tarefa'}
+
+
+async def _excluir_tarefa(requisicao, tarefa_id):
+    """DELETE /api/tarefas/<id>"""
+    if await _em_thread(excluir_tarefa, tarefa_id, requisicao.usuario):
+        _avisar_alteracao()
+        return 200, {'sucesso': True, 'mensagem': 'Tarefa excluída'}
+    return 500, {'erro': 'Erro ao excluir tarefa'}
+
+
+async def _mudancas(requisicao):
+    """GET /api/tarefas/mudancas (long-polling, ver docstring do módulo)"""
+    try:
+        espera = float(requisicao.args.get('espera') or ESPERA_PADRAO)
+    except ValueError:
+        return 400, {'erro': 'O parâmetro espera deve ser um número'}
+    espera = min(max(espera, 0.0), ESPERA_MAXIMA)
+    vista = requisicao.args.get('etiqueta')
+    usuario_id = requisicao.usuario['id']
+    limite = time.monotonic() + espera
+    desconexao = asyncio.ensure_future(_aguardar_desconexao(requisicao.receive))
+    try:
+        while True:
+            # O evento é pego ANTES da leitura: uma alteração feita durante
+            # a leitura acorda a espera seguinte
+            evento = _evento_alteracao()
+            atual = await _etiqueta(usuario_id)
+            if vista is None or atual != vista:
+                return 200, {'etiqueta': atual, 'mudou': vista is not None}
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                return 200, {'etiqueta': atual, 'mudou': False}
+            alteracao = asyncio.ensure_future(evento.wait())
+            await asyncio.wait({alteracao, desconexao}, timeout=min(restante, INTERVALO_CONFERENCIA),
+                               return_when=asyncio.FIRST_COMPLETED)
+            alteracao.cancel()
+            if desconexao.done():
+                return None
+    finally:
+        desconexao.cancel()
+
+
+# Método, padrão do caminho, função, GET condicional (ETag)
+ROTAS = [
+    ('GET', r'/api/tarefas', _listar_tarefas, True),
+    ('GET', r'/api/tarefas/busca', _buscar_tarefas, True),
+    ('GET', r'/api/tarefas/mudancas', _mudancas, False),
+    ('GET', r'/api/estatisticas', _estatisticas, True),
+    ('GET', r'/api/tendencias', _tendencias, True),
+    ('POST', r'/api/tarefas', _criar_tarefa, False),
+    ('PUT', r'/api/tarefas/(?P<tarefa_id>\d+)', _editar_tarefa, False),
+    ('POST', r'/api/tarefas/(?P<tarefa_id>\d+)/concluir', _concluir_tarefa, False),
+    ('DELETE', r'/api/tarefas/(?P<tarefa_id>\d+)', _excluir_tarefa, False),
+]
+
+_ROTAS = [(metodo, re.compile(f'^{padrao}$'), funcao, condicional)
+          for metodo, padrao, funcao, condicional in ROTAS]
+
+
+def _encontrar_rota(metodo, caminho):
+    """
+    RETORNO:
+        tuple: (função, GET condicional, parâmetros do caminho)
+        None: Rota atendida pelo Flask
+    """
+    for metodo_rota, padrao, funcao, condicional in _ROTAS:
+        encontrado = padrao.match(caminho)
+        if encontrado and metodo_rota == metodo:
+            return funcao, condicional, {nome: int(valor) for nome, valor in encontrado.groupdict().items()}
+    return None
+
+
+async def _atender(requisicao, funcao, condicional, parametros):
+    """
+    Executa a rota, com o GET condicional de app.py quando indicado.
+
+    RETORNO:
+        tuple: (status, dados JSON ou None, cabeçalhos extras); None se o
+               cliente desconectou antes da resposta
+    """
+    if requisicao.usuario is None:
+        return 401, {'erro': 'Não autenticado'}, []
+    if not condicional:
+        resultado = await funcao(requisicao, **parametros)
+        return None if resultado is None else (*resultado, [])
+
+    etag, ultima_modificacao = await _em_thread(validadores, requisicao.usuario, requisicao.full_path)
+    cabecalhos = [('ETag', quote_etag(etag)), ('Last-Modified', http_date(ultima_modificacao)),
+                  ('Cache-Control', 'private, no-cache'), ('Vary', 'Cookie')]
+    condicoes = {'REQUEST_METHOD': 'GET',
+                 'HTTP_IF_NONE_MATCH': requisicao.cabecalhos.get('if-none-match', ''),
+                 'HTTP_IF_MODIFIED_SINCE': requisicao.cabecalhos.get('if-modified-since', '')}
+    if not is_resource_modified(condicoes, etag=etag, last_modified=ultima_modificacao):
+        return 304, None, cabecalhos
+    status, dados = await funcao(requisicao, **parametros)
+    return status, dados, cabecalhos if status == 200 else []
+
+
+async def _responder(send, status, dados, cabecalhos):
+    """Envia uma resposta JSON (mesma serialização de jsonify())"""
+    corpo = b'' if dados is None else (app_flask.json.dumps(dados) + '\n').encode('utf-8')
+    headers = [(b'content-length', str(len(corpo)).encode('latin-1'))]
+    if dados is not None:
+        headers.append((b'content-type', b'application/json'))
+    headers += [(nome.lower().encode('latin-1'), valor.encode('latin-1')) for nome, valor in cabecalhos]
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': corpo})
+
+
+# ==================== PONTE PARA O FLASK (WSGI) ====================
+
+def _environ_wsgi(scope, corpo):
+    """Monta o 'environ' WSGI de uma requisição ASGI"""
+    servidor = scope.get('server') or ('localhost', 80)
+    cliente = scope.get('client') or ('', 0)
+    raiz = scope.get('root_path', '')
+    caminho = scope['path']
+    if raiz and caminho.startswith(raiz):
+        caminho = caminho[len(raiz):]
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': raiz.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': caminho.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': servidor[0],
+        'SERVER_PORT': str(servidor[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': cliente[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(corpo),
+        # O corpo já foi lido inteiro: pode ser lido até o fim, mesmo sem
+        # Content-Length (ex: envio em partes)
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for nome, valor in scope.get('headers', []):
+        nome = nome.decode('latin-1').upper().replace('-', '_')
+        chave = nome if nome in ('CONTENT_TYPE', 'CONTENT_LENGTH') else f'HTTP_{nome}'
+        valor = valor.decode('latin-1')
+        environ[chave] = f'{environ[chave]},{valor}' if chave in environ else valor
+    return environ
+
+
+def _executar_wsgi(environ, entregar):
+    """
+    Atende a requisição com o app Flask, do início ao fim em UMA thread de
+    _POOL_FLASK (o contexto da requisição do Flask é da thread).
+
+    'entregar(mensagem)' leva cada mensagem ASGI ao loop e espera o envio:
+    respostas em streaming (exportações) continuam em streaming, no ritmo
+    do cliente.
+    """
+    estado = {'iniciada': False}
+
+    def enviar(parte):
+        if not estado['iniciada']:
+            estado['iniciada'] = True
+            entregar({'type': 'http.response.start', 'status': estado['status'],
+                      'headers': estado['cabecalhos']})
+        if parte:
+            entregar({'type': 'http.response.body', 'body': parte, 'more_body': True})
+
+    def start_response(status, cabecalhos, exc_info=None):
+        if exc_info and estado['iniciada']:
+            raise exc_info[1].with_traceback(exc_info[2])
+        estado['status'] = int(status.split(' ', 1)[0])
+        estado['cabecalhos'] = [(nome.lower().encode('latin-1'), valor.encode('latin-1'))
+                                for nome, valor in cabecalhos]
+        return enviar
+
+    resultado = app_flask(environ, start_response)
+    try:
+        for parte in resultado:
+            enviar(parte)
+        enviar(b'')
+    finally:
+        if hasattr(resultado, 'close'):
+            resultado.close()
+    entregar({'type': 'http.response.body', 'body': b''})
+
+
+async def _repassar_ao_flask(scope, corpo, send):
+    """Rotas que não são da API assíncrona: app Flask, em _POOL_FLASK"""
+    loop = asyncio.get_running_loop()
+
+    def entregar(mensagem):
+        asyncio.run_coroutine_threadsafe(send(mensagem), loop).result()
+
+    await loop.run_in_executor(_POOL_FLASK, _executar_wsgi, _environ_wsgi(scope, corpo), entregar)
+
+
+# ==================== APLICAÇÃO ASGI ====================
+
+async def _ler_corpo(receive):
+    """Corpo completo da requisição; None se passar de TAMANHO_MAXIMO_CORPO"""
+    partes, tamanho = [], 0
+    while True:
+        mensagem = await receive()
+        if mensagem['type'] != 'http.request':
+            break
+        partes.append(mensagem.get('body', b''))
+        tamanho += len(partes[-1])
+        if tamanho > TAMANHO_MAXIMO_CORPO:
+            return None
+        if not mensagem.get('more_body'):
+            break
+    return b''.join(partes)
+
+
+async def _ciclo_de_vida(receive, send):
+    """
+    Mensagens 'lifespan': ao encerrar, espera os pools terminarem as
+    gravações e as respostas do Flask.
+
+    A espera é feita em outra thread: respostas do Flask ainda em envio
+    precisam do loop livre para terminar (ver _repassar_ao_flask()).
+    """
+    while True:
+        mensagem = await receive()
+        if mensagem['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif mensagem['type'] == 'lifespan.shutdown':
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, _POOL_FLASK.shutdown)
+            await loop.run_in_executor(None, _POOL.shutdown)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """Aplicação ASGI (ver docstring do módulo)"""
+    if scope['type'] == 'lifespan':
+        await _ciclo_de_vida(receive, send)
+        return
+    if scope['type'] != 'http':
+        # WebSockets não são atendidos
+        await send({'type': 'websocket.close'})
+        return
+
+    corpo = await _ler_corpo(receive)
+    if corpo is None:
+        await _responder(send, 413, {'erro': 'Corpo da requisição muito grande'}, [])
+        return
+    rota = _encontrar_rota(scope['method'], scope['path'])
+    if rota is None:
+        await _repassar_ao_flask(scope, corpo, send)
+        return
+    funcao, condicional, parametros = rota
+    resposta = await _atender(Requisicao(scope, corpo, receive), funcao, condicional, parametros)
+    if resposta is not None:
+        await _responder(send, *resposta)
@@ -0,0 +1,28 @@
+"""
+================================================================================
+PACOTE: benchmarks
+================================================================================
+DESCRIÇÃO:
+    Medições de desempenho do TaskFlow com dados sintéticos em escala
+    (de 1 mil a 1 milhão de tarefas), para descobrir o que fica lento
+    primeiro conforme os dados crescem e para perceber regressões.
+
+MÓDULOS:
+    - gerador.py: gera data/usuarios.json e data/tarefas.json de forma
+      determinística (mesma semente = mesmos arquivos)
+    - medicoes.py: cronometra cada função pública de tarefas.py,
+      usuarios.py e relatorios.py e cada rota do Flask (pelo test client)
+    - comparacao.py: compara dois resultados (o "baseline" gravado antes e
+      o atual) e aponta as regressões
+
+USO:
+    python -m benchmarks executar --escala 1k
+    python -m benchmarks executar --escala 100k --modo sqlite --saida base.json
+    python -m benchmarks executar --escala 100k --comparar base.json
+    python -m benchmarks comparar base.json atual.json --tolerancia 0.25
+    python -m benchmarks gerar --escala 1m --pasta /tmp/taskflow-1m
+
+    Os dados são gerados em uma pasta temporária: os arquivos em data/
+    do projeto nunca são tocados.
+================================================================================
+"""
@@ -0,0 +1,89 @@
+"""
+Linha de comando dos benchmarks (ver benchmarks/__init__.py).
+
+    python -m benchmarks executar [--escala 1k] [--modo json] [--repeticoes 5]
+                                  [--saida resultado.json] [--comparar base.json]
+    python -m benchmarks comparar base.json atual.json [--tolerancia 0.25]
+    python -m benchmarks gerar --pasta PASTA [--escala 1k]
+
+Com --comparar (ou no comando comparar), a saída é 1 se houver regressão.
+"""
+
+import argparse
+import sys
+
+from benchmarks.comparacao import (
+    comparar, formatar_comparacao, gravar_resultado, ler_resultado,
+    MINIMO_MS, TOLERANCIA_PADRAO
+)
+from benchmarks.gerador import ESCALAS, SEMENTE_PADRAO, gerar_dados
+from benchmarks.medicoes import executar, REPETICOES_PADRAO
+
+
+def _mostrar_comparacao(base, atual, argumentos):
+    """Imprime a comparação e retorna o código de saída (1 = regressão)."""
+    linhas, avisos = comparar(base, atual, argumentos.tolerancia, argumentos.minimo_ms)
+    print(formatar_comparacao(linhas, avisos))
+    return 1 if any(linha['situacao'] == 'regressao' for linha in linhas) else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Benchmarks do TaskFlow com dados sintéticos')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    tolerancias = argparse.ArgumentParser(add_help=False)
+    tolerancias.add_argument('--tolerancia', type=float, default=TOLERANCIA_PADRAO,
+                             help='aumento relativo aceito (padrão: %(default)s)')
+    tolerancias.add_argument('--minimo-ms', type=float, default=MINIMO_MS,
+                             help='diferença mínima em ms (padrão: %(default)s)')
+
+    p_executar = comandos.add_parser('executar', parents=[tolerancias],
+                                     help='gera os dados e roda as medições')
+    p_executar.add_argument('--escala', choices=ESCALAS, default='1k')
+    p_executar.add_argument('--modo', choices=('json', 'journal', 'sqlite', 'shards'),
+                            default='json')
+    p_executar.add_argument('--repeticoes', type=int, default=REPETICOES_PADRAO)
+    p_executar.add_argument('--semente', type=int, default=SEMENTE_PADRAO)
+    p_executar.add_argument('--filtro', help='só os casos cujo nome contém este texto')
+    p_executar.add_argument('--saida', help='grava o resultado (JSON) neste arquivo')
+    p_executar.add_argument('--comparar', metavar='BASE', help='compara com um resultado gravado')
+
+    p_comparar = comandos.add_parser('comparar', parents=[tolerancias],
+                                     help='compara dois resultados gravados')
+    p_comparar.add_argument('base')
+    p_comparar.add_argument('atual')
+
+    p_gerar = comandos.add_parser('gerar', help='só gera os dados sintéticos')
+    p_gerar.add_argument('--pasta', required=True)
+    p_gerar.add_argument('--escala', choices=ESCALAS, default='1k')
+    p_gerar.add_argument('--semente', type=int, default=SEMENTE_PADRAO)
+    p_gerar.add_argument('--esquema', type=int, choices=(1, 2), default=1)
+
+    argumentos = parser.parse_args(argv)
+
+    if argumentos.comando == 'gerar':
+        tarefas, usuarios = ESCALAS[argumentos.escala]
+        parametros = gerar_dados(argumentos.pasta, tarefas, usuarios, argumentos.semente,
+                                 esquema=argumentos.esquema)
+        print(f"✓ {parametros['tarefas']} tarefas e {parametros['usuarios']} usuários "
+              f"em {argumentos.pasta}/data")
+        return 0
+
+    if argumentos.comando == 'comparar':
+        return _mostrar_comparacao(ler_resultado(argumentos.base),
+                                   ler_resultado(argumentos.atual), argumentos)
+
+    base = ler_resultado(argumentos.comparar) if argumentos.comparar else None
+    resultado = executar(argumentos.escala, argumentos.modo, argumentos.repeticoes,
+                         argumentos.semente, argumentos.filtro)
+    if argumentos.saida:
+        gravar_resultado(argumentos.saida, resultado)
+        print(f'✓ Resultado gravado em {argumentos.saida}')
+    if base is not None:
+        return _mostrar_comparacao(base, resultado, argumentos)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+================================================================================
+MÓDULO: benchmarks/comparacao.py
+================================================================================
+DESCRIÇÃO:
+    Compara duas execuções dos benchmarks: um resultado gravado antes
+    (baseline) e um novo. A comparação usa a MEDIANA de cada caso.
+
+CRITÉRIO DE REGRESSÃO:
+    O caso ficou mais lento que (1 + tolerância) vezes o baseline E a
+    diferença passa de MINIMO_MS. O mínimo absoluto evita acusar
+    "regressões" em casos de microssegundos, em que o ruído da máquina
+    é maior que o próprio tempo medido.
+
+SITUAÇÕES:
+    'regressao', 'melhora', 'igual', 'novo' (só no atual) e 'removido'
+    (só no baseline)
+================================================================================
+"""
+
+import json
+
+TOLERANCIA_PADRAO = 0.25
+
+# Diferença mínima (ms) para um caso ser considerado regressão ou melhora
+MINIMO_MS = 0.5
+
+# Campos de meta que precisam ser iguais para a comparação fazer sentido
+META_COMPARAVEL = ('escala', 'modo', 'tarefas', 'usuarios', 'semente', 'esquema')
+
+
+def ler_resultado(caminho):
+    """Lê um resultado gravado por 'python -m benchmarks executar --saida'."""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def gravar_resultado(caminho, resultado):
+    """Grava um resultado (JSON legível, para versionar como baseline)."""
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, indent=4, ensure_ascii=False)
+        f.write('\n')
+
+
+def comparar(base, atual, tolerancia=TOLERANCIA_PADRAO, minimo_ms=MINIMO_MS):
+    """
+    Compara os casos de dois resultados.
+
+    PARÂMETROS:
+        base, atual (dict): Resultados de medicoes.executar()
+        tolerancia (float): Aumento relativo aceito (0.25 = 25% mais lento)
+        minimo_ms (float): Diferença absoluta mínima (ver docstring do módulo)
+
+    RETORNO:
+        tuple: (linhas, avisos)
+            linhas: dicts {'nome', 'base_ms', 'atual_ms', 'variacao',
+                    'situacao'}, regressões primeiro
+            avisos: diferenças de meta (ex: escalas diferentes)
+    """
+    avisos = [f"{campo}: {base['meta'].get(campo)} (base) x {atual['meta'].get(campo)} (atual)"
+              for campo in META_COMPARAVEL
+              if base['meta'].get(campo) != atual['meta'].get(campo)]
+
+    linhas = []
+    resultados_base, resultados_atual = base['resultados'], atual['resultados']
+    for nome in list(resultados_base) + [n for n in resultados_atual if n not in resultados_base]:
+        antes = resultados_base.get(nome, {}).get('mediana_ms')
+        depois = resultados_atual.get(nome, {}).get('mediana_ms')
+        variacao = None
+        if antes is None:
+            situacao = 'novo'
+        elif depois is None:
+            situacao = 'removido'
+        else:
+            variacao = (depois - antes) / antes if antes else 0.0
+            if depois > antes * (1 + tolerancia) and depois - antes >= minimo_ms:
+                situacao = 'regressao'
+            elif antes > depois * (1 + tolerancia) and antes - depois >= minimo_ms:
+                situacao = 'melhora'
+            else:
+                situacao = 'igual'
+        linhas.append({'nome': nome, 'base_ms': antes, 'atual_ms': depois,
+                       'variacao': variacao, 'situacao': situacao})
+
+    ordem = {'regressao': 0, 'melhora': 1, 'novo': 2, 'removido': 3, 'igual': 4}
+    linhas.sort(key=lambda linha: ordem[linha['situacao']])
+    return linhas, avisos
+
+
+def formatar_comparacao(linhas, avisos):
+    """
+    Texto da comparação para a tela.
+
+    RETORNO:
+        str: Tabela com um caso por linha e o total de regressões
+    """
+    simbolos = {'regressao': '✗', 'melhora': '✓', 'igual': ' ', 'novo': '+', 'removido': '-'}
+    saida = [f'⚠ Resultados não comparáveis diretamente: {aviso}' for aviso in avisos]
+    saida.append(f"  {'Caso':<60} {'Base (ms)':>12} {'Atual (ms)':>12} {'Variação':>9}")
+    for linha in linhas:
+        base = f"{linha['base_ms']:.3f}" if linha['base_ms'] is not None else '-'
+        atual = f"{linha['atual_ms']:.3f}" if linha['atual_ms'] is not None else '-'
+        variacao = f"{linha['variacao']:+.0%}" if linha['variacao'] is not None else ''
+        saida.append(f"{simbolos[linha['situacao']]} {linha['nome']:<60} "
+                     f"{base:>12} {atual:>12} {variacao:>9}")
+    regressoes = sum(1 for linha in linhas if linha['situacao'] == 'regressao')
+    saida.append(f'{regressoes} regressão(ões) encontrada(s)')
+    return '\n'.join(saida)
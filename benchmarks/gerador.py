@@ -0,0 +1,164 @@
+"""
+================================================================================
+MÓDULO: benchmarks/gerador.py
+================================================================================
+DESCRIÇÃO:
+    Gerador DETERMINÍSTICO de dados sintéticos: usuários e tarefas no
+    mesmo formato gravado pelo sistema, em qualquer quantidade.
+
+    A mesma semente e a mesma data base geram arquivos idênticos, então
+    duas medições feitas com os mesmos parâmetros usam os mesmos dados.
+
+DISTRIBUIÇÃO DOS DADOS:
+    - Metade das tarefas com os primeiros 1% dos usuários e o resto
+      espalhado entre todos (alguns usuários têm muito mais tarefas)
+    - Prazos entre 1 ano antes e 1 ano depois da data base
+    - ~40% concluídas (com data de conclusão); das pendentes, as de
+      prazo anterior à data base ficam atrasadas
+    - Títulos e descrições com palavras de VOCABULARIO (para a busca)
+
+MEMÓRIA:
+    Os registros são gerados e gravados um por vez: 1 milhão de tarefas
+    não precisam caber na memória.
+================================================================================
+"""
+
+import hashlib
+import os
+import random
+from datetime import date
+
+from utils.esquema import ESQUEMA_2, linhas_v1, linhas_v2
+
+# Escalas prontas: nome -> (tarefas, usuários)
+ESCALAS = {
+    '1k': (1_000, 100),
+    '10k': (10_000, 1_000),
+    '100k': (100_000, 10_000),
+    '1m': (1_000_000, 10_000),
+}
+
+SEMENTE_PADRAO = 42
+
+# Senha de todos os usuários gerados (login: 'usuario<ID>')
+SENHA_PADRAO = 'senha123'
+
+# Fração das tarefas geradas já concluídas
+FRACAO_CONCLUIDAS = 0.4
+
+VOCABULARIO = (
+    'relatório', 'reunião', 'cliente', 'projeto', 'revisão', 'orçamento',
+    'contrato', 'entrega', 'planejamento', 'apresentação', 'pesquisa',
+    'treinamento', 'suporte', 'integração', 'documentação', 'análise',
+    'campanha', 'fornecedor', 'auditoria', 'migração', 'backup', 'teste',
+    'servidor', 'equipe', 'financeiro', 'marketing', 'vendas', 'estoque',
+)
+
+
+def _data(ordinal):
+    """Ordinal -> 'DD/MM/AAAA'."""
+    dia = date.fromordinal(ordinal)
+    return f'{dia.day:02d}/{dia.month:02d}/{dia.year:04d}'
+
+
+def _data_hora(segundos):
+    """Segundos (ordinal * 86400 + segundos do dia) -> 'DD/MM/AAAA HH:MM:SS'."""
+    ordinal, resto = divmod(segundos, 86400)
+    horas, resto = divmod(resto, 3600)
+    return f'{_data(ordinal)} {horas:02d}:{resto // 60:02d}:{resto % 60:02d}'
+
+
+def gerar_usuarios(quantidade):
+    """
+    Gera os usuários 1..quantidade.
+
+    RETORNO:
+        generator: Dicionários no formato de usuarios.cadastrar_usuario()
+    """
+    senha_hash = hashlib.sha256(SENHA_PADRAO.encode('utf-8')).hexdigest()
+    for usuario_id in range(1, quantidade + 1):
+        yield {
+            'id': usuario_id,
+            'nome': f'Usuário {usuario_id}',
+            'email': f'usuario{usuario_id}@exemplo.com',
+            'login': f'usuario{usuario_id}',
+            'senha_hash': senha_hash,
+        }
+
+
+def gerar_tarefas(quantidade, usuarios, semente=SEMENTE_PADRAO, data_base=None):
+    """
+    Gera as tarefas 1..quantidade.
+
+    PARÂMETROS:
+        quantidade (int): Quantidade de tarefas
+        usuarios (int): Quantidade de usuários (responsáveis sorteados)
+        semente (int): Semente do sorteio
+        data_base (date, opcional): "Hoje" dos dados gerados (padrão: a
+            data atual; fixe-a para gerar sempre os mesmos arquivos)
+
+    RETORNO:
+        generator: Dicionários no formato de tarefas.criar_tarefa()
+    """
+    sorteio = random.Random(semente)
+    base = (data_base or date.today()).toordinal()
+    for tarefa_id in range(1, quantidade + 1):
+        # Distribuição desigual: metade das tarefas fica com os primeiros
+        # 1% dos usuários (o usuário 1, usado nas medições, é um deles)
+        if sorteio.random() < 0.5:
+            responsavel = sorteio.randrange(max(usuarios // 100, 1)) + 1
+        else:
+            responsavel = sorteio.randrange(usuarios) + 1
+        palavras = sorteio.sample(VOCABULARIO, 3)
+        criacao = (base - sorteio.randrange(400)) * 86400 + sorteio.randrange(86400)
+        prazo = base + sorteio.randrange(-365, 366)
+        tarefa = {
+            'id': tarefa_id,
+            'titulo': f'{palavras[0].capitalize()} {palavras[1]} #{tarefa_id}',
+            'descrição': f'Tarefa de {palavras[1]} sobre {palavras[2]} (gerada)',
+            'responsavel_id': responsavel,
+            'responsavel_nome': f'Usuário {responsavel}',
+            'prazo': _data(prazo),
+            'status': 'Pendente',
+            'criacao': _data_hora(criacao),
+        }
+        if sorteio.random() < FRACAO_CONCLUIDAS:
+            tarefa['status'] = 'Concluída'
+            conclusao = min(criacao + sorteio.randrange(30 * 86400), base * 86400 + 86399)
+            tarefa['conclusao'] = _data_hora(conclusao)
+        yield tarefa
+
+
+def _gravar(caminho, registros, esquema):
+    """Grava os registros em streaming no esquema pedido."""
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    partes = linhas_v2(registros) if esquema == ESQUEMA_2 else linhas_v1(registros, compacto=True)
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.writelines(partes)
+
+
+def gerar_dados(pasta, tarefas, usuarios, semente=SEMENTE_PADRAO, data_base=None, esquema=1):
+    """
+    Gera '<pasta>/data/usuarios.json' e '<pasta>/data/tarefas.json'.
+
+    PARÂMETROS:
+        pasta (str): Pasta onde os arquivos serão criados (a pasta 'data'
+                     é criada dentro dela, como no projeto)
+        tarefas, usuarios (int): Quantidades
+        semente, data_base: Ver gerar_tarefas()
+        esquema (int): Esquema em disco (ver utils/esquema.py)
+
+    RETORNO:
+        dict: Parâmetros usados (gravados junto com os resultados)
+    """
+    data_base = data_base or date.today()
+    _gravar(os.path.join(pasta, 'data', 'usuarios.json'), gerar_usuarios(usuarios), esquema)
+    _gravar(os.path.join(pasta, 'data', 'tarefas.json'),
+            gerar_tarefas(tarefas, usuarios, semente, data_base), esquema)
+    return {
+        'tarefas': tarefas,
+        'usuarios': usuarios,
+        'semente': semente,
+        'data_base': data_base.isoformat(),
+        'esquema': esquema,
+    }
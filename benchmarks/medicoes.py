@@ -0,0 +1,454 @@
+"""
+================================================================================
+MÓDULO: benchmarks/medicoes.py
+================================================================================
+DESCRIÇÃO:
+    Cronometra o sistema com dados sintéticos (ver gerador.py):
+        - cada função pública de tarefas.py, usuarios.py e relatorios.py
+        - cada rota do Flask (app.py), pelo test client (sem servidor)
+        - a leitura dos arquivos de dados (utils/arquivos.py)
+
+    Cada medição ("caso") roda algumas vezes e o resultado guarda o
+    mínimo, a mediana, a média e o máximo, em milissegundos.
+
+CASOS:
+    Os casos de cada função e de cada rota ficam em _casos_funcoes() e
+    _casos_rotas(). Funções públicas e rotas SEM caso aparecem em
+    meta['sem_medicao'] no resultado (e em um aviso na tela), para que
+    nada novo fique de fora sem ninguém perceber.
+
+    - "frio": antes de cada repetição os caches (relatórios, dados em
+      memória) são descartados: mede o cálculo completo
+    - sem sufixo: como no servidor em uso, com os caches já preenchidos
+    - "304": a mesma requisição repetida com If-None-Match (cliente que
+      consulta de tempos em tempos sem nada ter mudado)
+    - "depois de concluir": antes de cada repetição uma tarefa do usuário
+      é concluída (fora do cronômetro): mede a primeira leitura após uma
+      escrita, que não deve recalcular índices nem reordenar as listas
+
+ISOLAMENTO:
+    Tudo roda em uma pasta temporária (os dados do projeto não são
+    tocados). Funções que alteram dados (criar, editar, concluir,
+    excluir) agem como o usuário 1, passado explicitamente (como faz o
+    servidor web) e usam tarefas dele.
+================================================================================
+"""
+
+import contextlib
+import io
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from inspect import getmembers, isfunction
+
+from benchmarks.gerador import ESCALAS, SEMENTE_PADRAO, SENHA_PADRAO, gerar_dados
+
+REPETICOES_PADRAO = 5
+
+# Execuções descartadas antes das medidas (carga inicial, imports, etc.)
+AQUECIMENTO = 1
+
+# Usuário usado nas medições (um dos que têm mais tarefas, ver gerador.py)
+USUARIO_MEDICOES = 1
+
+# Tempo máximo de espera por uma exportação em segundo plano
+ESPERA_EXPORTACAO = 600
+
+
+class Caso:
+    """
+    Uma medição: o que executar e o que preparar antes de cada repetição.
+
+    ATRIBUTOS:
+        nome (str): Nome no resultado (ex: 'tarefas.listar_tarefas')
+        executar (callable): O que é cronometrado
+        preparar (callable, opcional): Roda antes de cada repetição,
+                                       FORA do cronômetro
+        cobre (str, opcional): Função ou rota medida (para a cobertura);
+                               padrão: o próprio nome
+    """
+
+    def __init__(self, nome, executar, preparar=None, cobre=None):
+        self.nome = nome
+        self.executar = executar
+        self.preparar = preparar
+        self.cobre = cobre or nome
+
+
+def cronometrar(caso, repeticoes=REPETICOES_PADRAO, aquecimento=AQUECIMENTO):
+    """
+    Executa o caso várias vezes e mede cada execução.
+
+    RETORNO:
+        dict: {'repeticoes', 'min_ms', 'mediana_ms', 'media_ms', 'max_ms'}
+    """
+    tempos = []
+    # As funções do sistema escrevem mensagens na tela: são descartadas
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(aquecimento + repeticoes):
+            if caso.preparar:
+                caso.preparar()
+            inicio = time.perf_counter()
+            caso.executar()
+            decorrido = (time.perf_counter() - inicio) * 1000
+            if i >= aquecimento:
+                tempos.append(decorrido)
+    return {
+        'repeticoes': repeticoes,
+        'min_ms': round(min(tempos), 4),
+        'mediana_ms': round(statistics.median(tempos), 4),
+        'media_ms': round(statistics.fmean(tempos), 4),
+        'max_ms': round(max(tempos), 4),
+    }
+
+
+def funcoes_publicas(modulo):
+    """Nomes das funções públicas DEFINIDAS no módulo (não as importadas)."""
+    return [f'{modulo.__name__}.{nome}' for nome, funcao in getmembers(modulo, isfunction)
+            if not nome.startswith('_') and funcao.__module__ == modulo.__name__]
+
+
+def rotas(app):
+    """Rotas do Flask como 'MÉTODO /caminho' (sem HEAD e OPTIONS)."""
+    return sorted(f'{metodo} {regra.rule}' for regra in app.url_map.iter_rules()
+                  for metodo in regra.methods - {'HEAD', 'OPTIONS'})
+
+
+def _ids_tarefas(tarefas, usuario, status):
+    """
+    IDs das tarefas do usuário com o status dado.
+
+    Um iterador único por status é repartido entre todos os casos que
+    alteram dados: nenhuma tarefa é concluída ou excluída duas vezes.
+    """
+    return iter([t['id'] for t in tarefas.listar_tarefas(usuario=usuario)
+                 if t['status'] == status])
+
+
+def _proximo(ids):
+    """Próximo ID da lista; avisa se os dados gerados não bastam."""
+    try:
+        return next(ids)
+    except StopIteration:
+        raise RuntimeError('Poucas tarefas para as medições que alteram dados: '
+                           'use uma escala maior ou menos repetições') from None
+
+
+def _casos_funcoes(contexto):
+    """Casos das funções públicas de tarefas.py, usuarios.py e relatorios.py."""
+    from utils import arquivos
+    import relatorios
+    import tarefas
+    import usuarios
+
+    usuario = contexto['usuario']
+    pendentes, concluidas = contexto['pendentes'], contexto['concluidas']
+    cadastros = iter(range(1, 10**9))
+    lista = relatorios.tarefas_atrasadas(usuario['id'])
+
+    def entrar():
+        usuarios.USUARIO_LOGADO = usuario
+
+    def frio():
+        relatorios.invalidar_cache_relatorios()
+
+    def frio_dados():
+        arquivos.invalidar_cache()
+        relatorios.invalidar_cache_relatorios()
+
+    return [
+        # Leitura dos arquivos de dados
+        Caso('arquivos.ler_dados (frio)', lambda: arquivos.ler_dados(arquivos.ARQUIVO_TAREFAS),
+             frio_dados, cobre='utils.arquivos.ler_dados'),
+        Caso('arquivos.ler_dados', lambda: arquivos.ler_dados(arquivos.ARQUIVO_TAREFAS),
+             cobre='utils.arquivos.ler_dados'),
+        Caso('arquivos.iterar_dados (frio)',
+             lambda: sum(1 for _ in arquivos.iterar_dados(arquivos.ARQUIVO_TAREFAS)),
+             frio_dados, cobre='utils.arquivos.iterar_dados'),
+
+        # tarefas.py
+        Caso('tarefas.criar_tarefa',
+             lambda: tarefas.criar_tarefa('Medição', 'Criada pelo benchmark', '31/12/2099',
+                                          usuario)),
+        Caso('tarefas.listar_tarefas', lambda: tarefas.listar_tarefas(usuario=usuario)),
+        Caso('tarefas.listar_tarefas (todas)', lambda: tarefas.listar_tarefas(False),
+             cobre='tarefas.listar_tarefas'),
+        Caso('tarefas.listar_pagina_tarefas',
+             lambda: tarefas.listar_pagina_tarefas(usuario=usuario)),
+        Caso('tarefas.listar_pagina_tarefas (prazo, atrasadas)',
+             lambda: tarefas.listar_pagina_tarefas(ordem='prazo-asc', status='atrasada',
+                                                   usuario=usuario),
+             cobre='tarefas.listar_pagina_tarefas'),
+        Caso('tarefas.listar_pagina_tarefas (prazo, depois de concluir)',
+             lambda: tarefas.listar_pagina_tarefas(ordem='prazo-asc', usuario=usuario),
+             lambda: tarefas.concluir_tarefa(_proximo(pendentes), usuario),
+             cobre='tarefas.listar_pagina_tarefas'),
+        Caso('tarefas.buscar_tarefas',
+             lambda: tarefas.buscar_tarefas('relatorio cliente', usuario=usuario)),
+        Caso('tarefas.editar_tarefa',
+             lambda: tarefas.editar_tarefa(contexto['tarefa_id'], 'Editada pelo benchmark',
+                                           usuario=usuario)),
+        Caso('tarefas.concluir_tarefa',
+             lambda: tarefas.concluir_tarefa(_proximo(pendentes), usuario)),
+        Caso('tarefas.excluir_tarefa',
+             lambda: tarefas.excluir_tarefa(_proximo(concluidas), usuario)),
+
+        # usuarios.py
+        Caso('usuarios.cadastrar_usuario',
+             lambda: usuarios.cadastrar_usuario('Medição', 'medicao@exemplo.com',
+                                                f'medicao{next(cadastros)}', SENHA_PADRAO)),
+        Caso('usuarios.verificar_credenciais',
+             lambda: usuarios.verificar_credenciais(usuario['login'], SENHA_PADRAO)),
+        Caso('usuarios.autenticar_usuario',
+             lambda: usuarios.autenticar_usuario(usuario['login'], SENHA_PADRAO)),
+        Caso('usuarios.get_usuario_logado', usuarios.get_usuario_logado, entrar),
+        Caso('usuarios.logout', usuarios.logout, entrar),
+        Caso('usuarios.get_usuario_por_id',
+             lambda: usuarios.get_usuario_por_id(contexto['usuarios'] // 2 + 1), entrar),
+
+        # relatorios.py
+        Caso('relatorios.invalidar_cache_relatorios', relatorios.invalidar_cache_relatorios),
+        Caso('relatorios.estatisticas_cache_relatorios',
+             relatorios.estatisticas_cache_relatorios),
+        Caso('relatorios.iterar_relatorio (todos)',
+             lambda: sum(1 for _ in relatorios.iterar_relatorio('atrasadas')),
+             cobre='relatorios.iterar_relatorio'),
+        Caso('relatorios.classificar_relatorios (todos)',
+             lambda: sum(1 for _ in relatorios.classificar_relatorios(
+                 ['concluidas', 'pendentes', 'atrasadas'])),
+             cobre='relatorios.classificar_relatorios'),
+        Caso('relatorios.tarefas_concluidas (frio)',
+             lambda: relatorios.tarefas_concluidas(usuario['id']), frio,
+             cobre='relatorios.tarefas_concluidas'),
+        Caso('relatorios.tarefas_pendentes (frio)',
+             lambda: relatorios.tarefas_pendentes(usuario['id']), frio,
+             cobre='relatorios.tarefas_pendentes'),
+        Caso('relatorios.tarefas_atrasadas (frio)',
+             lambda: relatorios.tarefas_atrasadas(usuario['id']), frio,
+             cobre='relatorios.tarefas_atrasadas'),
+        Caso('relatorios.tarefas_atrasadas (frio, todos)',
+             relatorios.tarefas_atrasadas, frio, cobre='relatorios.tarefas_atrasadas'),
+        Caso('relatorios.relatorio', lambda: relatorios.relatorio('atrasadas', usuario['id'])),
+        Caso('relatorios.estatisticas_usuario',
+             lambda: relatorios.estatisticas_usuario(usuario['id'])),
+        Caso('relatorios.estatisticas_usuario (depois de concluir)',
+             lambda: relatorios.estatisticas_usuario(usuario['id']),
+             lambda: tarefas.concluir_tarefa(_proximo(pendentes), usuario),
+             cobre='relatorios.estatisticas_usuario'),
+        Caso('relatorios.tendencias', lambda: relatorios.tendencias(usuario['id'])),
+        Caso('relatorios.tendencias (semana)',
+             lambda: relatorios.tendencias(usuario['id'], 'semana'),
+             cobre='relatorios.tendencias'),
+        Caso('relatorios.exibir_relatorio',
+             lambda: relatorios.exibir_relatorio('Atrasadas', lista)),
+        Caso('relatorios.exportar_relatorio',
+             lambda: relatorios.exportar_relatorio('Atrasadas', lista)),
+    ]
+
+
+def _casos_rotas(contexto):
+    """Casos das rotas do Flask, pelo test client com o usuário 1 logado."""
+    import relatorios
+    import tarefas
+    from app import app, PASTA_ESTATICOS
+    from utils.estaticos import nome_versionado
+
+    cliente = app.test_client()
+    # Cliente separado para medir o logout sem encerrar a sessão dos demais
+    cliente_logout = app.test_client()
+    login = {'login': contexto['usuario']['login'], 'senha': SENHA_PADRAO}
+    pendentes, concluidas = contexto['pendentes'], contexto['concluidas']
+    cadastros = iter(range(1, 10**9))
+
+    def requisitar(metodo, url, cliente=cliente, **opcoes):
+        resposta = cliente.open(url, method=metodo, **opcoes)
+        resposta.get_data()  # consome respostas em streaming (exportações)
+        resposta.close()
+        if resposta.status_code >= 400:
+            raise RuntimeError(f'{metodo} {url}: HTTP {resposta.status_code}')
+        return resposta
+
+    def frio():
+        relatorios.invalidar_cache_relatorios()
+
+    requisitar('POST', '/login', data=login)
+    trabalho = requisitar('POST', '/api/exportacoes',
+                          json={'tipos': ['concluidas', 'atrasadas'], 'formatos': ['csv']}).json
+    limite = time.monotonic() + ESPERA_EXPORTACAO
+    while requisitar('GET', f"/api/exportacoes/{trabalho['id']}").json['situacao'] != 'concluida':
+        if time.monotonic() > limite:
+            raise RuntimeError('A exportação em segundo plano não terminou')
+        time.sleep(0.05)
+
+    def caso(metodo, regra, url=None, preparar=None, nome=None, **opcoes):
+        destino = url or regra
+        return Caso(nome or f'{metodo} {regra}',
+                    lambda: requisitar(metodo, destino() if callable(destino) else destino,
+                                       **opcoes),
+                    preparar, cobre=f'{metodo} {regra}')
+
+    def condicional(regra, url=None):
+        destino = url or regra
+        etag = {}
+
+        def preparar():
+            etag['valor'] = requisitar('GET', destino).headers['ETag']
+
+        def executar():
+            resposta = requisitar('GET', destino, headers={'If-None-Match': etag['valor']})
+            if resposta.status_code != 304:
+                raise RuntimeError(f'GET {destino}: esperado 304, veio {resposta.status_code}')
+
+        return Caso(f'GET {regra} (304)', executar, preparar, cobre=f'GET {regra}')
+
+    tarefa = f"/api/tarefas/{contexto['tarefa_id']}"
+    return [
+        caso('GET', '/'),
+        caso('GET', '/login'),
+        caso('POST', '/login', data=login),
+        caso('GET', '/cadastro'),
+        Caso('POST /cadastro',
+             lambda: requisitar('POST', '/cadastro', data={
+                 'nome': 'Medição', 'email': 'medicao@exemplo.com',
+                 'login': f'rota{next(cadastros)}', 'senha': SENHA_PADRAO})),
+        caso('GET', '/dashboard'),
+        condicional('/dashboard'),
+        caso('GET', '/relatorios', '/relatorios?tipo=atrasadas', frio,
+             nome='GET /relatorios (frio)'),
+        caso('GET', '/relatorios', '/relatorios?tipo=atrasadas'),
+        caso('GET', '/perfil'),
+        caso('PUT', '/api/perfil', json={'nome': 'Usuário 1', 'email': 'usuario1@exemplo.com'}),
+        caso('GET', '/logout', cliente=cliente_logout,
+             preparar=lambda: requisitar('POST', '/login', cliente_logout, data=login)),
+        caso('GET', '/api/tarefas'),
+        condicional('/api/tarefas'),
+        caso('GET', '/api/tarefas', '/api/tarefas?sort=prazo-asc&status=atrasada&limit=200',
+             nome='GET /api/tarefas (prazo, atrasadas)'),
+        caso('GET', '/api/tarefas', '/api/tarefas?sort=prazo-asc&limit=50',
+             nome='GET /api/tarefas (prazo, depois de concluir)',
+             preparar=lambda: requisitar('POST', f'/api/tarefas/{_proximo(pendentes)}/concluir')),
+        caso('GET', '/api/tarefas/busca', '/api/tarefas/busca?q=relatorio'),
+        caso('GET', '/api/tendencias', '/api/tendencias?agrupar=semana'),
+        caso('GET', '/api/relatorios/cache'),
+        caso('GET', '/api/estatisticas'),
+        caso('POST', '/api/tarefas', json={'titulo': 'Medição', 'descricao': 'Benchmark',
+                                           'prazo': '31/12/2099'}),
+        caso('PUT', '/api/tarefas/<int:tarefa_id>', tarefa, json={'titulo': 'Editada'}),
+        caso('POST', '/api/tarefas/<int:tarefa_id>/concluir',
+             lambda: f'/api/tarefas/{_proximo(pendentes)}/concluir'),
+        caso('DELETE', '/api/tarefas/<int:tarefa_id>',
+             lambda: f'/api/tarefas/{_proximo(concluidas)}'),
+        caso('GET', '/api/exportar/<tipo>/<formato>', '/api/exportar/concluidas/csv',
+             nome='GET /api/exportar/<tipo>/<formato> (csv)'),
+        caso('GET', '/api/exportar/<tipo>/<formato>', '/api/exportar/atrasadas/json',
+             nome='GET /api/exportar/<tipo>/<formato> (json)'),
+        caso('POST', '/api/exportacoes', json={'tipos': ['pendentes'], 'formatos': ['jsonl']}),
+        caso('GET', '/api/exportacoes/<trabalho_id>', f"/api/exportacoes/{trabalho['id']}"),
+        caso('GET', '/api/exportacoes/<trabalho_id>/arquivo',
+             f"/api/exportacoes/{trabalho['id']}/arquivo"),
+        caso('GET', '/static/<path:filename>', '/static/style.css'),
+        caso('GET', '/static/<path:filename>',
+             f"/static/{nome_versionado(PASTA_ESTATICOS, 'style.css')}",
+             nome='GET /static/<path:filename> (versionado, gzip)',
+             headers={'Accept-Encoding': 'gzip'}),
+    ]
+
+
+def executar(escala='1k', modo='json', repeticoes=REPETICOES_PADRAO,
+             semente=SEMENTE_PADRAO, filtro=None, pasta=None):
+    """
+    Gera os dados, roda todas as medições e devolve o resultado.
+
+    PARÂMETROS:
+        escala (str): Uma das chaves de ESCALAS (ex: '100k')
+        modo (str): Modo de armazenamento (TASKFLOW_ARMAZENAMENTO)
+        repeticoes (int): Execuções medidas por caso
+        semente (int): Semente do gerador
+        filtro (str, opcional): Só os casos cujo nome contém este texto
+        pasta (str, opcional): Pasta de trabalho (padrão: temporária,
+                               apagada no final)
+
+    RETORNO:
+        dict: {'meta': {...}, 'resultados': {nome do caso: medidas}}
+
+    OBSERVAÇÃO:
+        Os módulos do sistema são importados aqui, DEPOIS de configurar o
+        modo e de entrar na pasta de trabalho: rode uma escala/modo por
+        processo (é o que a linha de comando faz).
+    """
+    if escala not in ESCALAS:
+        raise ValueError(f"Escala inválida: use {', '.join(ESCALAS)}")
+    quantidade_tarefas, quantidade_usuarios = ESCALAS[escala]
+    temporaria = pasta is None
+    pasta = pasta or tempfile.mkdtemp(prefix='taskflow-benchmark-')
+    origem = os.getcwd()
+    os.environ['TASKFLOW_ARMAZENAMENTO'] = modo
+    os.environ['TASKFLOW_BANCO'] = os.path.join('data', 'taskflow.db')
+    # Os imports 'tarefas', 'app'... vêm da raiz do projeto
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    try:
+        print(f'Gerando {quantidade_tarefas} tarefas e {quantidade_usuarios} usuários...')
+        inicio = time.perf_counter()
+        parametros = gerar_dados(pasta, quantidade_tarefas, quantidade_usuarios, semente)
+        os.chdir(pasta)
+        if modo == 'sqlite':
+            from utils import banco
+            banco.importar_json()
+        elif modo == 'shards':
+            from utils import shards
+            shards.dividir_arquivo()
+        print(f'Dados prontos em {time.perf_counter() - inicio:.1f}s ({pasta})')
+
+        import app
+        import relatorios
+        import tarefas
+        import usuarios
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            usuario = usuarios.verificar_credenciais(f'usuario{USUARIO_MEDICOES}', SENHA_PADRAO)
+            contexto = {
+                'usuario': usuario,
+                'usuarios': quantidade_usuarios,
+                'pendentes': _ids_tarefas(tarefas, usuario, tarefas.STATUS_PENDENTE),
+                'concluidas': _ids_tarefas(tarefas, usuario, tarefas.STATUS_CONCLUIDA),
+            }
+            # Tarefa dos casos de edição (nunca concluída nem excluída)
+            contexto['tarefa_id'] = _proximo(contexto['pendentes'])
+            casos = _casos_funcoes(contexto) + _casos_rotas(contexto)
+        cobertos = {caso.cobre for caso in casos}
+        esperados = (funcoes_publicas(tarefas) + funcoes_publicas(usuarios)
+                     + funcoes_publicas(relatorios) + rotas(app.app))
+        sem_medicao = [nome for nome in esperados if nome not in cobertos]
+        for nome in sem_medicao:
+            print(f'⚠ Sem medição: {nome}')
+
+        resultados = {}
+        for caso in casos:
+            if filtro and filtro not in caso.nome:
+                continue
+            resultados[caso.nome] = cronometrar(caso, repeticoes)
+            print(f"{caso.nome:<60} {resultados[caso.nome]['mediana_ms']:>12.3f} ms")
+    finally:
+        os.chdir(origem)
+        if temporaria:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    return {
+        'meta': {
+            'escala': escala,
+            'modo': modo,
+            **parametros,
+            'repeticoes': repeticoes,
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'sem_medicao': sem_medicao,
+        },
+        'resultados': resultados,
+    }
@@ -0,0 +1,526 @@
+"""
+================================================================================
+MÓDULO: exportacoes.py
+================================================================================
+DESCRIÇÃO:
+    FORMATOS de exportação dos relatórios (JSON, JSON Lines, CSV e TXT) e
+    a FILA DE EXPORTAÇÕES EM SEGUNDO PLANO.
+
+FORMATOS:
+    Cada formato é montado em partes (início, uma parte por tarefa, fim),
+    então o mesmo código serve para:
+        - o download em streaming de /api/exportar (app.py)
+        - os arquivos gerados pela fila de exportações
+        - o TXT de relatorios.exportar_relatorio() (menu do console)
+
+FILA DE EXPORTAÇÕES:
+    Exportações grandes não precisam ocupar a requisição (ou o menu do
+    console) enquanto são geradas:
+
+        1. enviar_exportacao(tipos, formatos, ...)  ->  trabalho (com 'id')
+        2. situacao_exportacao(id, ...)  ->  'na_fila' / 'processando' /
+                                             'concluida' / 'erro'
+        3. arquivo_exportacao(id, ...)  ->  arquivo pronto para download
+
+    Os trabalhos rodam em um pool de threads (TRABALHADORES_EXPORTACAO).
+    Vários tipos e formatos são gerados em UMA passada pelas tarefas
+    (relatorios.classificar_relatorios()): cada tarefa lida é escrita em
+    todos os arquivos em que entra. Com mais de um arquivo, o resultado é
+    um ZIP.
+
+ESTRUTURA (pasta data/exportacoes/):
+    <id>.situacao.json   Situação do trabalho (gravada a cada mudança)
+    <id>.<ext>           Resultado: .json, .jsonl, .csv, .txt ou .zip
+
+    Como a situação fica em disco, qualquer processo do servidor responde
+    às consultas, não só o que recebeu o pedido. Trabalhos com mais de
+    VALIDADE_EXPORTACAO segundos são apagados a cada novo envio.
+
+TRABALHOS ABANDONADOS:
+    A fila fica na memória do processo que recebeu o pedido. Se ele cair
+    ou for reiniciado, os trabalhos dele 'na_fila' ou 'processando' nunca
+    terminariam: cada trabalho guarda o processo dono ('processo') e, ao
+    iniciar a fila de um processo (e a cada consulta), trabalhos de um
+    processo que não existe mais passam para 'erro' (ver _abandonado()).
+
+OBSERVAÇÃO:
+    Threads (e não processos): a geração passa a maior parte do tempo
+    lendo e escrevendo arquivos, e os dados já carregados em memória
+    (utils/arquivos.py) são compartilhados com o resto do servidor.
+================================================================================
+"""
+
+import csv
+import json
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from io import StringIO
+
+from relatorios import TIPOS_RELATORIO, classificar_relatorios
+from utils.datas import data_para_ordinal
+from utils.modelos import para_json
+
+PASTA_EXPORTACOES = 'data/exportacoes'
+
+# Quantidade de exportações geradas ao mesmo tempo
+TRABALHADORES_EXPORTACAO = 2
+
+# Tempo (segundos) que o resultado fica disponível para download
+VALIDADE_EXPORTACAO = 24 * 60 * 60
+
+SITUACAO_NA_FILA = 'na_fila'
+SITUACAO_PROCESSANDO = 'processando'
+SITUACAO_CONCLUIDA = 'concluida'
+SITUACAO_ERRO = 'erro'
+
+# IDs de trabalho: uuid4 em hexadecimal (também impede caminhos como '../')
+_PADRAO_ID = re.compile(r'[0-9a-f]{32}')
+
+_executor = None
+_executor_mutex = threading.Lock()
+
+# Identifica a fila deste processo nos trabalhos (ver _abandonado()):
+# distingue um processo novo que recebeu o mesmo PID de um que caiu
+_instancia = None
+
+MENSAGEM_ABANDONADO = 'Exportação interrompida: o servidor foi reiniciado. Envie novamente.'
+
+
+# ==================== FORMATOS ====================
+
+def _json_tarefa(tarefa, indice):
+    separador = '[\n  ' if indice == 0 else ',\n  '
+    return separador + json.dumps(tarefa, ensure_ascii=False, indent=2,
+                                  default=para_json).replace('\n', '\n  ')
+
+
+def _json_fim(titulo, total):
+    return '[]' if total == 0 else '\n]'
+
+
+def _jsonl_tarefa(tarefa, indice):
+    return json.dumps(tarefa, ensure_ascii=False, default=para_json) + '\n'
+
+
+def _linha_csv(valores):
+    buffer = StringIO()
+    csv.writer(buffer).writerow(valores)
+    return buffer.getvalue()
+
+
+def _csv_inicio(titulo):
+    return _linha_csv(['ID', 'Título', 'Descrição', 'Prazo', 'Status', 'Criação', 'Responsável'])
+
+
+def _csv_tarefa(t, indice):
+    return _linha_csv([t['id'], t['titulo'], t['descrição'], t['prazo'],
+                       t['status'], t['criacao'], t['responsavel_nome']])
+
+
+def _txt_inicio(titulo):
+    return (f"{titulo}\n" + "=" * 80 + "\n"
+            f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n"
+            + "=" * 80 + "\n\n")
+
+
+def _txt_tarefa(tarefa, indice):
+    return (f"ID: {tarefa['id']}\n"
+            f"Título: {tarefa['titulo']}\n"
+            f"Descrição: {tarefa['descrição']}\n"
+            f"Prazo: {tarefa['prazo']}\n"
+            f"Status: {tarefa['status']}\n"
+            f"Responsável: {tarefa['responsavel_nome']}\n"
+            f"Criado em: {tarefa['criacao']}\n"
+            + "-" * 80 + "\n\n")
+
+
+def _txt_fim(titulo, total):
+    if total == 0:
+        return "Nenhuma tarefa encontrada.\n"
+    return f"Total de tarefas: {total}\n"
+
+
+def _vazio(*args):
+    return ''
+
+
+# Formato -> (início(titulo), tarefa(tarefa, indice), fim(titulo, total),
+#             Content-Type, extensão)
+FORMATOS_EXPORTACAO = {
+    'json': (_vazio, _json_tarefa, _json_fim, 'application/json; charset=utf-8', 'json'),
+    'jsonl': (_vazio, _jsonl_tarefa, _vazio, 'application/x-ndjson; charset=utf-8', 'jsonl'),
+    'csv': (_csv_inicio, _csv_tarefa, _vazio, 'text/csv; charset=utf-8', 'csv'),
+    'txt': (_txt_inicio, _txt_tarefa, _txt_fim, 'text/plain; charset=utf-8', 'txt'),
+}
+
+
+def partes_exportacao(formato, tarefas, titulo=''):
+    """
+    Gera o conteúdo de um relatório em partes, uma tarefa por vez.
+
+    PARÂMETROS:
+        formato (str): Chave de FORMATOS_EXPORTACAO
+        tarefas (iterable): Tarefas do relatório (lidas uma de cada vez)
+        titulo (str): Título (usado no cabeçalho do TXT)
+
+    RETORNO:
+        generator: Partes de texto; juntas formam o arquivo completo
+
+    OBSERVAÇÃO:
+        O JSON gerado é idêntico a json.dumps(lista, ensure_ascii=False,
+        indent=2), mas sem precisar da lista completa em memória.
+    """
+    inicio, parte_tarefa, fim, _, _ = FORMATOS_EXPORTACAO[formato]
+    cabecalho = inicio(titulo)
+    if cabecalho:
+        yield cabecalho
+    total = 0
+    for total, tarefa in enumerate(tarefas, 1):
+        yield parte_tarefa(tarefa, total - 1)
+    rodape = fim(titulo, total)
+    if rodape:
+        yield rodape
+
+
+# ==================== FILA DE EXPORTAÇÕES ====================
+
+def _pool():
+    """
+    Pool de threads das exportações (criado no primeiro envio).
+
+    Ao ser criado, marca como 'erro' os trabalhos abandonados por
+    processos que caíram ou foram reiniciados (ver _recuperar_abandonados()).
+    """
+    global _executor, _instancia
+    with _executor_mutex:
+        if _executor is None:
+            _instancia = uuid.uuid4().hex
+            _recuperar_abandonados()
+            _executor = ThreadPoolExecutor(max_workers=TRABALHADORES_EXPORTACAO,
+                                           thread_name_prefix='exportacao')
+        return _executor
+
+
+def _processo_ativo(pid):
+    """Indica se existe um processo com este PID nesta máquina."""
+    if os.name == 'nt':
+        # No Windows, os.kill(pid, 0) não consulta: envia CTRL+C ao processo
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:   # existe, mas é de outro usuário
+        return True
+    return True
+
+
+def _abandonado(trabalho):
+    """
+    Indica se o trabalho ainda está pendente, mas seu processo não existe mais.
+
+    FUNCIONAMENTO:
+        - Concluídos e com erro nunca estão abandonados
+        - Mesmo PID deste processo: abandonado se a instância for outra
+          (o processo antigo caiu e o PID foi reaproveitado, ex: o
+          servidor reiniciado dentro de um contêiner)
+        - Outro PID nesta máquina: abandonado se o processo não existe
+        - Outra máquina (pasta compartilhada): não dá para saber, fica
+          como está
+        - Sem 'processo' (gravado por uma versão anterior): abandonado,
+          pois todos os processos daquela versão já foram reiniciados
+    """
+    if trabalho['situacao'] not in (SITUACAO_NA_FILA, SITUACAO_PROCESSANDO):
+        return False
+    processo = trabalho.get('processo')
+    if processo is None:
+        return True
+    if processo['maquina'] != socket.gethostname():
+        return False
+    if processo['pid'] == os.getpid():
+        return processo['instancia'] != _instancia
+    return not _processo_ativo(processo['pid'])
+
+
+def _marcar_abandonado(trabalho):
+    """Passa um trabalho abandonado para 'erro' e apaga o resultado parcial."""
+    trabalho['situacao'] = SITUACAO_ERRO
+    trabalho['erro'] = MENSAGEM_ABANDONADO
+    trabalho['concluido_em'] = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+    if os.path.exists(trabalho['arquivo']):
+        os.remove(trabalho['arquivo'])
+    _gravar_situacao(trabalho)
+
+
+def _recuperar_abandonados():
+    """
+    Marca como 'erro' todos os trabalhos abandonados da pasta.
+
+    RETORNO:
+        int: Quantidade de trabalhos marcados
+    """
+    try:
+        nomes = os.listdir(PASTA_EXPORTACOES)
+    except FileNotFoundError:
+        return 0
+    marcados = 0
+    for nome in nomes:
+        if not nome.endswith('.situacao.json'):
+            continue
+        trabalho = _ler_situacao(nome[:-len('.situacao.json')])
+        if trabalho is not None and _abandonado(trabalho):
+            _marcar_abandonado(trabalho)
+            marcados += 1
+    return marcados
+
+
+def _caminho(trabalho_id, extensao):
+    return os.path.join(PASTA_EXPORTACOES, f'{trabalho_id}.{extensao}')
+
+
+def _gravar_situacao(trabalho):
+    """
+    Grava a situação do trabalho (arquivo temporário + os.replace).
+
+    O temporário tem nome único: a thread que executa o trabalho e a
+    consulta de outro processo (_marcar_abandonado()) podem gravar a
+    mesma situação ao mesmo tempo sem uma truncar o arquivo da outra.
+    """
+    caminho = _caminho(trabalho['id'], 'situacao.json')
+    descritor, temporario = tempfile.mkstemp(dir=PASTA_EXPORTACOES, suffix='.tmp')
+    try:
+        with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+            json.dump(trabalho, f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def _ler_situacao(trabalho_id):
+    """Lê a situação gravada; None se o ID não existir."""
+    if not isinstance(trabalho_id, str) or not _PADRAO_ID.fullmatch(trabalho_id):
+        return None
+    try:
+        with open(_caminho(trabalho_id, 'situacao.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def enviar_exportacao(tipos, formatos, responsavel_id=None, prazo_de=None, prazo_ate=None):
+    """
+    Coloca uma exportação na fila e retorna sem esperar ela ser gerada.
+
+    PARÂMETROS:
+        tipos (list): Relatórios desejados (chaves de TIPOS_RELATORIO)
+        formatos (list): Formatos desejados (chaves de FORMATOS_EXPORTACAO)
+        responsavel_id (int, opcional): Apenas tarefas deste responsável
+        prazo_de, prazo_ate (str, opcionais): Período de prazo (DD/MM/AAAA)
+
+    RETORNO:
+        dict: Situação inicial do trabalho ('id', 'situacao', 'arquivo'...)
+
+    ERROS:
+        ValueError: Tipo, formato ou data inválidos (verificados antes de
+                    entrar na fila)
+    """
+    tipos = list(dict.fromkeys(tipos or ()))
+    formatos = list(dict.fromkeys(formatos or ()))
+    invalidos = [tipo for tipo in tipos if tipo not in TIPOS_RELATORIO]
+    if invalidos or not tipos:
+        raise ValueError(f"Tipo de relatório inválido: {', '.join(map(str, invalidos)) or 'nenhum'}")
+    invalidos = [formato for formato in formatos if formato not in FORMATOS_EXPORTACAO]
+    if invalidos or not formatos:
+        raise ValueError(f"Formato inválido: {', '.join(map(str, invalidos)) or 'nenhum'}")
+    for data in (prazo_de, prazo_ate):
+        if data and data_para_ordinal(data) is None:
+            raise ValueError(f"Data inválida: {data}. Use DD/MM/AAAA.")
+
+    os.makedirs(PASTA_EXPORTACOES, exist_ok=True)
+    limpar_exportacoes()
+    pool = _pool()
+
+    trabalho_id = uuid.uuid4().hex
+    agora = datetime.now()
+    if len(tipos) * len(formatos) == 1:
+        extensao = FORMATOS_EXPORTACAO[formatos[0]][4]
+        nome = f'relatorio_{tipos[0]}_{agora.strftime("%Y%m%d_%H%M%S")}.{extensao}'
+    else:
+        extensao = 'zip'
+        nome = f'relatorios_{agora.strftime("%Y%m%d_%H%M%S")}.zip'
+
+    trabalho = {
+        'id': trabalho_id,
+        'situacao': SITUACAO_NA_FILA,
+        'responsavel_id': responsavel_id,
+        'tipos': tipos,
+        'formatos': formatos,
+        'periodo': {'de': prazo_de or None, 'ate': prazo_ate or None},
+        'criado_em': agora.strftime('%d/%m/%Y %H:%M:%S'),
+        'concluido_em': None,
+        'totais': {},
+        'arquivo': _caminho(trabalho_id, extensao),
+        'nome': nome,
+        'erro': None,
+        'processo': {'maquina': socket.gethostname(), 'pid': os.getpid(),
+                     'instancia': _instancia},
+    }
+    _gravar_situacao(trabalho)
+    pool.submit(_executar, dict(trabalho))
+    return trabalho
+
+
+def _executar(trabalho):
+    """Gera o resultado de um trabalho (roda em uma thread do pool)."""
+    trabalho['situacao'] = SITUACAO_PROCESSANDO
+    _gravar_situacao(trabalho)
+    try:
+        trabalho['totais'] = _gerar_arquivos(trabalho)
+    except Exception as e:
+        trabalho['situacao'] = SITUACAO_ERRO
+        trabalho['erro'] = str(e) or type(e).__name__
+        if os.path.exists(trabalho['arquivo']):
+            os.remove(trabalho['arquivo'])
+    else:
+        trabalho['situacao'] = SITUACAO_CONCLUIDA
+    trabalho['concluido_em'] = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+    _gravar_situacao(trabalho)
+
+
+def _gerar_arquivos(trabalho):
+    """
+    Escreve todos os relatórios/formatos do trabalho em uma passada.
+
+    RETORNO:
+        dict: Total de tarefas por tipo de relatório
+    """
+    tipos, formatos = trabalho['tipos'], trabalho['formatos']
+    base = os.path.join(PASTA_EXPORTACOES, trabalho['id'])
+    totais = dict.fromkeys(tipos, 0)
+    saidas = {tipo: [] for tipo in tipos}    # tipo -> [(formato, arquivo)]
+    temporarios = []
+    try:
+        for tipo in tipos:
+            titulo = f"Relatório de {TIPOS_RELATORIO[tipo]}"
+            for formato in formatos:
+                inicio = FORMATOS_EXPORTACAO[formato][0]
+                caminho = f'{base}.{tipo}.{FORMATOS_EXPORTACAO[formato][4]}.tmp'
+                arquivo = open(caminho, 'w', encoding='utf-8', newline='')
+                temporarios.append(caminho)
+                saidas[tipo].append((formato, arquivo))
+                arquivo.write(inicio(titulo))
+
+        periodo = trabalho['periodo']
+        tarefas = classificar_relatorios(tipos, trabalho['responsavel_id'],
+                                         periodo['de'], periodo['ate'])
+        for tarefa, tipos_da_tarefa in tarefas:
+            for tipo in tipos_da_tarefa:
+                indice = totais[tipo]
+                for formato, arquivo in saidas[tipo]:
+                    arquivo.write(FORMATOS_EXPORTACAO[formato][1](tarefa, indice))
+                totais[tipo] = indice + 1
+
+        for tipo in tipos:
+            titulo = f"Relatório de {TIPOS_RELATORIO[tipo]}"
+            for formato, arquivo in saidas[tipo]:
+                arquivo.write(FORMATOS_EXPORTACAO[formato][2](titulo, totais[tipo]))
+                arquivo.close()
+
+        if len(temporarios) == 1:
+            os.replace(temporarios[0], trabalho['arquivo'])
+        else:
+            # O ZIP também é montado em um temporário: uma queda no meio
+            # não deixa um pacote pela metade com o nome final
+            caminho = f'{base}.zip.tmp'
+            temporarios.append(caminho)
+            with zipfile.ZipFile(caminho, 'w', zipfile.ZIP_DEFLATED) as pacote:
+                for tipo in tipos:
+                    for formato in formatos:
+                        extensao = FORMATOS_EXPORTACAO[formato][4]
+                        pacote.write(f'{base}.{tipo}.{extensao}.tmp',
+                                     arcname=f'relatorio_{tipo}.{extensao}')
+            os.replace(caminho, trabalho['arquivo'])
+        return totais
+    finally:
+        for arquivos_do_tipo in saidas.values():
+            for _, arquivo in arquivos_do_tipo:
+                arquivo.close()
+        for caminho in temporarios:
+            if os.path.exists(caminho):
+                os.remove(caminho)
+
+
+def situacao_exportacao(trabalho_id, responsavel_id):
+    """
+    Consulta a situação de uma exportação.
+
+    PARÂMETROS:
+        trabalho_id (str): ID retornado por enviar_exportacao()
+        responsavel_id (int): Quem consulta (só vê os próprios trabalhos)
+
+    RETORNO:
+        dict: Situação do trabalho ('situacao', 'totais', 'erro'...)
+        None: Se o trabalho não existir (ou for de outro usuário)
+    """
+    trabalho = _ler_situacao(trabalho_id)
+    if trabalho is None or trabalho['responsavel_id'] != responsavel_id:
+        return None
+    if _abandonado(trabalho):
+        _marcar_abandonado(trabalho)
+    return trabalho
+
+
+def arquivo_exportacao(trabalho_id, responsavel_id):
+    """
+    Resultado de uma exportação concluída.
+
+    RETORNO:
+        tuple: (caminho, nome para download, Content-Type)
+        None: Se o trabalho não existir ou ainda não estiver concluído
+    """
+    trabalho = situacao_exportacao(trabalho_id, responsavel_id)
+    if trabalho is None or trabalho['situacao'] != SITUACAO_CONCLUIDA:
+        return None
+    if len(trabalho['tipos']) * len(trabalho['formatos']) == 1:
+        content_type = FORMATOS_EXPORTACAO[trabalho['formatos'][0]][3]
+    else:
+        content_type = 'application/zip'
+    return trabalho['arquivo'], trabalho['nome'], content_type
+
+
+def limpar_exportacoes(validade=None):
+    """
+    Apaga os trabalhos (situação e resultado) mais antigos que a validade.
+
+    PARÂMETROS:
+        validade (int, opcional): Segundos (padrão: VALIDADE_EXPORTACAO)
+
+    RETORNO:
+        int: Quantidade de arquivos apagados
+    """
+    validade = VALIDADE_EXPORTACAO if validade is None else validade
+    limite = time.time() - validade
+    apagados = 0
+    try:
+        nomes = os.listdir(PASTA_EXPORTACOES)
+    except FileNotFoundError:
+        return 0
+    for nome in nomes:
+        caminho = os.path.join(PASTA_EXPORTACOES, nome)
+        try:
+            if os.path.getmtime(caminho) < limite:
+                os.remove(caminho)
+                apagados += 1
+        except OSError:
+            pass
+    return apagados
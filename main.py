@@ -46,8 +46,9 @@ from tarefas import (
 )
 from relatorios import (
     tarefas_concluidas, tarefas_pendentes, tarefas_atrasadas,
-    exibir_relatorio, exportar_relatorio
+    exibir_relatorio
 )
+from exportacoes import enviar_exportacao
 
 # Variável global para controle do loop principal
 EXECUTANDO = True
@@ -263,12 +264,14 @@ def tela_relatorios():
     
     FUNCIONALIDADES:
         - Exibição no console
-        - Opção de exportar para arquivo TXT
+        - Opção de exportar para arquivo TXT (gerado em segundo plano,
+          sem prender o menu)
     
     DELEGAÇÃO:
         Usa funções do módulo relatorios.py:
         - tarefas_concluidas(), tarefas_pendentes(), tarefas_atrasadas()
-        - exibir_relatorio(), exportar_relatorio()
+        - exibir_relatorio()
+        E a fila de exportações: exportacoes.enviar_exportacao()
     """
     print("\n--- Relatórios ---")
     print("1. Tarefas Concluídas")
@@ -299,7 +302,9 @@ def tela_relatorios():
         )
         exportar = input(pergunta).lower()
         if exportar == 's':
-            exportar_relatorio(f"Relatório de {escolha}", lista)
+            tipo = {'1': 'concluidas', '2': 'pendentes', '3': 'atrasadas'}[escolha]
+            trabalho = enviar_exportacao([tipo], ['txt'])
+            print(f"✓ Exportando em segundo plano para: {trabalho['arquivo']}")
 
 
 def loop_principal():
@@ -31,17 +31,49 @@ IMPORTANTE PARA APRESENTAÇÃO:
 """
 
 from datetime import datetime
-from tarefas import _carregar_tarefas, STATUS_CONCLUIDA, STATUS_PENDENTE, STATUS_ATRASADA
+from tarefas import STATUS_CONCLUIDA, STATUS_PENDENTE, STATUS_ATRASADA
+from utils.arquivos import (
+    iterar_dados, iterar_registros, contar_registros, agregar_registros, versao_dados,
+    ARQUIVO_TAREFAS
+)
+from utils.cache import CacheLRU
+from utils.datas import data_para_ordinal, ordinal_para_data, ordinal_hoje
 from usuarios import get_usuario_por_id
 
+# Tipos de relatório: identificador (usado nas URLs) -> título
+TIPOS_RELATORIO = {
+    'concluidas': 'Tarefas Concluídas',
+    'pendentes': 'Tarefas Pendentes',
+    'atrasadas': 'Tarefas Atrasadas',
+}
 
-def _filtrar_tarefas(status_desejado=None, verificar_atraso=False):
+# Agrupamentos das tendências: nome -> (dias por período, quantidade padrão)
+AGRUPAMENTOS_TENDENCIA = {
+    'dia': (1, 30),
+    'semana': (7, 12),
+}
+
+# Quantidade máxima de períodos em uma consulta de tendências
+QUANTIDADE_MAXIMA_TENDENCIA = 366
+
+# Capacidade do cache de relatórios, em tarefas (somando todos os relatórios)
+CAPACIDADE_CACHE_RELATORIOS = 20000
+
+# Relatórios já calculados (ver _filtrar_tarefas())
+_CACHE_RELATORIOS = CacheLRU(CAPACIDADE_CACHE_RELATORIOS)
+
+
+def _filtrar_tarefas(status_desejado=None, verificar_atraso=False,
+                     responsavel_id=None, prazo_de=None, prazo_ate=None):
     """
     Função auxiliar para filtrar tarefas por critérios específicos.
     
     PARÂMETROS:
         status_desejado (str, opcional): Status para filtrar ("Concluída" ou "Pendente")
         verificar_atraso (bool): Se True, retorna apenas tarefas atrasadas
+        responsavel_id (int, opcional): Apenas tarefas deste responsável
+        prazo_de (str, opcional): Apenas prazos a partir desta data (DD/MM/AAAA)
+        prazo_ate (str, opcional): Apenas prazos até esta data, inclusive
     
     RETORNO:
         list: Lista de tarefas que atendem aos critérios
@@ -55,33 +87,183 @@ def _filtrar_tarefas(status_desejado=None, verificar_atraso=False):
     USO:
         Centraliza a lógica de filtragem para evitar duplicação
         nas funções de relatório.
+    
+    DESEMPENHO:
+        Todos os filtros (inclusive responsável e período) são repassados
+        para iterar_registros() e avaliados DENTRO da consulta: no SQLite
+        pelos índices do banco, no modo shards lendo só o arquivo do
+        responsável e nos modos JSON pelos índices em memória (tarefas do
+        responsável; pendentes ordenadas por prazo). Um relatório de um
+        usuário custa o tamanho dos dados dele, não do sistema inteiro.
+    
+    CACHE:
+        O resultado fica guardado (_CACHE_RELATORIOS, LRU) pela chave
+        (filtros, versão dos dados, data de hoje). Ver o mesmo relatório
+        de novo sem nenhuma tarefa alterada não consulta os dados. Uma
+        alteração muda a versão (e tarefas.py descarta os relatórios do
+        responsável); a virada do dia muda a chave, pois "atrasadas"
+        depende de hoje.
+    
+    ERROS:
+        ValueError: Se prazo_de ou prazo_ate não estiverem em DD/MM/AAAA
+    """
+    chave = (status_desejado, verificar_atraso, responsavel_id, prazo_de or None,
+             prazo_ate or None, versao_dados(ARQUIVO_TAREFAS, responsavel_id), ordinal_hoje())
+    resultado = _CACHE_RELATORIOS.obter(chave, lambda: tuple(_iterar_tarefas(
+        status_desejado, verificar_atraso, responsavel_id, prazo_de, prazo_ate)))
+    return list(resultado)
+
+
+def invalidar_cache_relatorios(responsavel_id=None):
     """
-    tarefas = _carregar_tarefas()
+    Descarta relatórios guardados em cache.
     
-    if verificar_atraso:
-        hoje = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        tarefas_filtradas = []
-        for t in tarefas:
-            if t['status'] == STATUS_PENDENTE:
-                try:
-                    prazo_dt = datetime.strptime(t['prazo'], '%d/%m/%Y')
-                    if prazo_dt < hoje:
-                        tarefas_filtradas.append(t)
-                except ValueError:
-                    # Ignora tarefas com formato de data inválido
-                    pass
-        return tarefas_filtradas
+    PARÂMETROS:
+        responsavel_id (int, opcional): Descarta os relatórios deste
+            responsável e os de todos os usuários; None = descarta tudo
+    
+    USO:
+        Chamada por tarefas.py a cada tarefa criada, editada, concluída
+        ou excluída.
+    """
+    if responsavel_id is None:
+        _CACHE_RELATORIOS.invalidar()
+    else:
+        _CACHE_RELATORIOS.invalidar(lambda chave: chave[2] in (responsavel_id, None))
+
+
+def estatisticas_cache_relatorios():
+    """
+    Contadores do cache de relatórios (acertos, falhas, descartes...).
+    
+    RETORNO:
+        dict: Ver CacheLRU.estatisticas() (utils/cache.py)
+    """
+    return _CACHE_RELATORIOS.estatisticas()
+
+
+def _ordinal_do_filtro(texto):
+    """Converte uma data de filtro (DD/MM/AAAA) em ordinal; None se vazia."""
+    if not texto:
+        return None
+    ordinal = data_para_ordinal(texto)
+    if ordinal is None:
+        raise ValueError(f"Data inválida: {texto}. Use DD/MM/AAAA.")
+    return ordinal
+
+
+def _iterar_tarefas(status_desejado=None, verificar_atraso=False,
+                    responsavel_id=None, prazo_de=None, prazo_ate=None):
+    """
+    Versão em streaming de _filtrar_tarefas(): gera as tarefas uma de
+    cada vez, filtrando conforme são lidas (memória constante).
+    """
+    criterios = {}
+    if responsavel_id is not None:
+        criterios['responsavel_id'] = responsavel_id
+    prazo_desde = _ordinal_do_filtro(prazo_de)
+    prazo_antes = _ordinal_do_filtro(prazo_ate)
+    if prazo_antes is not None:
+        prazo_antes += 1  # 'até' inclui o próprio dia
         
-    if status_desejado:
-        return [t for t in tarefas if t['status'] == status_desejado]
+    if verificar_atraso:
+        # Prazo anterior a hoje (tarefas com data inválida são ignoradas)
+        hoje = ordinal_hoje()
+        prazo_antes = hoje if prazo_antes is None else min(prazo_antes, hoje)
+        criterios['status'] = STATUS_PENDENTE
+    elif status_desejado:
+        criterios['status'] = status_desejado
         
-    return tarefas
+    if not criterios and prazo_desde is None and prazo_antes is None:
+        return iterar_dados(ARQUIVO_TAREFAS)
+    return iterar_registros(ARQUIVO_TAREFAS, prazo_antes=prazo_antes,
+                            prazo_desde=prazo_desde, **criterios)
+
+
+def iterar_relatorio(tipo, responsavel_id=None, prazo_de=None, prazo_ate=None):
+    """
+    Gera as tarefas de um relatório uma de cada vez.
+    
+    PARÂMETROS:
+        tipo (str): 'concluidas', 'pendentes' ou 'atrasadas'
+        responsavel_id, prazo_de, prazo_ate: ver _filtrar_tarefas()
+    
+    RETORNO:
+        generator: Tarefas do relatório
+        None: Se o tipo for inválido
+    
+    USO:
+        Páginas e exportações da interface web, que filtram e emitem as
+        tarefas sem montar a lista completa em memória.
+    """
+    filtros = {'responsavel_id': responsavel_id, 'prazo_de': prazo_de, 'prazo_ate': prazo_ate}
+    if tipo == 'concluidas':
+        return _iterar_tarefas(STATUS_CONCLUIDA, **filtros)
+    if tipo == 'pendentes':
+        return _iterar_tarefas(STATUS_PENDENTE, **filtros)
+    if tipo == 'atrasadas':
+        return _iterar_tarefas(verificar_atraso=True, **filtros)
+    return None
+
+
+def classificar_relatorios(tipos, responsavel_id=None, prazo_de=None, prazo_ate=None):
+    """
+    Gera as tarefas de VÁRIOS relatórios em uma única passada pelos dados.
+    
+    PARÂMETROS:
+        tipos (list): Tipos desejados (chaves de TIPOS_RELATORIO)
+        responsavel_id, prazo_de, prazo_ate: ver _filtrar_tarefas()
+    
+    RETORNO:
+        generator: Pares (tarefa, tipos_da_tarefa), onde tipos_da_tarefa
+                   são os tipos pedidos em que a tarefa entra (uma tarefa
+                   atrasada entra em 'pendentes' e em 'atrasadas')
+    
+    DESEMPENHO:
+        Com um único tipo, usa iterar_relatorio() (consulta indexada).
+        Com vários, lê as tarefas do responsável/período uma vez só e
+        classifica cada uma, em vez de uma consulta por relatório.
+    
+    ERROS:
+        ValueError: Se algum tipo for inválido ou as datas não estiverem
+                    em DD/MM/AAAA
+    """
+    tipos = list(dict.fromkeys(tipos))
+    invalidos = [tipo for tipo in tipos if tipo not in TIPOS_RELATORIO]
+    if invalidos or not tipos:
+        raise ValueError(f"Tipo de relatório inválido: {', '.join(invalidos) or 'nenhum'}")
+    filtros = {'responsavel_id': responsavel_id, 'prazo_de': prazo_de, 'prazo_ate': prazo_ate}
+    
+    if len(tipos) == 1:
+        return ((tarefa, tipos) for tarefa in iterar_relatorio(tipos[0], **filtros))
+    return _classificar(tipos, _iterar_tarefas(**filtros))
+
 
+def _classificar(tipos, tarefas):
+    """Gera (tarefa, tipos_da_tarefa) para classificar_relatorios()."""
+    hoje = ordinal_hoje()
+    concluidas = ['concluidas'] if 'concluidas' in tipos else []
+    pendentes = ['pendentes'] if 'pendentes' in tipos else []
+    atrasadas = pendentes + ['atrasadas'] if 'atrasadas' in tipos else pendentes
+    for tarefa in tarefas:
+        status = tarefa['status']
+        if status == STATUS_CONCLUIDA:
+            escolhidos = concluidas
+        elif status == STATUS_PENDENTE:
+            escolhidos = atrasadas if tarefa.prazo_vencido(hoje) else pendentes
+        else:
+            continue
+        if escolhidos:
+            yield tarefa, escolhidos
 
-def tarefas_concluidas():
+
+def tarefas_concluidas(responsavel_id=None, prazo_de=None, prazo_ate=None):
     """
     Retorna todas as tarefas com status 'Concluída'.
     
+    PARÂMETROS:
+        responsavel_id, prazo_de, prazo_ate (opcionais): ver _filtrar_tarefas()
+    
     RETORNO:
         list: Lista de tarefas concluídas
     
@@ -90,12 +272,16 @@ def tarefas_concluidas():
         - Histórico de tarefas finalizadas
         - Análise de desempenho
     """
-    return _filtrar_tarefas(STATUS_CONCLUIDA)
+    return _filtrar_tarefas(STATUS_CONCLUIDA, responsavel_id=responsavel_id,
+                            prazo_de=prazo_de, prazo_ate=prazo_ate)
 
-def tarefas_pendentes():
+def tarefas_pendentes(responsavel_id=None, prazo_de=None, prazo_ate=None):
     """
     Retorna todas as tarefas com status 'Pendente'.
     
+    PARÂMETROS:
+        responsavel_id, prazo_de, prazo_ate (opcionais): ver _filtrar_tarefas()
+    
     RETORNO:
         list: Lista de tarefas pendentes (não atrasadas)
     
@@ -104,12 +290,16 @@ def tarefas_pendentes():
         - Planejamento de atividades
         - Gestão de prioridades
     """
-    return _filtrar_tarefas(STATUS_PENDENTE)
+    return _filtrar_tarefas(STATUS_PENDENTE, responsavel_id=responsavel_id,
+                            prazo_de=prazo_de, prazo_ate=prazo_ate)
 
-def tarefas_atrasadas():
+def tarefas_atrasadas(responsavel_id=None, prazo_de=None, prazo_ate=None):
     """
     Retorna tarefas pendentes cujo prazo já venceu.
     
+    PARÂMETROS:
+        responsavel_id, prazo_de, prazo_ate (opcionais): ver _filtrar_tarefas()
+    
     RETORNO:
         list: Lista de tarefas atrasadas
     
@@ -122,7 +312,113 @@ def tarefas_atrasadas():
         - Alertas de atraso
         - Priorização de tarefas críticas
     """
-    return _filtrar_tarefas(verificar_atraso=True)
+    return _filtrar_tarefas(verificar_atraso=True, responsavel_id=responsavel_id,
+                            prazo_de=prazo_de, prazo_ate=prazo_ate)
+
+
+def relatorio(tipo, responsavel_id=None, prazo_de=None, prazo_ate=None):
+    """
+    Retorna as tarefas de um relatório pelo tipo (com cache).
+    
+    PARÂMETROS:
+        tipo (str): 'concluidas', 'pendentes' ou 'atrasadas'
+        responsavel_id, prazo_de, prazo_ate: ver _filtrar_tarefas()
+    
+    RETORNO:
+        list: Tarefas do relatório
+        None: Se o tipo for inválido
+    """
+    funcoes = {
+        'concluidas': tarefas_concluidas,
+        'pendentes': tarefas_pendentes,
+        'atrasadas': tarefas_atrasadas,
+    }
+    if tipo not in funcoes:
+        return None
+    return funcoes[tipo](responsavel_id=responsavel_id, prazo_de=prazo_de, prazo_ate=prazo_ate)
+
+
+def estatisticas_usuario(usuario_id):
+    """
+    Retorna os totais de tarefas de um usuário.
+    
+    PARÂMETROS:
+        usuario_id (int): ID do responsável
+    
+    RETORNO:
+        dict: {'total', 'concluidas', 'pendentes', 'atrasadas'}
+              (atrasadas também contam como pendentes)
+    
+    DESEMPENHO:
+        Usa os contadores mantidos pela camada de armazenamento a cada
+        alteração (contar_registros), sem percorrer as tarefas. A
+        contagem de atrasadas avança sozinha na virada do dia.
+    """
+    contagem = contar_registros(ARQUIVO_TAREFAS, usuario_id)
+    return {
+        'total': contagem['total'],
+        'concluidas': contagem['valores'].get(STATUS_CONCLUIDA, 0),
+        'pendentes': contagem['valores'].get(STATUS_PENDENTE, 0),
+        'atrasadas': contagem['atrasados']
+    }
+
+
+def tendencias(usuario_id, agrupar='dia', quantidade=None):
+    """
+    Retorna a produtividade de um usuário ao longo do tempo (gráficos).
+    
+    PARÂMETROS:
+        usuario_id (int): ID do responsável
+        agrupar (str): 'dia' ou 'semana' (semanas de segunda a domingo)
+        quantidade (int, opcional): Quantos períodos, terminando hoje
+                                    (padrão: 30 dias ou 12 semanas)
+    
+    RETORNO:
+        list: Um dicionário por período, do mais antigo ao atual:
+              {'inicio', 'fim' (DD/MM/AAAA), 'criadas', 'concluidas',
+               'atrasadas' (que passaram do prazo sem estar concluídas),
+               'tempo_medio_horas' (da criação à conclusão, das
+               concluídas no período; None se não houver)}
+    
+    DESEMPENHO:
+        Lê os totais por dia mantidos pela camada de armazenamento
+        (agregar_registros), atualizados a cada alteração de tarefa: o
+        custo é O(dias do intervalo), não importa quantas tarefas existam.
+    
+    ERROS:
+        ValueError: Se o agrupamento ou a quantidade forem inválidos
+    """
+    if agrupar not in AGRUPAMENTOS_TENDENCIA:
+        raise ValueError(f"Agrupamento inválido: {agrupar}. Use 'dia' ou 'semana'.")
+    tamanho, padrao = AGRUPAMENTOS_TENDENCIA[agrupar]
+    quantidade = padrao if quantidade is None else quantidade
+    if not 1 <= quantidade <= QUANTIDADE_MAXIMA_TENDENCIA:
+        raise ValueError(f"A quantidade deve estar entre 1 e {QUANTIDADE_MAXIMA_TENDENCIA}")
+    
+    hoje = ordinal_hoje()
+    # O último período contém hoje (ordinal 1 = uma segunda-feira)
+    ultimo = hoje - (hoje - 1) % 7 if agrupar == 'semana' else hoje
+    inicio = ultimo - (quantidade - 1) * tamanho
+    
+    totais = [[0, 0, 0, 0, 0] for _ in range(quantidade)]
+    for dia, vetor in agregar_registros(ARQUIVO_TAREFAS, usuario_id, desde=inicio, ate=hoje):
+        periodo = totais[(dia - inicio) // tamanho]
+        for i, valor in enumerate(vetor):
+            periodo[i] += valor
+    
+    resultado = []
+    for k, (criadas, concluidas, atrasadas, soma_tempo, quantidade_tempo) in enumerate(totais):
+        primeiro = inicio + k * tamanho
+        resultado.append({
+            'inicio': ordinal_para_data(primeiro),
+            'fim': ordinal_para_data(min(primeiro + tamanho - 1, hoje)),
+            'criadas': criadas,
+            'concluidas': concluidas,
+            'atrasadas': atrasadas,
+            'tempo_medio_horas': (round(soma_tempo / quantidade_tempo / 3600, 1)
+                                  if quantidade_tempo else None)
+        })
+    return resultado
 
 
 def exibir_relatorio(titulo, lista_tarefas):
@@ -164,31 +460,20 @@ def exportar_relatorio(titulo, lista_tarefas):
         - Nome: relatorio_<timestamp>.txt
         - Encoding: UTF-8
         - Localização: raiz do projeto
+        - Conteúdo: formato 'txt' de exportacoes.py
+    
+    OBSERVAÇÃO:
+        Grava na hora (a lista já está em memória). Para gerar sem
+        esperar, use exportacoes.enviar_exportacao(..., ['txt']).
     """
+    from exportacoes import partes_exportacao
+    
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     nome_arquivo = f"relatorio_{timestamp}.txt"
     
     try:
         with open(nome_arquivo, 'w', encoding='utf-8') as f:
-            f.write(f"{titulo}\n")
-            f.write("=" * 80 + "\n")
-            f.write(f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
-            f.write("=" * 80 + "\n\n")
-            
-            if not lista_tarefas:
-                f.write("Nenhuma tarefa encontrada.\n")
-            else:
-                for tarefa in lista_tarefas:
-                    f.write(f"ID: {tarefa['id']}\n")
-                    f.write(f"Título: {tarefa['titulo']}\n")
-                    f.write(f"Descrição: {tarefa['descrição']}\n")
-                    f.write(f"Prazo: {tarefa['prazo']}\n")
-                    f.write(f"Status: {tarefa['status']}\n")
-                    f.write(f"Responsável: {tarefa['responsavel_nome']}\n")
-                    f.write(f"Criado em: {tarefa['criacao']}\n")
-                    f.write("-" * 80 + "\n\n")
-                
-                f.write(f"Total de tarefas: {len(lista_tarefas)}\n")
+            f.writelines(partes_exportacao('txt', lista_tarefas, titulo))
         
         print(f"✓ Relatório exportado para: {nome_arquivo}")
         return True
@@ -6,126 +6,100 @@
 
 // ==================== VARIÁVEIS GLOBAIS ====================
 let currentTaskId = null;
-let currentFilter = 'all';
 let deleteTaskId = null;
+let searchTimer = null;
+let searchSequence = 0;
+let originalList = null;
 
 // ==================== FILTROS E BUSCA ====================
 
 /**
- * Define o filtro ativo
+ * Define o filtro de status ativo
+ * O filtro é aplicado no servidor: recarrega o painel com ?status=,
+ * mantendo a ordenação
  */
 function setFilter(filter) {
-    currentFilter = filter;
-    
-    // Atualiza botões ativos
-    document.querySelectorAll('.filter-buttons .filter-btn').forEach(btn => {
-        btn.classList.remove('active');
-    });
-    document.querySelector(`[data-filter="${filter}"]`).classList.add('active');
-    
-    // Aplica filtros
-    filterTasks();
+    reloadDashboard({ status: filter });
 }
 
 /**
- * Filtra tarefas por busca e status
+ * Busca tarefas pelo termo digitado (chamada a cada tecla)
+ * Espera o usuário parar de digitar por um instante antes de consultar
  */
 function filterTasks() {
-    const searchTerm = document.getElementById('searchInput')?.value.toLowerCase() || '';
-    const cards = document.querySelectorAll('.task-card');
-    let visibleCount = 0;
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(searchTasks, 250);
+}
+
+/**
+ * Busca no servidor (título e descrição, sem diferença de acentos) e
+ * mostra os resultados mais relevantes no lugar da lista
+ * Com o campo vazio, a lista original volta
+ */
+async function searchTasks() {
+    const grid = document.querySelector('.tasks-grid');
+    const button = document.getElementById('loadMoreBtn');
+    if (!grid || !button) return;
+    const term = document.getElementById('searchInput')?.value.trim() || '';
+    const sequence = ++searchSequence;
+    
+    // Guarda a lista original na primeira busca
+    if (originalList === null) {
+        originalList = { html: grid.innerHTML, cursor: button.getAttribute('data-cursor') };
+    }
     
-    cards.forEach(card => {
-        const titulo = card.getAttribute('data-titulo');
-        const status = card.getAttribute('data-status');
-        
-        // Verifica busca
-        const matchSearch = titulo.includes(searchTerm);
-        
-        // Verifica filtro
-        const matchFilter = currentFilter === 'all' || status === currentFilter;
-        
-        // Mostra/oculta card
-        if (matchSearch && matchFilter) {
-            card.style.display = 'block';
-            visibleCount++;
-        } else {
-            card.style.display = 'none';
-        }
-    });
+    if (!term) {
+        grid.innerHTML = originalList.html;
+        setLoadMore(originalList.cursor, '');
+        originalList = null;
+        return;
+    }
     
-    // Mostra mensagem se não houver resultados
-    const grid = document.querySelector('.tasks-grid');
-    let noResults = document.getElementById('noResults');
-    
-    if (visibleCount === 0 && grid) {
-        if (!noResults) {
-            noResults = document.createElement('div');
-            noResults.id = 'noResults';
-            noResults.className = 'empty-state';
-            noResults.innerHTML = `
+    const page = await loadTasks({ q: term }, '/api/tarefas/busca');
+    if (sequence !== searchSequence) return;  // chegou uma busca mais nova
+    
+    grid.innerHTML = page.tarefas.map(renderTaskCard).join('');
+    if (page.tarefas.length === 0) {
+        grid.innerHTML = `
+            <div id="noResults" class="empty-state">
                 <i class="fas fa-search"></i>
                 <h3>Nenhuma tarefa encontrada</h3>
-                <p>Tente ajustar os filtros ou termo de busca.</p>
-            `;
-            grid.appendChild(noResults);
-        }
-    } else if (noResults) {
-        noResults.remove();
+                <p>Tente outro termo de busca.</p>
+            </div>
+        `;
     }
+    setLoadMore(page.proximo_cursor, term);
+}
+
+/**
+ * Mostra ou esconde o botão "Carregar mais" com o cursor da próxima página
+ * (query preenchida = páginas da busca)
+ */
+function setLoadMore(cursor, query) {
+    const button = document.getElementById('loadMoreBtn');
+    button.setAttribute('data-cursor', cursor || '');
+    button.setAttribute('data-query', query);
+    button.disabled = false;
+    button.parentElement.style.display = cursor ? '' : 'none';
 }
 
 /**
  * Ordena tarefas
+ * A ordenação é feita no servidor (índices por usuário): recarrega o
+ * painel com ?sort=, mantendo o filtro de status
  */
 function sortTasks() {
     const select = document.getElementById('sortSelect');
-    const sortValue = select.value;
-    const grid = document.querySelector('.tasks-grid');
-    const cards = Array.from(document.querySelectorAll('.task-card'));
-    
-    cards.sort((a, b) => {
-        let aValue, bValue;
-        
-        switch(sortValue) {
-            case 'criacao-desc':
-                aValue = new Date(a.getAttribute('data-criacao').split(' ').reverse().join(' '));
-                bValue = new Date(b.getAttribute('data-criacao').split(' ').reverse().join(' '));
-                return bValue - aValue;
-            
-            case 'criacao-asc':
-                aValue = new Date(a.getAttribute('data-criacao').split(' ').reverse().join(' '));
-                bValue = new Date(b.getAttribute('data-criacao').split(' ').reverse().join(' '));
-                return aValue - bValue;
-            
-            case 'prazo-asc':
-                aValue = parseDateBR(a.getAttribute('data-prazo'));
-                bValue = parseDateBR(b.getAttribute('data-prazo'));
-                return aValue - bValue;
-            
-            case 'prazo-desc':
-                aValue = parseDateBR(a.getAttribute('data-prazo'));
-                bValue = parseDateBR(b.getAttribute('data-prazo'));
-                return bValue - aValue;
-            
-            case 'titulo-asc':
-                return a.getAttribute('data-titulo').localeCompare(b.getAttribute('data-titulo'));
-            
-            case 'titulo-desc':
-                return b.getAttribute('data-titulo').localeCompare(a.getAttribute('data-titulo'));
-        }
-    });
-    
-    // Reorganiza cards no DOM
-    cards.forEach(card => grid.appendChild(card));
+    reloadDashboard({ sort: select.value });
 }
 
 /**
- * Converte data BR para objeto Date
+ * Recarrega o painel trocando parâmetros da URL (sort, status)
  */
-function parseDateBR(dateStr) {
-    const parts = dateStr.split('/');
-    return new Date(parts[2], parts[1] - 1, parts[0]);
+function reloadDashboard(params) {
+    const url = new URL(window.location.href);
+    Object.entries(params).forEach(([key, value]) => url.searchParams.set(key, value));
+    window.location.href = url.toString();
 }
 
 // ==================== MODAL DE TAREFAS ====================
@@ -490,11 +464,6 @@ document.addEventListener('DOMContentLoaded', function() {
             navMenu.style.boxShadow = '';
         }
     });
-    
-    // Inicializa ordenação e filtros
-    if (document.getElementById('sortSelect')) {
-        sortTasks();
-    }
 });
 
 // ==================== ANIMAÇÕES E EFEITOS ====================
@@ -521,19 +490,114 @@ if (document.readyState === 'loading') {
 // ==================== FUNÇÕES AUXILIARES ====================
 
 /**
- * Carrega tarefas via API (para futuras implementações)
+ * Carrega uma página de tarefas via API
+ * options: { cursor, sort, status } ou { cursor, q } na busca
+ * Retorna { tarefas: [...], proximo_cursor: '...' | null }
  */
-async function loadTasks() {
+async function loadTasks(options = {}, endpoint = '/api/tarefas') {
+    const params = new URLSearchParams();
+    Object.entries(options).forEach(([key, value]) => {
+        if (value) params.set(key, value);
+    });
     try {
-        const response = await fetch('/api/tarefas');
+        const response = await fetch(`${endpoint}?${params}`);
         if (response.ok) {
-            const tasks = await response.json();
-            return tasks;
+            return await response.json();
         }
     } catch (error) {
         console.error('Erro ao carregar tarefas:', error);
-        return [];
     }
+    return { tarefas: [], proximo_cursor: null };
+}
+
+/**
+ * Busca a próxima página e adiciona os cards ao final da lista
+ */
+async function loadMoreTasks() {
+    const button = document.getElementById('loadMoreBtn');
+    const grid = document.querySelector('.tasks-grid');
+    if (!button || !grid) return;
+    
+    button.disabled = true;
+    const query = button.getAttribute('data-query');
+    const cursor = button.getAttribute('data-cursor');
+    const page = query
+        ? await loadTasks({ cursor, q: query }, '/api/tarefas/busca')
+        : await loadTasks({
+            cursor,
+            sort: button.getAttribute('data-sort'),
+            status: button.getAttribute('data-status')
+        });
+    page.tarefas.forEach(tarefa => {
+        grid.insertAdjacentHTML('beforeend', renderTaskCard(tarefa));
+    });
+    
+    // A ordem já vem do servidor (relevância, na busca)
+    setLoadMore(page.proximo_cursor, query);
+}
+
+/**
+ * Escapa texto para uso em HTML (conteúdo e atributos)
+ */
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text == null ? '' : String(text);
+    return div.innerHTML.replace(/"/g, '&quot;').replace(/'/g, '&#39;');
+}
+
+/**
+ * Monta o card de uma tarefa (mesmo HTML de templates/dashboard.html)
+ */
+function renderTaskCard(tarefa) {
+    const concluida = tarefa.status === 'Concluída';
+    const atrasada = !concluida && isOverdue(tarefa.prazo, tarefa.status);
+    const status = concluida ? 'concluida' : (atrasada ? 'atrasada' : 'pendente');
+    const cardClass = concluida ? 'task-completed' : (atrasada ? 'task-overdue' : '');
+    const statusClass = concluida ? 'status-completed' : (atrasada ? 'status-overdue' : 'status-pending');
+    const statusLabel = concluida
+        ? '<i class="fas fa-check-circle"></i> Concluída'
+        : (atrasada ? '<i class="fas fa-exclamation-triangle"></i> Atrasada' : '<i class="fas fa-clock"></i> Pendente');
+    // Argumentos dos onclick como JSON (aspas e quebras de linha seguras)
+    const args = (...values) => escapeHtml(values.map(v => JSON.stringify(v == null ? '' : v)).join(', '));
+    
+    return `
+        <div class="task-card ${cardClass}"
+             data-status="${status}"
+             data-titulo="${escapeHtml((tarefa.titulo || '').toLowerCase())}"
+             data-prazo="${escapeHtml(tarefa.prazo)}"
+             data-criacao="${escapeHtml(tarefa.criacao)}">
+            <div class="task-header">
+                <h3>${escapeHtml(tarefa.titulo)}</h3>
+                <span class="task-status ${statusClass}">${statusLabel}</span>
+            </div>
+            
+            <p class="task-description">${escapeHtml(tarefa['descrição'])}</p>
+            
+            <div class="task-meta">
+                <span class="task-deadline">
+                    <i class="fas fa-calendar"></i> ${escapeHtml(tarefa.prazo)}
+                </span>
+                <span class="task-created">
+                    <i class="fas fa-clock"></i> Criada em: ${escapeHtml(tarefa.criacao)}
+                </span>
+            </div>
+
+            <div class="task-actions">
+                <button class="btn btn-sm btn-info" onclick="viewTaskDetails(${args(tarefa.id, tarefa.titulo, tarefa['descrição'], tarefa.prazo, tarefa.criacao, tarefa.status)})">
+                    <i class="fas fa-eye"></i> Ver
+                </button>
+                ${concluida ? '' : `
+                <button class="btn btn-sm btn-success" onclick="completeTask(${args(tarefa.id)})">
+                    <i class="fas fa-check"></i> Concluir
+                </button>
+                <button class="btn btn-sm btn-secondary" onclick="editTask(${args(tarefa.id, tarefa.titulo, tarefa['descrição'], tarefa.prazo)})">
+                    <i class="fas fa-edit"></i> Editar
+                </button>`}
+                <button class="btn btn-sm btn-danger" onclick="confirmDelete(${args(tarefa.id, tarefa.titulo)})">
+                    <i class="fas fa-trash"></i> Excluir
+                </button>
+            </div>
+        </div>`;
 }
 
 /**
@@ -572,15 +636,39 @@ function formatDate(dateStr) {
 // ==================== EXPORTAÇÃO ====================
 
 /**
- * Prepara dados para exportação
+ * Gera relatórios em segundo plano (fila de exportações do servidor)
+ * e baixa o resultado quando fica pronto
  */
-function exportData(format = 'json') {
-    if (format === 'json') {
-        // Implementar exportação JSON
-        console.log('Exportando para JSON...');
-    } else if (format === 'csv') {
-        // Implementar exportação CSV
-        console.log('Exportando para CSV...');
+async function exportInBackground(button, tipos, formatos) {
+    const { de, ate } = button.dataset;
+    button.disabled = true;
+    showToast('Gerando relatórios...', 'info');
+    
+    try {
+        let response = await fetch('/api/exportacoes', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ tipos, formatos, de, ate })
+        });
+        let trabalho = await response.json();
+        
+        // Consulta a situação até a exportação terminar
+        while (response.ok && (trabalho.situacao === 'na_fila' || trabalho.situacao === 'processando')) {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            response = await fetch(trabalho.url_situacao);
+            trabalho = await response.json();
+        }
+        
+        if (response.ok && trabalho.situacao === 'concluida') {
+            window.location.href = trabalho.url_arquivo;
+            showToast('Relatórios prontos!', 'success');
+        } else {
+            showToast(trabalho.erro || 'Erro ao exportar relatórios', 'error');
+        }
+    } catch (error) {
+        showToast('Erro de conexão', 'error');
+    } finally {
+        button.disabled = false;
     }
 }
 
@@ -20,11 +20,18 @@ STATUS DE TAREFAS:
     - Concluída: Tarefa finalizada pelo responsável
     - Atrasada: Tarefa pendente com prazo vencido (calculado dinamicamente)
 
+QUEM EXECUTA A AÇÃO (parâmetro 'usuario'):
+    As funções recebem o usuário que está agindo ({'id', 'nome', ...}).
+    O servidor web passa o usuário da sessão de cada requisição, então
+    requisições simultâneas (threads ou vários workers) nunca se
+    misturam. Sem o parâmetro vale o usuário logado no terminal
+    (usuarios.get_usuario_logado()), usado pelo main.py.
+
 REGRAS DE NEGÓCIO:
     - Apenas o responsável pode editar/concluir/excluir suas tarefas
     - Datas devem estar no formato DD/MM/AAAA
     - Cada tarefa possui ID único auto-incrementado
-    - Registro automático de data/hora de criação
+    - Registro automático de data/hora de criação e de conclusão
 
 IMPORTANTE PARA APRESENTAÇÃO:
     Este módulo demonstra o padrão CRUD (Create, Read, Update, Delete),
@@ -33,7 +40,13 @@ IMPORTANTE PARA APRESENTAÇÃO:
 """
 
 from datetime import datetime
-from utils.arquivos import ler_dados, salvar_dados, ARQUIVO_TAREFAS
+from utils.arquivos import (
+    ler_dados, salvar_dados, inserir_registro, atualizar_registro,
+    remover_registro, consultar_registros, obter_registro, paginar_registros,
+    buscar_registros, ARQUIVO_TAREFAS
+)
+from utils.datas import ordinal_hoje
+from utils.paginacao import codificar_cursor, decodificar_cursor, TAMANHO_PAGINA
 from usuarios import get_usuario_logado
 
 # Constantes para Status da Tarefa (evita erros de digitação)
@@ -41,6 +54,25 @@ STATUS_PENDENTE = "Pendente"
 STATUS_CONCLUIDA = "Concluída"
 STATUS_ATRASADA = "Atrasada"
 
+# Ordenações da listagem paginada: nome -> (campo, decrescente)
+ORDENS = {
+    'criacao-desc': ('criacao', True),     # Mais recentes
+    'criacao-asc': ('criacao', False),     # Mais antigas
+    'prazo-asc': ('prazo', False),         # Prazo mais próximo
+    'prazo-desc': ('prazo', True),         # Prazo mais distante
+    'titulo-asc': ('titulo', False),       # Título A-Z
+    'titulo-desc': ('titulo', True),       # Título Z-A
+}
+ORDEM_PADRAO = 'criacao-desc'
+
+# Filtros de status da listagem paginada: nome -> critérios da consulta
+# (recebe o ordinal de hoje, pois "atrasada" depende da data)
+FILTROS_STATUS = {
+    'pendente': lambda hoje: {'status': STATUS_PENDENTE, 'prazo_desde': hoje},
+    'atrasada': lambda hoje: {'status': STATUS_PENDENTE, 'prazo_antes': hoje},
+    'concluida': lambda hoje: {'status': STATUS_CONCLUIDA},
+}
+
 
 def _carregar_tarefas():
     """
@@ -61,10 +93,41 @@ def _salvar_tarefas(tarefas):
     RETORNO:
         bool: True se salvou com sucesso, False caso contrário
     """
-    return salvar_dados(ARQUIVO_TAREFAS, tarefas)
+    salvou = salvar_dados(ARQUIVO_TAREFAS, tarefas)
+    _tarefas_alteradas()
+    return salvou
+
+
+def _ator(usuario):
+    """
+    Retorna quem está executando a ação.
+    
+    PARÂMETROS:
+        usuario (dict, opcional): Usuário informado pelo chamador (ex: o
+                                  da sessão Flask, em app.py)
+    
+    RETORNO:
+        dict: O usuário informado ou, se None, o usuário logado no
+              terminal (main.py); None se não houver nenhum
+    """
+    return usuario if usuario is not None else get_usuario_logado()
 
 
-def criar_tarefa(titulo, descricao, prazo_str):
+def _tarefas_alteradas(responsavel_id=None):
+    """
+    Avisa que tarefas mudaram: descarta os relatórios guardados em cache
+    (relatorios.py) que possam ter ficado desatualizados.
+    
+    PARÂMETROS:
+        responsavel_id (int, opcional): Dono das tarefas alteradas;
+                                        None = todas podem ter mudado
+    """
+    # Importação tardia: relatorios.py importa este módulo
+    from relatorios import invalidar_cache_relatorios
+    invalidar_cache_relatorios(responsavel_id)
+
+
+def criar_tarefa(titulo, descricao, prazo_str, usuario=None):
     """
     Cria uma nova tarefa no sistema (CREATE do CRUD).
     
@@ -72,6 +135,8 @@ def criar_tarefa(titulo, descricao, prazo_str):
         titulo (str): Título resumido da tarefa
         descricao (str): Descrição detalhada do que deve ser feito
         prazo_str (str): Data limite no formato DD/MM/AAAA
+        usuario (dict, opcional): Responsável pela nova tarefa;
+                                  None = usuário logado no terminal
     
     RETORNO:
         bool: True se criou com sucesso, False se houve erro
@@ -79,9 +144,9 @@ def criar_tarefa(titulo, descricao, prazo_str):
     PROCESSO:
         1. Valida se há usuário logado (responsável)
         2. Valida o formato da data do prazo
-        3. Gera ID único auto-incrementado
+        3. Gera ID único auto-incrementado (com o arquivo travado)
         4. Cria registro com todos os dados
-        5. Salva no arquivo JSON
+        5. Salva no arquivo JSON (apenas o novo registro, via inserir_registro)
     
     ESTRUTURA DA TAREFA:
         - id: Identificador único
@@ -93,7 +158,7 @@ def criar_tarefa(titulo, descricao, prazo_str):
         - status: Sempre inicia como "Pendente"
         - criacao: Data/hora da criação (timestamp)
     """
-    usuario = get_usuario_logado()
+    usuario = _ator(usuario)
     if not usuario:
         print("Erro: Nenhum usuário logado para criar a tarefa.")
         return False
@@ -105,10 +170,8 @@ def criar_tarefa(titulo, descricao, prazo_str):
         print("Erro: Formato de prazo inválido. Use DD/MM/AAAA.")
         return False
 
-    tarefas = _carregar_tarefas()
-    
     nova_tarefa = {
-        'id': len(tarefas) + 1,
+        'id': None,  # Gerado por inserir_registro() com o arquivo travado
         'titulo': titulo,
         'descrição': descricao,
         'responsavel_id': usuario['id'],
@@ -118,20 +181,23 @@ def criar_tarefa(titulo, descricao, prazo_str):
         'criacao': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
     }
     
-    tarefas.append(nova_tarefa)
-    if _salvar_tarefas(tarefas):
+    nova_tarefa = inserir_registro(ARQUIVO_TAREFAS, nova_tarefa)
+    if nova_tarefa:
+        _tarefas_alteradas(usuario['id'])
         print(f"Tarefa '{titulo}' criada com sucesso! ID: {nova_tarefa['id']}")
         return True
     return False
 
 
-def listar_tarefas(filtrar_por_responsavel=True):
+def listar_tarefas(filtrar_por_responsavel=True, usuario=None):
     """
     Lista tarefas do sistema (READ do CRUD).
     
     PARÂMETROS:
         filtrar_por_responsavel (bool): Se True, mostra apenas tarefas do usuário logado
                                        Se False, mostra todas as tarefas
+        usuario (dict, opcional): Quem executa a ação ({'id', 'nome', ...});
+                                  None = usuário logado no terminal
     
     RETORNO:
         list: Lista de tarefas filtradas
@@ -146,63 +212,153 @@ def listar_tarefas(filtrar_por_responsavel=True):
         - Altera o status visualmente (não modifica o arquivo)
         - Apenas tarefas "Pendente" podem aparecer como "Atrasada"
     """
-    tarefas = _carregar_tarefas()
-    usuario = get_usuario_logado()
+    usuario = _ator(usuario)
     
     if filtrar_por_responsavel and usuario:
-        tarefas_filtradas = [t for t in tarefas if t['responsavel_id'] == usuario['id']]
+        # Consulta apenas as tarefas do usuário (indexada no modo SQLite)
+        tarefas_filtradas = consultar_registros(ARQUIVO_TAREFAS, responsavel_id=usuario['id'])
     else:
-        tarefas_filtradas = tarefas
+        tarefas_filtradas = _carregar_tarefas()
         
     if not tarefas_filtradas:
         print("Nenhuma tarefa encontrada.")
         return []
         
     print("\n--- Lista de Tarefas ---")
+    hoje = ordinal_hoje()
     for t in tarefas_filtradas:
-        # Verifica se a tarefa está atrasada
+        # Verifica se a tarefa está atrasada (prazo já convertido na leitura;
+        # prazo em formato inválido nunca vence)
         status = t['status']
-        if status == STATUS_PENDENTE:
-            try:
-                prazo_dt = datetime.strptime(t['prazo'], '%d/%m/%Y')
-                if prazo_dt < datetime.now().replace(hour=0, minute=0, second=0, microsecond=0):
-                    status = STATUS_ATRASADA
-            except ValueError:
-                pass # Ignora se o formato da data estiver errado
+        if status == STATUS_PENDENTE and t.prazo_vencido(hoje):
+            status = STATUS_ATRASADA
         
         print(f"ID: {t['id']} | Título: {t['titulo']} | Prazo: {t['prazo']} | Status: {status} | Responsável: {t['responsavel_nome']}")
         
     return tarefas_filtradas
 
 
-def _encontrar_tarefa(tarefas, tarefa_id):
+def listar_pagina_tarefas(limite=TAMANHO_PAGINA, cursor=None, ordem=ORDEM_PADRAO, status=None,
+                          usuario=None):
     """
-    Função auxiliar para localizar uma tarefa específica pelo ID.
+    Lista UMA página das tarefas do usuário logado, já filtrada e ordenada.
+    
+    PARÂMETROS:
+        limite (int): Quantidade máxima de tarefas na página
+        cursor (str, opcional): 'proximo_cursor' devolvido pela página
+                                anterior (None = primeira página)
+        ordem (str): Uma das chaves de ORDENS (ex: 'prazo-asc')
+        status (str, opcional): Uma das chaves de FILTROS_STATUS
+                                ('pendente', 'concluida', 'atrasada');
+                                None = todas
+        usuario (dict, opcional): Quem executa a ação ({'id', 'nome', ...});
+                                  None = usuário logado no terminal
+    
+    RETORNO:
+        tuple: (tarefas da página, cursor da próxima página ou None se
+               esta for a última)
+    
+    ERROS:
+        ValueError: Se a ordem, o status ou o cursor forem inválidos (o
+                    cursor só vale para a mesma ordem e status)
+    
+    OBSERVAÇÃO:
+        A ordenação vem dos índices mantidos pelo armazenamento (ver
+        arquivos.paginar_registros()): buscar as N primeiras não ordena
+        todas as tarefas do usuário. A paginação é por chave, então
+        tarefas criadas ou excluídas enquanto o usuário navega não fazem
+        outras se repetirem ou sumirem entre as páginas.
+    """
+    if ordem not in ORDENS:
+        raise ValueError(f'Ordenação inválida: {ordem}')
+    if status is not None and status not in FILTROS_STATUS:
+        raise ValueError(f'Status inválido: {status}')
+    usuario = _ator(usuario)
+    if not usuario:
+        return [], None
+    
+    apos = None
+    if cursor:
+        posicao = decodificar_cursor(cursor)
+        if posicao.get('o') != ordem or posicao.get('s') != status or 'p' not in posicao:
+            raise ValueError('Cursor de paginação inválido')
+        apos = posicao['p']
+    
+    campo, decrescente = ORDENS[ordem]
+    criterios = {'responsavel_id': usuario['id']}
+    if status is not None:
+        criterios.update(FILTROS_STATUS[status](ordinal_hoje()))
+    tarefas, proxima = paginar_registros(ARQUIVO_TAREFAS, apos, limite, decrescente,
+                                         ordenar_por=campo, **criterios)
+    if proxima is None:
+        return tarefas, None
+    return tarefas, codificar_cursor({'p': proxima, 'o': ordem, 's': status})
+
+
+def buscar_tarefas(consulta, limite=TAMANHO_PAGINA, cursor=None, usuario=None):
+    """
+    Busca textual nas tarefas do usuário logado (título e descrição).
+    
+    PARÂMETROS:
+        consulta (str): Texto digitado; acentos e maiúsculas não importam
+                        e cada palavra pode ser só o começo ('rel' acha
+                        'Relatório')
+        limite (int): Quantidade máxima de tarefas na página
+        cursor (str, opcional): 'proximo_cursor' da página anterior
+        usuario (dict, opcional): Quem executa a ação ({'id', 'nome', ...});
+                                  None = usuário logado no terminal
+    
+    RETORNO:
+        tuple: (tarefas da página, da mais relevante para a menos
+               relevante; cursor da próxima página ou None)
+    
+    ERROS:
+        ValueError: Se o cursor for inválido (ele só vale para a mesma
+                    consulta)
+    """
+    usuario = _ator(usuario)
+    if not usuario or not consulta or not consulta.strip():
+        return [], None
+    
+    apos = None
+    if cursor:
+        posicao = decodificar_cursor(cursor)
+        if posicao.get('q') != consulta or 'p' not in posicao:
+            raise ValueError('Cursor de paginação inválido')
+        apos = posicao['p']
+    
+    tarefas, proxima = buscar_registros(ARQUIVO_TAREFAS, consulta, apos, limite,
+                                        responsavel_id=usuario['id'])
+    if proxima is None:
+        return tarefas, None
+    return tarefas, codificar_cursor({'p': proxima, 'q': consulta})
+
+
+def _obter_tarefa(tarefa_id):
+    """
+    Busca uma tarefa pelo ID diretamente no armazenamento.
     
     PARÂMETROS:
-        tarefas (list): Lista de tarefas onde buscar
         tarefa_id: ID da tarefa (será convertido para int)
     
     RETORNO:
         dict: Dicionário da tarefa encontrada
         None: Se não encontrar ou se o ID for inválido
     
-    USO:
-        Centraliza a lógica de busca para evitar repetição de código
-        nas funções de editar, concluir e excluir.
+    DESEMPENHO:
+        Não percorre a lista de tarefas: usa o índice por ID do
+        armazenamento (O(1)), então editar, concluir e excluir não ficam
+        mais lentos conforme o número de tarefas cresce.
     """
     try:
         tarefa_id = int(tarefa_id)
     except ValueError:
         return None
-        
-    for t in tarefas:
-        if t['id'] == tarefa_id:
-            return t
-    return None
+    return obter_registro(ARQUIVO_TAREFAS, tarefa_id)
 
 
-def editar_tarefa(tarefa_id, novo_titulo=None, nova_descricao=None, novo_prazo_str=None):
+def editar_tarefa(tarefa_id, novo_titulo=None, nova_descricao=None, novo_prazo_str=None,
+                  usuario=None):
     """
     Edita informações de uma tarefa existente (UPDATE do CRUD).
     
@@ -211,6 +367,8 @@ def editar_tarefa(tarefa_id, novo_titulo=None, nova_descricao=None, novo_prazo_s
         novo_titulo (str, opcional): Novo título (None = não altera)
         nova_descricao (str, opcional): Nova descrição (None = não altera)
         novo_prazo_str (str, opcional): Novo prazo DD/MM/AAAA (None = não altera)
+        usuario (dict, opcional): Quem executa a ação ({'id', 'nome', ...});
+                                  None = usuário logado no terminal
     
     RETORNO:
         bool: True se editou com sucesso, False se houve erro
@@ -225,36 +383,35 @@ def editar_tarefa(tarefa_id, novo_titulo=None, nova_descricao=None, novo_prazo_s
         - Usuário logado deve ser o responsável
         - Data deve estar no formato correto
     """
-    tarefas = _carregar_tarefas()
-    tarefa = _encontrar_tarefa(tarefas, tarefa_id)
-    usuario = get_usuario_logado()
+    tarefa = _obter_tarefa(tarefa_id)
+    usuario = _ator(usuario)
 
     if not tarefa:
         print(f"Erro: Tarefa com ID {tarefa_id} não encontrada.")
         return False
         
     # Permite edição apenas se o usuário logado for o responsável
-    if tarefa['responsavel_id'] != usuario['id']:
+    if not usuario or tarefa['responsavel_id'] != usuario['id']:
         print("Erro: Você só pode editar tarefas que você é o responsável.")
         return False
 
-    modificado = False
+    # Reúne apenas os campos alterados (gravados de uma vez só)
+    alteracoes = {}
     if novo_titulo:
-        tarefa['titulo'] = novo_titulo
-        modificado = True
+        alteracoes['titulo'] = novo_titulo
     if nova_descricao:
-        tarefa['descrição'] = nova_descricao
-        modificado = True
+        alteracoes['descrição'] = nova_descricao
     if novo_prazo_str:
         try:
             # Validação básica do formato da data
-            tarefa['prazo'] = datetime.strptime(novo_prazo_str, '%d/%m/%Y').strftime('%d/%m/%Y')
-            modificado = True
+            alteracoes['prazo'] = datetime.strptime(novo_prazo_str, '%d/%m/%Y').strftime('%d/%m/%Y')
         except ValueError:
             print("Erro: Formato de prazo inválido. Use DD/MM/AAAA. Nenhuma alteração feita no prazo.")
             return False
 
-    if modificado and _salvar_tarefas(tarefas):
+    modificado = bool(alteracoes)
+    if modificado and atualizar_registro(ARQUIVO_TAREFAS, tarefa['id'], alteracoes):
+        _tarefas_alteradas(tarefa['responsavel_id'])
         print(f"Tarefa ID {tarefa_id} atualizada com sucesso.")
         return True
     elif not modificado:
@@ -263,12 +420,14 @@ def editar_tarefa(tarefa_id, novo_titulo=None, nova_descricao=None, novo_prazo_s
     return False
 
 
-def concluir_tarefa(tarefa_id):
+def concluir_tarefa(tarefa_id, usuario=None):
     """
     Marca uma tarefa como concluída (atualização de status).
     
     PARÂMETROS:
         tarefa_id (int): ID da tarefa a ser concluída
+        usuario (dict, opcional): Quem executa a ação ({'id', 'nome', ...});
+                                  None = usuário logado no terminal
     
     RETORNO:
         bool: True se concluiu com sucesso, False se houve erro
@@ -276,28 +435,33 @@ def concluir_tarefa(tarefa_id):
     REGRAS DE NEGÓCIO:
         - Apenas o responsável pode concluir sua tarefa
         - Muda status de "Pendente" para "Concluída"
+        - Grava a data/hora da conclusão ('conclusao', DD/MM/AAAA HH:MM:SS),
+          base das tendências de produtividade (relatorios.tendencias())
         - Se já estiver concluída, apenas informa ao usuário
     
     VALIDAÇÕES:
         - Tarefa deve existir
         - Usuário logado deve ser o responsável
     """
-    tarefas = _carregar_tarefas()
-    tarefa = _encontrar_tarefa(tarefas, tarefa_id)
-    usuario = get_usuario_logado()
+    tarefa = _obter_tarefa(tarefa_id)
+    usuario = _ator(usuario)
 
     if not tarefa:
         print(f"Erro: Tarefa com ID {tarefa_id} não encontrada.")
         return False
         
     # Permite conclusão apenas se o usuário logado for o responsável
-    if tarefa['responsavel_id'] != usuario['id']:
+    if not usuario or tarefa['responsavel_id'] != usuario['id']:
         print("Erro: Você só pode concluir tarefas que você é o responsável.")
         return False
 
     if tarefa['status'] != STATUS_CONCLUIDA:
-        tarefa['status'] = STATUS_CONCLUIDA
-        if _salvar_tarefas(tarefas):
+        alteracoes = {
+            'status': STATUS_CONCLUIDA,
+            'conclusao': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+        }
+        if atualizar_registro(ARQUIVO_TAREFAS, tarefa['id'], alteracoes):
+            _tarefas_alteradas(tarefa['responsavel_id'])
             print(f"Tarefa ID {tarefa_id} marcada como '{STATUS_CONCLUIDA}'.")
             return True
     else:
@@ -306,12 +470,14 @@ def concluir_tarefa(tarefa_id):
     return False
 
 
-def excluir_tarefa(tarefa_id):
+def excluir_tarefa(tarefa_id, usuario=None):
     """
     Remove uma tarefa do sistema (DELETE do CRUD).
     
     PARÂMETROS:
         tarefa_id (int): ID da tarefa a ser excluída
+        usuario (dict, opcional): Quem executa a ação ({'id', 'nome', ...});
+                                  None = usuário logado no terminal
     
     RETORNO:
         bool: True se excluiu com sucesso, False se houve erro
@@ -329,21 +495,20 @@ def excluir_tarefa(tarefa_id):
         Não há confirmação adicional. Uma vez executada, a tarefa
         é removida permanentemente do sistema.
     """
-    tarefas = _carregar_tarefas()
-    tarefa = _encontrar_tarefa(tarefas, tarefa_id)
-    usuario = get_usuario_logado()
+    tarefa = _obter_tarefa(tarefa_id)
+    usuario = _ator(usuario)
 
     if not tarefa:
         print(f"Erro: Tarefa com ID {tarefa_id} não encontrada.")
         return False
         
     # Permite exclusão apenas se o usuário logado for o responsável
-    if tarefa['responsavel_id'] != usuario['id']: 
+    if not usuario or tarefa['responsavel_id'] != usuario['id']: 
         print("Erro: Você só pode excluir tarefas que você é o responsável.")
         return False
 
-    tarefas.remove(tarefa) # Remove a tarefa da lista
-    if _salvar_tarefas(tarefas):
+    if remover_registro(ARQUIVO_TAREFAS, tarefa['id']):
+        _tarefas_alteradas(tarefa['responsavel_id'])
         print(f"Tarefa ID {tarefa_id} excluída com sucesso.")
         return True
     return False
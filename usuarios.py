@@ -11,7 +11,7 @@ FUNCIONALIDADES PRINCIPAIS:
     - Cadastro de novos usuários
     - Login com autenticação segura (hash SHA256)
     - Logout do sistema
-    - Controle de sessão (usuário logado)
+    - Controle de sessão (usuário logado) da linha de comando
     - Busca de usuários por ID
 
 SEGURANÇA:
@@ -29,9 +29,13 @@ IMPORTANTE PARA APRESENTAÇÃO:
 """
 
 import hashlib
-from utils.arquivos import ler_dados, salvar_dados, ARQUIVO_USUARIOS
-# Variável global para simular o usuário logado (sessão)
-# Em um sistema real, isso seria gerenciado por sessões web ou tokens
+from utils.arquivos import (
+    ler_dados, salvar_dados, inserir_registro, obter_registro,
+    consultar_registros, transacao, ARQUIVO_USUARIOS
+)
+# Variável global para simular o usuário logado (sessão) na linha de comando
+# (main.py). O servidor web NÃO a usa: cada requisição passa o usuário da
+# sua própria sessão Flask para as funções de tarefas.py
 USUARIO_LOGADO = None
 
 
@@ -92,43 +96,67 @@ def cadastrar_usuario(nome, email, login, senha):
         bool: True se cadastrou com sucesso, False se login já existe
     
     PROCESSO:
-        1. Carrega lista de usuários existentes
+        1. Trava o arquivo de usuários (evita cadastros simultâneos)
         2. Verifica se o login já está em uso (deve ser único)
         3. Cria novo usuário com ID auto-incrementado
         4. Gera hash da senha (nunca salva senha em texto puro)
-        5. Adiciona à lista e salva no arquivo
+        5. Salva o novo registro no arquivo
     
     VALIDAÇÕES:
         - Login deve ser único no sistema
         - Senha é automaticamente criptografada com SHA256
     """
-    usuarios = _carregar_usuarios()
-    
-    # 1. Verificar unicidade do login
-    if any(u['login'] == login for u in usuarios):
-        print(f"Erro: O login '{login}' já está em uso.")
-        return False
-    
-    # 2. Criar o novo usuário
-    novo_usuario = {
-        'id': len(usuarios) + 1,  # ID simples baseado no tamanho da lista
-        'nome': nome,
-        'email': email,
-        'login': login,
-        'senha_hash': _hash_senha(senha)  # Armazena o hash da senha
-    }
-    
-    # 3. Adicionar e salvar
-    usuarios.append(novo_usuario)
-    if _salvar_usuarios(usuarios):
-        print(f"Usuário '{login}' cadastrado com sucesso!")
-        return True
+    # A verificação e a gravação acontecem com o arquivo travado, para que
+    # dois cadastros simultâneos não usem o mesmo login
+    with transacao(ARQUIVO_USUARIOS):
+        # 1. Verificar unicidade do login
+        if consultar_registros(ARQUIVO_USUARIOS, login=login):
+            print(f"Erro: O login '{login}' já está em uso.")
+            return False
+        
+        # 2. Criar o novo usuário
+        novo_usuario = {
+            'id': None,  # Gerado por inserir_registro() (maior ID + 1)
+            'nome': nome,
+            'email': email,
+            'login': login,
+            'senha_hash': _hash_senha(senha)  # Armazena o hash da senha
+        }
+        
+        # 3. Salvar (apenas o novo registro)
+        if inserir_registro(ARQUIVO_USUARIOS, novo_usuario):
+            print(f"Usuário '{login}' cadastrado com sucesso!")
+            return True
     return False
 
 
+def verificar_credenciais(login, senha):
+    """
+    Confere login e senha SEM alterar o usuário logado.
+    
+    PARÂMETROS:
+        login (str): Login do usuário
+        senha (str): Senha em texto puro (será comparada via hash)
+    
+    RETORNO:
+        dict: Dados do usuário (sem o hash da senha) se estiverem corretos
+        None: Se login ou senha estiverem incorretos
+    
+    USO:
+        Login do servidor web: o usuário vai para a sessão Flask da
+        requisição, e não para a variável global USUARIO_LOGADO (que
+        seria compartilhada por todas as requisições do processo).
+    """
+    senha_hash = _hash_senha(senha)
+    for usuario in consultar_registros(ARQUIVO_USUARIOS, login=login):
+        if usuario['senha_hash'] == senha_hash:
+            return {k: v for k, v in usuario.items() if k != 'senha_hash'}
+    return None
+
+
 def autenticar_usuario(login, senha):
     """
-    Realiza o login do usuário no sistema.
+    Realiza o login do usuário no sistema (linha de comando).
     
     PARÂMETROS:
         login (str): Login do usuário
@@ -139,9 +167,9 @@ def autenticar_usuario(login, senha):
         None: Se login ou senha estiverem incorretos
     
     PROCESSO DE AUTENTICAÇÃO:
-        1. Carrega todos os usuários
+        1. Busca o usuário pelo login (consulta indexada no modo SQLite)
         2. Gera o hash da senha fornecida
-        3. Procura usuário com login e hash correspondentes
+        3. Confere se o hash corresponde ao armazenado
         4. Se encontrar, define como usuário logado (sessão)
         5. Remove dados sensíveis antes de retornar
     
@@ -151,16 +179,11 @@ def autenticar_usuario(login, senha):
         - Mensagem de erro genérica (não indica se login ou senha está errado)
     """
     global USUARIO_LOGADO
-    usuarios = _carregar_usuarios()
-    senha_hash = _hash_senha(senha)
-    
-    for usuario in usuarios:
-        if usuario['login'] == login and usuario['senha_hash'] == senha_hash:
-            # Remove o hash da senha antes de definir como logado
-            usuario_logado = {k: v for k, v in usuario.items() if k != 'senha_hash'}
-            USUARIO_LOGADO = usuario_logado
-            print(f"Bem-vindo(a), {usuario_logado['nome']}!")
-            return usuario_logado
+    usuario_logado = verificar_credenciais(login, senha)
+    if usuario_logado:
+        USUARIO_LOGADO = usuario_logado
+        print(f"Bem-vindo(a), {usuario_logado['nome']}!")
+        return usuario_logado
             
     print("Erro: Login ou senha inválidos.")
     return None
@@ -212,8 +235,4 @@ def get_usuario_por_id(user_id):
         Útil para relatórios e exibição de informações de responsáveis
         por tarefas, mesmo que não estejam logados.
     """
-    usuarios = _carregar_usuarios()
-    for usuario in usuarios:
-        if usuario['id'] == user_id:
-            return usuario
-    return None
+    return obter_registro(ARQUIVO_USUARIOS, user_id)
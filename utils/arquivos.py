@@ -12,6 +12,62 @@ FUNCIONALIDADES PRINCIPAIS:
     - Ler dados de arquivos JSON (com tratamento de erros)
     - Salvar dados em arquivos JSON (formatados e com UTF-8)
     - Garantir integridade dos dados mesmo em primeira execução
+    - Registrar alterações individuais (inserir/atualizar/remover registro)
+    - Modo journal: cada alteração vira UMA linha anexada a um arquivo de
+      log, compactado periodicamente em um snapshot JSON
+    - Cache em memória: os dados ficam carregados no processo e só são
+      relidos do disco quando outro processo altera o arquivo
+    - Segurança entre processos: travas de arquivo ('<arquivo>.lock') em
+      toda alteração e gravação atômica (arquivo temporário + rename)
+
+MODOS DE ARMAZENAMENTO (variável de ambiente TASKFLOW_ARMAZENAMENTO):
+    - 'json' (padrão): cada alteração regrava o arquivo JSON completo
+    - 'journal': cada alteração é anexada a '<arquivo>.journal' (custo O(1))
+      e o snapshot '<arquivo>' só é regravado na compactação
+    Nos dois (e em cada shard), a alteração é aplicada aos dados em memória
+    por _aplicar_operacao(): os índices (ID, prazo, campos, ordenação,
+    texto) e os contadores são atualizados, nunca recalculados do zero.
+    - 'sqlite': usuários e tarefas ficam em um banco SQLite com índices
+      (ver utils/banco.py); as funções deste módulo repassam as chamadas
+    - 'shards': as tarefas ficam em um arquivo por responsável, com
+      journal em cada um (ver utils/shards.py)
+
+FORMATO DO SNAPSHOT (variável de ambiente TASKFLOW_SNAPSHOT):
+    - 'legivel' (padrão): JSON com indentação de 4 espaços
+    - 'compacto': JSON sem espaços nem quebras de linha (arquivo menor e
+      leitura mais rápida; continua sendo JSON comum)
+    - 'binario': formato .tfb com tabela de deslocamentos (ver
+      utils/binario.py), gravado no mesmo caminho. O arquivo é mapeado
+      na memória: obter_registro() com o cache vazio e iterar_dados()
+      decodificam só os registros pedidos, sem carregar o arquivo
+      inteiro. Como cada gravação regrava o arquivo todo, combina com
+      os modos 'journal' e 'shards' (no 'json', toda alteração regrava)
+    O formato de cada arquivo é reconhecido na leitura (pelo cabeçalho):
+    trocar a variável não exige conversão, o arquivo muda de formato na
+    próxima gravação completa (ou: python -m utils.binario)
+
+ESQUEMA EM DISCO (ver utils/esquema.py):
+    - Esquema 1: lista JSON com datas 'DD/MM/AAAA' (formato original)
+    - Esquema 2: JSON Lines com cabeçalho de versão e datas ISO-8601
+    Os dois são lidos automaticamente; ao regravar, o arquivo mantém o
+    esquema que já tinha. Arquivos novos usam TASKFLOW_ESQUEMA (padrão 1).
+    Para converter: python -m utils.esquema migrar
+
+CONSULTAS:
+    - contar_registros(): contadores por grupo (ex: tarefas por status de
+      um responsável), mantidos em memória a cada alteração
+    - etiqueta_dados(): versão dos dados de um grupo (ex: as tarefas de
+      um responsável) que vale entre processos, para ETags HTTP
+    - obter_registro(): busca um registro pelo ID
+    - consultar_registros(): busca por campos (responsável, status, login,
+      prazo vencido), usando índices quando o backend oferece
+    - paginar_registros(): uma página da consulta em ordem de ID ou de um
+      campo (prazo, título, criação), a partir do último registro da
+      página anterior (paginação por chave)
+    - buscar_registros(): busca textual (título e descrição) por índice
+      invertido, com resultados ordenados por relevância e paginados
+    - iterar_dados() / iterar_registros(): mesmas leituras em streaming,
+      um registro por vez, com memória constante
 
 ARQUIVOS GERENCIADOS:
     - data/usuarios.json: Armazena cadastros de usuários
@@ -23,14 +79,148 @@ IMPORTANTE PARA APRESENTAÇÃO:
 ================================================================================
 """
 
+import hashlib
+import heapq
+import io
 import json
+import math
 import os
+import tempfile
+import threading
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from itertools import chain, islice
+
+try:
+    import fcntl
+except ImportError:  # Windows: usa msvcrt para travar o arquivo
+    fcntl = None
+    import msvcrt
+
+from utils.binario import SnapshotBinario, eh_binario, gravar_binario
+from utils.busca import termos, termos_da_consulta
+from utils.datas import data_para_ordinal, ordinal_hoje, SEGUNDOS_POR_DIA
+from utils.esquema import ESQUEMA_2, iterar_v2, linhas_v2, versao_do_arquivo
+from utils.modelos import Registro, Tarefa, Usuario, para_json
 
 # Define o caminho dos arquivos JSON onde os dados serão armazenados
 # Usaremos um diretório 'data' para organizar melhor o projeto
 ARQUIVO_USUARIOS = 'data/usuarios.json'
 ARQUIVO_TAREFAS = 'data/tarefas.json'
 
+# Classe usada para os registros de cada arquivo em memória (ver
+# utils/modelos.py); arquivos sem classe guardam dicionários
+MODELOS = {
+    ARQUIVO_TAREFAS: Tarefa,
+    ARQUIVO_USUARIOS: Usuario,
+}
+
+# Índice ordenado por prazo mantido em memória: arquivo -> (campo, valor)
+# que o registro precisa ter para entrar no índice. Para as tarefas, só as
+# pendentes (tarefas.STATUS_PENDENTE), que são as que podem ficar atrasadas
+INDICES_PRAZO = {
+    ARQUIVO_TAREFAS: ('status', 'Pendente'),
+}
+
+# Índices por campo mantidos em memória: arquivo -> campos cujos valores
+# levam direto aos IDs dos registros, em ordem (ex: as tarefas de um
+# responsável)
+INDICES_CAMPOS = {
+    ARQUIVO_TAREFAS: ('responsavel_id',),
+    ARQUIVO_USUARIOS: ('login',),
+}
+
+# Índices de ordenação mantidos em memória: arquivo -> (campo do grupo,
+# campo do subgrupo, campos ordenáveis). Para as tarefas: de cada
+# responsável e status, as listas já ordenadas por criação, prazo e título
+INDICES_ORDENACAO = {
+    ARQUIVO_TAREFAS: ('responsavel_id', 'status', ('criacao', 'prazo', 'titulo')),
+}
+
+# Índices de busca textual mantidos em memória: arquivo -> (campo do
+# grupo, {campo de texto: peso}). Para as tarefas: um índice invertido por
+# responsável, com o título valendo 3x a descrição na relevância
+INDICES_TEXTO = {
+    ARQUIVO_TAREFAS: ('responsavel_id', {'titulo': 3, 'descrição': 1}),
+}
+
+# Contadores mantidos em memória: arquivo -> (campo de agrupamento, campo
+# contado). Para as tarefas: quantas de cada status há por responsável
+# (mais as atrasadas, pelo índice de prazos). Ver contar_registros()
+CONTADORES = {
+    ARQUIVO_TAREFAS: ('responsavel_id', 'status'),
+}
+
+# Agregados por dia mantidos em memória: arquivo -> (campo do grupo, campo
+# da criação, campo da conclusão, campo do prazo, (campo, valor) de quem
+# está em aberto). Para as tarefas: por responsável e por dia, quantas
+# foram criadas, concluídas e ficaram atrasadas, e o tempo entre criação
+# e conclusão. Ver agregar_registros()
+AGREGADOS = {
+    ARQUIVO_TAREFAS: ('responsavel_id', 'criacao', 'conclusao', 'prazo', ('status', 'Pendente')),
+}
+
+# Etiquetas por grupo (ver etiqueta_dados()): arquivo -> campo do grupo.
+# Para as tarefas: cada responsável tem a sua, que só muda quando alguma
+# tarefa dele muda
+ETIQUETAS = {
+    ARQUIVO_TAREFAS: 'responsavel_id',
+}
+
+# Modo de armazenamento: 'json' (regrava tudo), 'journal' (anexa operações),
+# 'sqlite' (banco de dados com índices) ou 'shards' (um arquivo por usuário)
+MODO_ARMAZENAMENTO = os.environ.get('TASKFLOW_ARMAZENAMENTO', 'json')
+
+# Formato dos snapshots: 'legivel' (JSON indentado), 'compacto' (JSON sem
+# espaços) ou 'binario' (.tfb, ver utils/binario.py)
+FORMATO_SNAPSHOT = os.environ.get('TASKFLOW_SNAPSHOT', 'legivel')
+
+# Esquema dos arquivos criados do zero (1 = lista JSON, 2 = JSON Lines com
+# datas ISO); arquivos existentes mantêm o esquema que já têm
+ESQUEMA_NOVOS_ARQUIVOS = int(os.environ.get('TASKFLOW_ESQUEMA', '1'))
+
+# Extensão do arquivo de journal (ex: 'data/tarefas.json.journal')
+SUFIXO_JOURNAL = '.journal'
+
+# Tamanho mínimo (em bytes) do journal antes de considerar uma compactação
+LIMITE_MINIMO_JOURNAL = 64 * 1024
+
+# Códigos das operações gravadas no journal (registros compactos)
+OP_INSERIR = 'i'
+OP_ATUALIZAR = 'u'
+OP_REMOVER = 'd'
+
+# Tamanho dos blocos (em caracteres) lidos por iterar_dados()
+TAMANHO_BLOCO_LEITURA = 64 * 1024
+
+# Armazém em memória compartilhado pelo processo, um item por arquivo:
+#   caminho -> {'assinatura': ..., 'dados': [...], 'versao': int}
+# A assinatura (inode, mtime e tamanho do snapshot e do journal) permite
+# perceber, com uma simples chamada a os.stat, que outro processo alterou
+# o arquivo e que os dados em memória precisam ser recarregados.
+_ARMAZEM = {}
+
+# Snapshots .tfb abertos para buscas por ID com o cache vazio (ver
+# _snapshot_binario()): caminho -> {'assinatura', 'snapshot', 'operacoes'}
+_BINARIOS = {}
+
+# Contador global de versões (cresce a cada carga ou alteração de dados)
+_VERSAO = 0
+
+# Extensão do arquivo usado como trava (ex: 'data/tarefas.json.lock')
+SUFIXO_TRAVA = '.lock'
+
+# Extensão do arquivo com o último ID gerado (ex: 'data/tarefas.json.seq')
+SUFIXO_SEQUENCIA = '.seq'
+
+# Estado das travas deste processo, um item por arquivo de dados:
+#   caminho -> {'rlock': RLock, 'nivel': int, 'arquivo': file | None}
+# O RLock serializa as threads do processo (escritas e leituras do cache,
+# ver _leitura()); a trava no arquivo .lock serializa os processos.
+# 'nivel' permite transações aninhadas.
+_TRAVAS = {}
+_TRAVAS_MUTEX = threading.Lock()
+
 
 def garantir_diretorio(caminho):
     """
@@ -52,37 +242,180 @@ def garantir_diretorio(caminho):
     # Se o caminho for apenas um nome de arquivo, dirname retorna string vazia,
     # então verificamos se diretorio existe e se o caminho não é vazio.
     if diretorio and not os.path.exists(diretorio):
-        os.makedirs(diretorio)
+        # exist_ok: outro processo pode criar a pasta ao mesmo tempo
+        os.makedirs(diretorio, exist_ok=True)
 
 
-def ler_dados(caminho_arquivo):
+def _travar_arquivo(arquivo, compartilhada):
+    """Aplica a trava do sistema operacional no arquivo .lock aberto."""
+    if fcntl:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_SH if compartilhada else fcntl.LOCK_EX)
+    else:
+        # msvcrt não tem trava compartilhada; LK_LOCK tenta por ~10s
+        while True:
+            try:
+                msvcrt.locking(arquivo.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+
+def _destravar_arquivo(arquivo):
+    """Libera a trava do sistema operacional."""
+    if fcntl:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+    else:
+        arquivo.seek(0)
+        msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _estado_trava(caminho_arquivo):
+    """Estado da trava do arquivo neste processo (ver _TRAVAS)."""
+    with _TRAVAS_MUTEX:
+        return _TRAVAS.setdefault(caminho_arquivo, {
+            'rlock': threading.RLock(), 'nivel': 0, 'arquivo': None
+        })
+
+
+@contextmanager
+def transacao(caminho_arquivo, compartilhada=False):
     """
-    Lê e retorna os dados armazenados em um arquivo JSON.
+    Trava o arquivo de dados enquanto o bloco 'with' é executado.
     
     PARÂMETROS:
-        caminho_arquivo (str): Caminho do arquivo a ser lido
+        caminho_arquivo (str): Arquivo de dados a travar
+        compartilhada (bool): True para leitura (vários leitores ao mesmo
+                              tempo); False para escrita (exclusiva)
     
-    RETORNO:
-        list: Lista de dicionários com os dados (usuários ou tarefas)
-              Retorna [] (lista vazia) se o arquivo não existir ou
-              estiver vazio
+    FUNCIONAMENTO:
+        - Dentro do processo, um RLock impede que duas threads alterem o
+          mesmo arquivo ao mesmo tempo
+        - Entre processos (ex: vários workers do gunicorn), uma trava do
+          sistema operacional em '<arquivo>.lock' faz o mesmo papel
+        - Transações aninhadas na mesma thread reaproveitam a trava já
+          obtida (a trava externa é que vale)
     
-    TRATAMENTO DE ERROS:
-        - FileNotFoundError: Arquivo ainda não foi criado (primeira execução)
-        - JSONDecodeError: Arquivo está corrompido ou vazio
-        - Em ambos os casos, retorna lista vazia para não quebrar o sistema
+    EXEMPLO:
+        with transacao(ARQUIVO_USUARIOS):
+            if not consultar_registros(ARQUIVO_USUARIOS, login=login):
+                inserir_registro(ARQUIVO_USUARIOS, novo_usuario)
+    """
+    estado = _estado_trava(caminho_arquivo)
+    with estado['rlock']:
+        if estado['nivel'] == 0:
+            garantir_diretorio(caminho_arquivo)
+            arquivo = open(caminho_arquivo + SUFIXO_TRAVA, 'a+b')
+            try:
+                _travar_arquivo(arquivo, compartilhada)
+            except BaseException:
+                arquivo.close()
+                raise
+            estado['arquivo'] = arquivo
+        estado['nivel'] += 1
+        try:
+            yield
+        finally:
+            estado['nivel'] -= 1
+            if estado['nivel'] == 0:
+                arquivo, estado['arquivo'] = estado['arquivo'], None
+                try:
+                    _destravar_arquivo(arquivo)
+                finally:
+                    arquivo.close()
+
+
+@contextmanager
+def _leitura(caminho_arquivo):
+    """
+    Protege a leitura do cache em memória contra escritas de outras threads.
+    
+    FUNCIONAMENTO:
+        Obtém só o RLock do arquivo (o mesmo de transacao()), sem a trava
+        do sistema operacional: outros processos não alteram a memória
+        deste. Escritas alteram a entrada do armazém e os índices no
+        lugar (ver _aplicar_operacao()) com o RLock obtido; com ele, quem
+        lê nunca vê uma alteração pela metade.
     
     IMPORTANTE:
-        Esta função garante que o sistema sempre tenha dados válidos,
-        mesmo na primeira execução ou em caso de problemas.
+        Tudo o que vem da entrada (listas de índices, posições) deve ser
+        consumido DENTRO do bloco: o que sai dele são só registros, que
+        nunca são alterados no lugar.
     """
-    garantir_diretorio(caminho_arquivo)
+    with _estado_trava(caminho_arquivo)['rlock']:
+        yield
+
+
+def _gravar_atomicamente(caminho_arquivo, dados, formato=None):
+    """
+    Grava o snapshot em um arquivo temporário e o coloca no lugar do original.
+    
+    PARÂMETROS:
+        caminho_arquivo (str): Arquivo de destino
+        dados (iterable): Registros a gravar
+        formato (str, opcional): 'legivel', 'compacto' ou 'binario';
+                                 padrão: FORMATO_SNAPSHOT
+    
+    SEGURANÇA:
+        os.replace() é atômico: quem lê o arquivo vê o conteúdo antigo
+        completo ou o novo completo, nunca um arquivo pela metade (mesmo
+        se o processo cair no meio da gravação).
+    
+    ESQUEMA:
+        O arquivo JSON é regravado no esquema que já tinha (ver
+        utils/esquema.py); se ainda não existe (ou era .tfb), em
+        ESQUEMA_NOVOS_ARQUIVOS. O formato 'binario' não tem esquema: guarda
+        os registros como estão em memória.
+    """
+    formato = formato or FORMATO_SNAPSHOT
+    if formato == 'binario':
+        gravar_binario(caminho_arquivo, dados)
+        return
+    versao = versao_do_arquivo(caminho_arquivo) or ESQUEMA_NOVOS_ARQUIVOS
+    diretorio = os.path.dirname(caminho_arquivo) or '.'
+    descritor, temporario = tempfile.mkstemp(dir=diretorio, suffix='.tmp')
+    try:
+        with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+            # ensure_ascii=False para permitir caracteres UTF-8 no JSON
+            if versao == ESQUEMA_2:
+                f.writelines(linhas_v2(dados))
+            elif formato == 'compacto':
+                json.dump(dados, f, ensure_ascii=False, separators=(',', ':'),
+                          default=para_json)
+            else:
+                json.dump(dados, f, indent=4, ensure_ascii=False, default=para_json)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, caminho_arquivo)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def _ler_snapshot(caminho_arquivo):
+    """
+    Lê o snapshot (o arquivo principal) sem aplicar o journal.
+    
+    RETORNO:
+        list: Registros do snapshot, ou [] se ausente/vazio/corrompido
+    
+    ERROS:
+        ValueError: Arquivo de um esquema mais novo que este código (não é
+                    tratado como vazio, para não ser sobrescrito), ou .tfb
+                    de versão desconhecida
+    """
+    if eh_binario(caminho_arquivo):
+        with SnapshotBinario(caminho_arquivo) as snapshot:
+            return list(snapshot)
     try:
         with open(caminho_arquivo, 'r', encoding='utf-8') as f:
             # Tenta carregar o JSON. Se o arquivo estiver vazio, retorna []
             conteudo = f.read()
             if not conteudo:
                 return []
+            if conteudo.lstrip().startswith('{'):
+                # Esquema 2: um registro por linha, após o cabeçalho
+                return list(iterar_v2(conteudo.splitlines()))
             return json.loads(conteudo)
     except FileNotFoundError:
         # Retorna uma lista vazia se o arquivo não existir (primeira execução)
@@ -92,32 +425,2010 @@ def ler_dados(caminho_arquivo):
         return []
 
 
-def salvar_dados(caminho_arquivo, dados):
+def _iterar_snapshot(f):
     """
-    Salva uma lista de dados em um arquivo JSON formatado.
+    Gera os registros de um snapshot JSON (lista) UM de cada vez.
+    
+    FUNCIONAMENTO:
+        Lê o arquivo em blocos de TAMANHO_BLOCO_LEITURA caracteres e usa
+        json.JSONDecoder.raw_decode() para extrair cada objeto da lista
+        assim que ele estiver completo no bloco. A memória usada fica
+        limitada a um bloco + um registro, qualquer que seja o tamanho
+        do arquivo.
+    
+    ESQUEMA 2:
+        O arquivo já tem um registro por linha: depois do primeiro bloco
+        (completado até o fim da linha), a leitura segue linha a linha.
+    
+    OBSERVAÇÃO:
+        Se o arquivo estiver corrompido, a leitura para no ponto do erro
+        (mesma tolerância de _ler_snapshot(), que devolve []).
+    """
+    decodificador = json.JSONDecoder()
+    buffer = f.read(TAMANHO_BLOCO_LEITURA).lstrip()
+    if buffer.startswith('{'):
+        try:
+            yield from iterar_v2(chain(io.StringIO(buffer + f.readline()), f))
+        except json.JSONDecodeError:
+            return
+        return
+    if not buffer.startswith('['):
+        return
+    posicao = 1
+    fim_arquivo = False
+    while True:
+        # Pula espaços e vírgulas entre os registros
+        while posicao < len(buffer) and buffer[posicao] in ' \t\r\n,':
+            posicao += 1
+        if posicao < len(buffer) and buffer[posicao] == ']':
+            return
+        try:
+            if posicao >= len(buffer):
+                raise ValueError
+            registro, posicao = decodificador.raw_decode(buffer, posicao)
+        except ValueError:
+            # Registro incompleto: lê mais um bloco e tenta de novo
+            if fim_arquivo:
+                return
+            bloco = f.read(TAMANHO_BLOCO_LEITURA)
+            fim_arquivo = not bloco
+            buffer = buffer[posicao:] + bloco
+            posicao = 0
+            continue
+        yield registro
+
+
+def _ler_operacoes_por_id(caminho_arquivo):
+    """
+    Lê o journal agrupando as operações pelo ID do registro.
+    
+    RETORNO:
+        dict: ID -> lista de operações, na ordem em que foram gravadas
+              (o journal é limitado pela compactação, então cabe em memória)
+    """
+    operacoes = {}
+    try:
+        f = open(caminho_arquivo + SUFIXO_JOURNAL, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        return operacoes
+    with f:
+        for operacao in _ler_linhas_journal(f):
+            if operacao.get('op') == OP_INSERIR:
+                registro_id = operacao['r'].get('id')
+            else:
+                registro_id = operacao.get('id')
+            operacoes.setdefault(registro_id, []).append(operacao)
+    return operacoes
+
+
+def _reaplicar(registro, operacoes):
+    """
+    Aplica a um único registro as suas operações do journal.
+    
+    RETORNO:
+        dict: O registro resultante, ou None se ele foi removido
+    """
+    for operacao in operacoes:
+        tipo = operacao.get('op')
+        if tipo == OP_INSERIR:
+            registro = operacao['r']
+        elif tipo == OP_ATUALIZAR and registro is not None:
+            registro = {**registro, **operacao['c']}
+        elif tipo == OP_REMOVER:
+            registro = None
+    return registro
+
+
+def _aplicar_journal(caminho_arquivo, entrada):
+    """
+    Reaplica sobre o snapshot as operações registradas no journal.
     
     PARÂMETROS:
-        caminho_arquivo (str): Caminho onde o arquivo será salvo
-        dados (list): Lista de dicionários a ser salva
+        caminho_arquivo (str): Caminho do snapshot (o journal fica ao lado)
+        entrada (dict): Entrada do armazém criada a partir do snapshot
+    
+    IDEMPOTÊNCIA:
+        Se o processo cair entre a gravação do snapshot e a limpeza do
+        journal, as operações serão reaplicadas. Por isso inserir um ID
+        já existente substitui o registro, e atualizar/remover um ID
+        inexistente é ignorado. Uma última linha incompleta (queda no meio
+        da escrita) também é ignorada.
+    """
+    try:
+        f = open(caminho_arquivo + SUFIXO_JOURNAL, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        return
+
+    with f:
+        for operacao in _ler_linhas_journal(f):
+            _aplicar_operacao(entrada, operacao)
+
+
+def _ler_linhas_journal(f):
+    """Gera as operações do journal, ignorando linhas incompletas."""
+    for linha in f:
+        try:
+            yield json.loads(linha)
+        except json.JSONDecodeError:
+            continue
+
+
+def arquivo_de_configuracao(caminho_arquivo):
+    """
+    Arquivo cujas configurações (MODELOS, INDICES_*, CONTADORES, AGREGADOS
+    e ETIQUETAS) valem para 'caminho_arquivo'.
     
     RETORNO:
-        bool: True se salvou com sucesso, False se houve erro
+        str: O arquivo lógico, se o caminho for um shard (ex:
+             'data/tarefas/usuario_3.json' -> 'data/tarefas.json', ver
+             utils/shards.py); senão, o próprio caminho
     
-    FORMATAÇÃO:
-        - indent=4: Salva com indentação de 4 espaços (arquivo legível)
-        - ensure_ascii=False: Permite acentos e caracteres especiais (UTF-8)
-        - encoding='utf-8': Garante compatibilidade com português
+    OBSERVAÇÃO:
+        A consulta é feita na hora (a partir do caminho), sem registrar
+        nada por shard: as tabelas de configuração só são alteradas na
+        importação dos módulos.
+    """
+    # Importação tardia: utils.shards importa este módulo
+    from utils import shards
+    return shards.arquivo_logico(caminho_arquivo) or caminho_arquivo
+
+
+def converter_registro(caminho_arquivo, registro):
+    """
+    Converte um dicionário lido do disco na classe do arquivo (MODELOS).
     
-    SEGURANÇA:
-        Trata exceções para evitar perda de dados em caso de erro
-        de escrita (disco cheio, permissões, etc.)
+    PARÂMETROS:
+        caminho_arquivo (str): Arquivo com a configuração (para um shard,
+                               o arquivo lógico: ver arquivo_de_configuracao())
+        registro (dict): Registro lido
+    
+    RETORNO:
+        Tarefa/Usuario para os arquivos com classe; o próprio registro
+        para os demais (ou se ele já for da classe certa)
+    
+    USO:
+        Chamada uma única vez por registro, na carga ou na alteração;
+        também usada por utils/banco.py ao ler do SQLite.
     """
-    garantir_diretorio(caminho_arquivo)
+    modelo = MODELOS.get(caminho_arquivo)
+    if modelo is None or registro is None or isinstance(registro, modelo):
+        return registro
+    return modelo(registro)
+
+
+def _nova_entrada(caminho_arquivo, dados):
+    """
+    Cria uma entrada do armazém para a lista de registros informada.
+    
+    CAMPOS:
+        - dados: lista de registros (já convertidos pela classe do
+          arquivo); posições de registros removidos ficam com None até a
+          próxima compactação (ver _compactar_removidos())
+        - modelo: classe dos registros (ou None para dicionários)
+        - posicoes: índice ID -> posição na lista (criado sob demanda)
+        - prazos: índice ordenado (prazo, ID), ver _indice_prazos()
+        - valores: índices por campo (valor -> IDs ordenados), ver
+          _indice_valores()
+        - ordenacoes: listas ordenadas por grupo, ver _indice_ordenacao()
+        - textos: índice invertido por grupo, ver _indice_texto()
+        - contagens: contadores por grupo, ver _contagens()
+        - agregados: totais por grupo e dia, ver _agregados()
+        - digitais: resumo do conteúdo por grupo, ver _digital()
+        - removidos: quantidade de posições com None
+        - assinatura / versao: ver _entrada_atualizada() e versao_dados()
+    """
+    configuracao = arquivo_de_configuracao(caminho_arquivo)
+    modelo = MODELOS.get(configuracao)
+    if modelo is not None:
+        dados = [r if isinstance(r, modelo) else modelo(r) for r in dados]
+    else:
+        dados = list(dados)
+    return {'assinatura': None, 'versao': 0, 'dados': dados, 'modelo': modelo,
+            'posicoes': None, 'removidos': 0,
+            'filtro_prazo': INDICES_PRAZO.get(configuracao), 'prazos': None,
+            'campos_indexados': INDICES_CAMPOS.get(configuracao, ()), 'valores': None,
+            'ordenacao': INDICES_ORDENACAO.get(configuracao), 'ordenacoes': None,
+            'texto': INDICES_TEXTO.get(configuracao), 'textos': None,
+            'contadores': CONTADORES.get(configuracao), 'contagens': None,
+            'agregacao': AGREGADOS.get(configuracao), 'agregados': None,
+            'campo_etiqueta': ETIQUETAS.get(configuracao), 'digitais': None}
+
+
+def _posicoes(entrada):
+    """
+    Retorna o índice ID -> posição da entrada, construindo se preciso.
+    
+    DESEMPENHO:
+        Construído uma vez (O(n)) e depois mantido a cada operação, o que
+        torna buscas, alterações e remoções por ID O(1).
+        Havendo IDs repetidos (dados antigos), vale o PRIMEIRO registro.
+    """
+    if entrada['posicoes'] is None:
+        posicoes = {}
+        for i, registro in enumerate(entrada['dados']):
+            if registro is not None:
+                posicoes.setdefault(registro.get('id'), i)
+        entrada['posicoes'] = posicoes
+    return entrada['posicoes']
+
+
+def _prazo_de(registro):
+    """Prazo do registro como ordinal (None se ausente ou inválido)."""
+    # Tarefas já trazem o prazo convertido (utils/modelos.py)
+    prazo = getattr(registro, 'prazo_ordinal', None)
+    if prazo is None:
+        prazo = data_para_ordinal(registro.get('prazo'))
+    return prazo
+
+
+def _chave_prazo(entrada, registro):
+    """
+    Chave (prazo, ID) do registro no índice de prazos da entrada.
+    
+    RETORNO:
+        tuple: A chave, ou None se o registro não entra no índice (fora
+               do filtro do arquivo, sem prazo válido ou sem ID inteiro)
+    """
+    campo, valor = entrada['filtro_prazo']
+    if registro is None or registro.get(campo) != valor:
+        return None
+    prazo = _prazo_de(registro)
+    registro_id = registro.get('id')
+    if prazo is None or type(registro_id) is not int:
+        return None
+    return (prazo, registro_id)
+
+
+def _indice_prazos(entrada):
+    """
+    Retorna o índice de prazos da entrada, construindo se preciso.
+    
+    ESTRUTURA:
+        Lista ORDENADA de tuplas (prazo, ID) dos registros que atendem ao
+        filtro do arquivo (INDICES_PRAZO), ex: tarefas pendentes.
+    
+    DESEMPENHO:
+        Construído uma vez (O(n log n)) e mantido por _aplicar_operacao()
+        a cada inclusão, alteração ou remoção, em todos os modos JSON (no
+        'json', ver _regravar_com_operacao()). Buscar "prazo antes de X"
+        vira uma busca binária (bisect) + um recorte da lista.
+    """
+    if entrada['prazos'] is None:
+        chaves = (_chave_prazo(entrada, r) for r in entrada['dados'])
+        entrada['prazos'] = sorted(c for c in chaves if c is not None)
+    return entrada['prazos']
+
+
+def _indice_valores(entrada):
+    """
+    Retorna os índices por campo da entrada, construindo se preciso.
+    
+    ESTRUTURA:
+        {campo: {valor: lista ORDENADA de IDs}} para cada campo de
+        INDICES_CAMPOS (ex: responsavel_id -> IDs das tarefas do usuário)
+    
+    DESEMPENHO:
+        Construídos uma vez (O(n log n)) e mantidos por _aplicar_operacao();
+        com eles, a consulta das tarefas de um usuário custa o tamanho dos
+        dados DELE, e não o de todas as tarefas do sistema. Por estarem em
+        ordem, uma página a partir de um ID (paginar_registros()) é uma
+        busca binária + um recorte.
+    
+    RETORNO:
+        dict: Os índices, ou None se algum registro não tiver ID inteiro
+              (dados antigos); nesse caso as consultas percorrem os dados
+    """
+    if entrada['valores'] is None:
+        valores = {campo: {} for campo in entrada['campos_indexados']}
+        for registro in entrada['dados']:
+            if registro is None:
+                continue
+            if type(registro.get('id')) is not int:
+                valores = False
+                break
+            for campo, indice in valores.items():
+                indice.setdefault(registro.get(campo), []).append(registro.get('id'))
+        if valores:
+            for indice in valores.values():
+                for valor, ids in indice.items():
+                    indice[valor] = sorted(set(ids))
+        entrada['valores'] = valores
+    return entrada['valores'] or None
+
+
+def _indice_ordenacao(entrada):
+    """
+    Retorna os índices de ordenação da entrada, construindo se preciso.
+    
+    ESTRUTURA:
+        {grupo: {subgrupo: {campo: lista ORDENADA de (valor, ID)}}}
+        ex: tarefas do responsável 3 com status 'Pendente', por prazo:
+            indice[3]['Pendente']['prazo'] -> [(739000, 12), (739010, 4)]
+        O valor é o de Registro.chave_ordenacao() (datas já convertidas,
+        títulos sem diferença de maiúsculas).
+    
+    DESEMPENHO:
+        Construídos uma vez (O(n log n)) e mantidos por _aplicar_operacao()
+        (busca binária + inserção na lista do grupo). Listar as N primeiras
+        tarefas de um usuário em qualquer ordem não ordena nada na hora.
+    
+    RETORNO:
+        dict: Os índices, ou None se algum registro não tiver ID inteiro
+    """
+    if entrada['ordenacoes'] is None:
+        indice = {}
+        posicoes = _posicoes(entrada)
+        for i, registro in enumerate(entrada['dados']):
+            if registro is None:
+                continue
+            if type(registro.get('id')) is not int:
+                indice = False
+                break
+            if posicoes[registro.get('id')] != i:
+                continue  # ID repetido (dados antigos): vale o primeiro
+            for campo, lista in _listas_do_registro(entrada, indice, registro):
+                lista.append((_chave_ordenacao(registro, campo), registro.get('id')))
+        if indice:
+            for subgrupos in indice.values():
+                for listas in subgrupos.values():
+                    for lista in listas.values():
+                        lista.sort()
+        entrada['ordenacoes'] = indice
+    return entrada['ordenacoes'] or None
+
+
+def _listas_do_registro(entrada, indice, registro):
+    """Gera (campo, lista) do grupo/subgrupo do registro, criando as listas."""
+    campo_grupo, campo_subgrupo, campos = entrada['ordenacao']
+    subgrupos = indice.setdefault(registro.get(campo_grupo), {})
+    listas = subgrupos.get(registro.get(campo_subgrupo))
+    if listas is None:
+        listas = subgrupos[registro.get(campo_subgrupo)] = {campo: [] for campo in campos}
+    return listas.items()
+
+
+def _listas_ordenadas(entrada, campo, iguais):
+    """
+    Listas (valor, ID) ordenadas por 'campo' que cobrem a consulta.
+    
+    RETORNO:
+        list: Uma lista por subgrupo (só a do subgrupo pedido, se ele está
+              nos critérios)
+        None: O índice não serve (campo não ordenável ou grupo ausente)
+    """
+    if entrada['ordenacao'] is None:
+        return None
+    campo_grupo, campo_subgrupo, campos = entrada['ordenacao']
+    if campo not in campos or campo_grupo not in iguais:
+        return None
+    indice = _indice_ordenacao(entrada)
+    if indice is None:
+        return None
     try:
-        with open(caminho_arquivo, 'w', encoding='utf-8') as f:
-            # ensure_ascii=False para permitir caracteres UTF-8 no JSON
-            json.dump(dados, f, indent=4, ensure_ascii=False)
-        return True
-    except Exception as e:
-        print(f"Erro ao salvar dados em {caminho_arquivo}: {e}")
-        return False
+        subgrupos = indice.get(iguais[campo_grupo], {})
+        if campo_subgrupo in iguais:
+            listas = subgrupos.get(iguais[campo_subgrupo])
+            return [listas[campo]] if listas is not None else []
+    except TypeError:  # valor que não pode ser chave de dicionário
+        return None
+    return [listas[campo] for listas in subgrupos.values()]
+
+
+def _indice_texto(entrada):
+    """
+    Retorna o índice de busca textual da entrada, construindo se preciso.
+    
+    ESTRUTURA:
+        {grupo: {'termos': {termo: {ID: peso}},
+                 'vocabulario': lista ORDENADA dos termos,
+                 'documentos': quantidade de registros no grupo}}
+        O peso de um termo em um registro soma o peso do campo (ver
+        INDICES_TEXTO) a cada vez que o termo aparece nele.
+    
+    DESEMPENHO:
+        Construído uma vez e mantido por _aplicar_operacao(); alterações
+        que não mexem nos textos (ex: concluir a tarefa) não custam nada.
+        Com o vocabulário ordenado, os termos que começam com um prefixo
+        são um recorte por busca binária.
+    """
+    if entrada['textos'] is None:
+        indice = {}
+        posicoes = _posicoes(entrada)
+        for i, registro in enumerate(entrada['dados']):
+            if registro is None or posicoes.get(registro.get('id')) != i:
+                continue  # removido ou ID repetido (dados antigos)
+            grupo, pesos = _texto_do_registro(entrada, registro)
+            if pesos is not None:
+                _indexar_texto(indice, grupo, registro.get('id'), pesos, ordenar=False)
+        for grupo in indice.values():
+            grupo['vocabulario'] = sorted(grupo['termos'])
+        entrada['textos'] = indice
+    return entrada['textos']
+
+
+def _texto_do_registro(entrada, registro):
+    """
+    Grupo e pesos dos termos do registro no índice de busca textual.
+    
+    RETORNO:
+        tuple: (grupo, {termo: peso}); pesos é None para registros sem ID
+               inteiro, que ficam fora do índice
+    """
+    campo_grupo, campos = entrada['texto']
+    if registro is None or type(registro.get('id')) is not int:
+        return None, None
+    pesos = {}
+    for campo, peso in campos.items():
+        for termo in termos(registro.get(campo)):
+            pesos[termo] = pesos.get(termo, 0) + peso
+    return registro.get(campo_grupo), pesos
+
+
+def _indexar_texto(indice, grupo, registro_id, pesos, ordenar=True):
+    """Inclui o registro no índice textual do grupo."""
+    dados_grupo = indice.get(grupo)
+    if dados_grupo is None:
+        dados_grupo = indice[grupo] = {'termos': {}, 'vocabulario': [], 'documentos': 0}
+    for termo, peso in pesos.items():
+        postagens = dados_grupo['termos'].get(termo)
+        if postagens is None:
+            postagens = dados_grupo['termos'][termo] = {}
+            if ordenar:
+                insort(dados_grupo['vocabulario'], termo)
+        postagens[registro_id] = peso
+    dados_grupo['documentos'] += 1
+
+
+def _desindexar_texto(indice, grupo, registro_id, pesos):
+    """Retira o registro do índice textual do grupo."""
+    dados_grupo = indice.get(grupo)
+    if dados_grupo is None:
+        return
+    for termo in pesos:
+        postagens = dados_grupo['termos'].get(termo)
+        if postagens is None:
+            continue
+        postagens.pop(registro_id, None)
+        if not postagens:
+            del dados_grupo['termos'][termo]
+            vocabulario = dados_grupo['vocabulario']
+            i = bisect_left(vocabulario, termo)
+            if i < len(vocabulario) and vocabulario[i] == termo:
+                del vocabulario[i]
+    dados_grupo['documentos'] -= 1
+
+
+def _contar(entrada, registro, delta):
+    """Soma 'delta' (+1 ou -1) aos contadores do grupo do registro."""
+    campo_grupo, campo_contado = entrada['contadores']
+    contagens = entrada['contagens']
+    grupo = contagens['grupos'].get(registro.get(campo_grupo))
+    if grupo is None:
+        grupo = {'total': 0, 'valores': {}, 'atrasados': 0}
+        contagens['grupos'][registro.get(campo_grupo)] = grupo
+    grupo['total'] += delta
+    valor = registro.get(campo_contado)
+    grupo['valores'][valor] = grupo['valores'].get(valor, 0) + delta
+    if entrada['filtro_prazo'] is not None:
+        chave = _chave_prazo(entrada, registro)
+        if chave is not None and chave[0] < contagens['dia']:
+            grupo['atrasados'] += delta
+
+
+def _contagens(entrada):
+    """
+    Retorna os contadores da entrada, construindo ou avançando o dia.
+    
+    ESTRUTURA:
+        {'dia': ordinal de referência,
+         'grupos': {grupo: {'total': n,
+                            'valores': {valor do campo contado: n},
+                            'atrasados': n}}}
+        'atrasados' conta os registros do índice de prazos (ex: tarefas
+        pendentes) com prazo anterior a 'dia'.
+    
+    VIRADA DO DIA:
+        Quando a data muda, não é preciso recontar tudo: os registros que
+        passaram a estar atrasados são exatamente os do índice de prazos
+        com prazo entre o dia antigo e o novo (busca binária + recorte).
+    
+    DESEMPENHO:
+        Construídos uma vez (O(n)) e mantidos por _aplicar_operacao() a
+        cada alteração (O(1)); consultar custa O(1).
+    """
+    hoje = ordinal_hoje()
+    contagens = entrada['contagens']
+    if contagens is not None and contagens['dia'] > hoje:
+        # Relógio voltou (ajuste manual): reconstrói
+        contagens = None
+    if contagens is None:
+        entrada['contagens'] = {'dia': hoje, 'grupos': {}}
+        for registro in entrada['dados']:
+            if registro is not None:
+                _contar(entrada, registro, 1)
+        return entrada['contagens']
+
+    if contagens['dia'] < hoje:
+        if entrada['filtro_prazo'] is not None:
+            prazos = _indice_prazos(entrada)
+            inicio = bisect_left(prazos, (contagens['dia'],))
+            fim = bisect_left(prazos, (hoje,))
+            posicoes = _posicoes(entrada)
+            campo_grupo, _ = entrada['contadores']
+            for _, registro_id in prazos[inicio:fim]:
+                registro = entrada['dados'][posicoes[registro_id]]
+                contagens['grupos'][registro.get(campo_grupo)]['atrasados'] += 1
+        contagens['dia'] = hoje
+    return contagens
+
+
+def eventos_agregados(configuracao, registro):
+    """
+    O que um registro soma aos agregados por dia (ver AGREGADOS).
+    
+    PARÂMETROS:
+        configuracao (tuple): Valor de AGREGADOS para o arquivo
+        registro (Registro): Registro já convertido (utils/modelos.py)
+    
+    RETORNO:
+        dict: {dia (ordinal): [criados, concluídos, atrasados,
+                               soma dos tempos até a conclusão (segundos),
+                               quantidade de tempos somados]}
+    
+    REGRAS:
+        - Criado: no dia da criação
+        - Concluído: no dia da conclusão (registros concluídos antes de a
+          data de conclusão ser gravada não entram); o tempo até a
+          conclusão exige também a data de criação
+        - Atrasado: no dia seguinte ao prazo, se o registro estava em
+          aberto naquele dia (ainda em aberto, ou concluído depois do
+          prazo). Pode ser um dia futuro: quem consulta ignora os dias
+          depois de hoje
+    """
+    _, campo_criacao, campo_conclusao, campo_prazo, (campo_aberto, valor_aberto) = configuracao
+    criacao = registro.chave_ordenacao(campo_criacao)
+    conclusao = registro.chave_ordenacao(campo_conclusao)
+    prazo = registro.chave_ordenacao(campo_prazo)
+    eventos = {}
+    if criacao:
+        eventos.setdefault(criacao // SEGUNDOS_POR_DIA, [0, 0, 0, 0, 0])[0] += 1
+    if conclusao:
+        vetor = eventos.setdefault(conclusao // SEGUNDOS_POR_DIA, [0, 0, 0, 0, 0])
+        vetor[1] += 1
+        if criacao and conclusao >= criacao:
+            vetor[3] += conclusao - criacao
+            vetor[4] += 1
+        atrasou = prazo and conclusao // SEGUNDOS_POR_DIA > prazo
+    else:
+        atrasou = prazo and registro.get(campo_aberto) == valor_aberto
+    if atrasou:
+        eventos.setdefault(prazo + 1, [0, 0, 0, 0, 0])[2] += 1
+    return eventos
+
+
+def _agregar(entrada, registro, sinal):
+    """Soma (sinal=1) ou subtrai (sinal=-1) os eventos do registro."""
+    configuracao = entrada['agregacao']
+    eventos = eventos_agregados(configuracao, registro)
+    if not eventos:
+        return
+    dias = entrada['agregados'].setdefault(registro.get(configuracao[0]), {})
+    for dia, vetor in eventos.items():
+        atual = dias.get(dia)
+        if atual is None:
+            atual = dias[dia] = [0, 0, 0, 0, 0]
+        for i, valor in enumerate(vetor):
+            atual[i] += sinal * valor
+        if not any(atual):
+            del dias[dia]
+
+
+def _agregados(entrada):
+    """
+    Retorna os agregados por dia da entrada, construindo se preciso.
+    
+    ESTRUTURA:
+        {grupo: {dia (ordinal): [criados, concluídos, atrasados,
+                                 soma dos tempos, quantidade de tempos]}}
+        Dias sem nenhum evento não aparecem.
+    
+    DESEMPENHO:
+        Construídos uma vez (O(n)) e mantidos por _reindexar() a cada
+        alteração (O(1)); consultar custa O(dias com eventos do grupo).
+    """
+    if entrada['agregados'] is None:
+        entrada['agregados'] = {}
+        for registro in entrada['dados']:
+            if registro is not None:
+                _agregar(entrada, registro, 1)
+    return entrada['agregados']
+
+
+def _hash_registro(registro):
+    """
+    Hash de 64 bits do conteúdo do registro (o mesmo em qualquer processo:
+    JSON com chaves ordenadas, como seria gravado).
+    """
+    texto = json.dumps(registro, sort_keys=True, ensure_ascii=False, default=para_json)
+    return int.from_bytes(hashlib.blake2b(texto.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def _resumir(entrada, registro, sinal):
+    """Soma (sinal=1) ou retira (sinal=-1) o registro dos resumos já calculados."""
+    digitais = entrada['digitais']
+    hash_registro = _hash_registro(registro)
+    chaves = [None]
+    if entrada['campo_etiqueta'] is not None:
+        chaves.append((registro.get(entrada['campo_etiqueta']),))
+    for chave in chaves:
+        resumo = digitais.get(chave)
+        if resumo is not None:
+            resumo[0] += sinal
+            resumo[1] ^= hash_registro
+
+
+def _digital(entrada, grupo):
+    """
+    Resumo do conteúdo de um grupo (None = o arquivo inteiro).
+    
+    ESTRUTURA:
+        [quantidade de registros, XOR dos hashes dos registros]
+        O XOR não depende da ordem e permite tirar e pôr um registro em
+        O(1): incluir, alterar ou remover um registro muda o resumo.
+    
+    DESEMPENHO:
+        Calculado na primeira consulta de cada grupo (O(registros do
+        grupo), usando o índice por campo quando existe) e depois mantido
+        por _reindexar() a cada alteração.
+    """
+    if entrada['digitais'] is None:
+        entrada['digitais'] = {}
+    chave = None if grupo is None else (grupo,)
+    resumo = entrada['digitais'].get(chave)
+    if resumo is None:
+        if grupo is None:
+            registros = (r for r in entrada['dados'] if r is not None)
+        else:
+            campo = entrada['campo_etiqueta']
+            ids = _ids_do_indice(entrada, {campo: grupo})
+            if ids is not None:
+                posicoes = _posicoes(entrada)
+                registros = (entrada['dados'][posicoes[i]] for i in ids)
+            else:
+                registros = (r for r in entrada['dados']
+                             if r is not None and r.get(campo) == grupo)
+        resumo = [0, 0]
+        for registro in registros:
+            resumo[0] += 1
+            resumo[1] ^= _hash_registro(registro)
+        entrada['digitais'][chave] = resumo
+    return resumo
+
+
+def _reindexar(entrada, antigo, novo):
+    """
+    Mantém os índices (prazos, por campo e de ordenação), os contadores,
+    os agregados e os resumos por grupo em dia quando 'antigo' vira 'novo'.
+    
+    Qualquer um dos dois pode ser None (inclusão ou remoção). Só faz algo
+    com o que já tiver sido construído.
+    """
+    if novo is not None and entrada['valores'] and type(novo.get('id')) is not int:
+        entrada['valores'] = False
+    if entrada['valores']:
+        for campo, indice in entrada['valores'].items():
+            if antigo is not None:
+                ids = indice.get(antigo.get(campo))
+                if ids is not None:
+                    i = bisect_left(ids, antigo.get('id'))
+                    if i < len(ids) and ids[i] == antigo.get('id'):
+                        del ids[i]
+            if novo is not None:
+                ids = indice.setdefault(novo.get(campo), [])
+                i = bisect_left(ids, novo.get('id'))
+                if i == len(ids) or ids[i] != novo.get('id'):
+                    ids.insert(i, novo.get('id'))
+    if novo is not None and entrada['ordenacoes'] and type(novo.get('id')) is not int:
+        entrada['ordenacoes'] = False
+    if entrada['ordenacoes']:
+        if antigo is not None:
+            for campo, lista in _listas_do_registro(entrada, entrada['ordenacoes'], antigo):
+                chave = (_chave_ordenacao(antigo, campo), antigo.get('id'))
+                i = bisect_left(lista, chave)
+                if i < len(lista) and lista[i] == chave:
+                    del lista[i]
+        if novo is not None:
+            for campo, lista in _listas_do_registro(entrada, entrada['ordenacoes'], novo):
+                insort(lista, (_chave_ordenacao(novo, campo), novo.get('id')))
+    if entrada['textos'] is not None:
+        grupo_antigo, pesos_antigos = _texto_do_registro(entrada, antigo)
+        grupo_novo, pesos_novos = _texto_do_registro(entrada, novo)
+        if (grupo_antigo, pesos_antigos) != (grupo_novo, pesos_novos):
+            if pesos_antigos is not None:
+                _desindexar_texto(entrada['textos'], grupo_antigo, antigo.get('id'), pesos_antigos)
+            if pesos_novos is not None:
+                _indexar_texto(entrada['textos'], grupo_novo, novo.get('id'), pesos_novos)
+    if entrada['contagens'] is not None:
+        if antigo is not None:
+            _contar(entrada, antigo, -1)
+        if novo is not None:
+            _contar(entrada, novo, 1)
+    if entrada['agregados'] is not None:
+        if antigo is not None:
+            _agregar(entrada, antigo, -1)
+        if novo is not None:
+            _agregar(entrada, novo, 1)
+    if entrada['digitais']:
+        if antigo is not None:
+            _resumir(entrada, antigo, -1)
+        if novo is not None:
+            _resumir(entrada, novo, 1)
+    prazos = entrada['prazos']
+    if prazos is None:
+        return
+    chave_antiga = _chave_prazo(entrada, antigo)
+    chave_nova = _chave_prazo(entrada, novo)
+    if chave_antiga == chave_nova:
+        return
+    if chave_antiga is not None:
+        i = bisect_left(prazos, chave_antiga)
+        if i < len(prazos) and prazos[i] == chave_antiga:
+            del prazos[i]
+    if chave_nova is not None:
+        insort(prazos, chave_nova)
+
+
+def _registros(entrada):
+    """
+    Retorna a lista de registros da entrada, sem as posições removidas.
+    
+    OBSERVAÇÃO:
+        Não altera a entrada (é chamada por leituras, que não travam o
+        arquivo): com posições removidas, devolve uma lista nova. Quem
+        tira os None da própria entrada é _compactar_removidos(), nas
+        escritas.
+    """
+    if entrada['removidos']:
+        return [r for r in entrada['dados'] if r is not None]
+    return entrada['dados']
+
+
+def _compactar_removidos(entrada):
+    """
+    Tira da entrada as posições removidas (None), se já forem muitas.
+    
+    CRITÉRIO:
+        Só quando os removidos passam da metade da lista: a compactação é
+        O(n) e acontece a cada ~n remoções (custo amortizado O(1)).
+    
+    IMPORTANTE:
+        Deve ser chamada com o arquivo travado para escrita (ver
+        _aplicar_operacao()). Cria uma lista e um índice de posições
+        NOVOS em vez de alterar os atuais.
+    """
+    if entrada['removidos'] * 2 <= len(entrada['dados']):
+        return
+    dados = [r for r in entrada['dados'] if r is not None]
+    posicoes = {}
+    for i, registro in enumerate(dados):
+        posicoes.setdefault(registro.get('id'), i)
+    entrada['dados'] = dados
+    entrada['posicoes'] = posicoes
+    entrada['removidos'] = 0
+
+
+def _aplicar_operacao(entrada, operacao):
+    """
+    Aplica UMA operação (formato do journal) aos dados em memória.
+    
+    PARÂMETROS:
+        entrada (dict): Entrada do armazém (alterada no lugar)
+        operacao (dict): {'op': 'i', 'r': registro}
+                         {'op': 'u', 'id': ..., 'c': campos}
+                         {'op': 'd', 'id': ...}
+    
+    OBSERVAÇÃO:
+        Registros alterados são SUBSTITUÍDOS por uma cópia, nunca
+        modificados no lugar, pois podem estar em uso por quem leu os
+        dados do cache anteriormente.
+    """
+    dados = entrada['dados']
+    modelo = entrada['modelo']
+    posicoes = _posicoes(entrada)
+    tipo = operacao.get('op')
+    if tipo == OP_INSERIR:
+        registro = operacao['r']
+        if modelo is not None and not isinstance(registro, modelo):
+            registro = modelo(registro)
+        posicao = posicoes.get(registro.get('id'))
+        if posicao is not None:
+            _reindexar(entrada, dados[posicao], registro)
+            dados[posicao] = registro
+        else:
+            _reindexar(entrada, None, registro)
+            posicoes[registro.get('id')] = len(dados)
+            dados.append(registro)
+    elif tipo == OP_ATUALIZAR:
+        posicao = posicoes.get(operacao.get('id'))
+        if posicao is not None:
+            registro = {**dados[posicao], **operacao['c']}
+            if modelo is not None:
+                registro = modelo(registro)
+            _reindexar(entrada, dados[posicao], registro)
+            dados[posicao] = registro
+    elif tipo == OP_REMOVER:
+        posicao = posicoes.pop(operacao.get('id'), None)
+        if posicao is not None:
+            _reindexar(entrada, dados[posicao], None)
+            dados[posicao] = None
+            entrada['removidos'] += 1
+            _compactar_removidos(entrada)
+
+
+def _assinatura(caminho_arquivo):
+    """
+    Retorna uma "impressão digital" barata do estado do arquivo em disco.
+    
+    RETORNO:
+        tuple: (inode, mtime, tamanho) do snapshot e do journal
+               (None para o que não existir)
+    """
+    assinatura = []
+    for caminho in (caminho_arquivo, caminho_arquivo + SUFIXO_JOURNAL):
+        try:
+            st = os.stat(caminho)
+            assinatura.append((st.st_ino, st.st_mtime_ns, st.st_size))
+        except OSError:
+            assinatura.append(None)
+    return tuple(assinatura)
+
+
+def _marcar_alterada(caminho_arquivo, entrada):
+    """
+    Registra que 'entrada' é o conteúdo atual do arquivo no disco.
+    
+    Deve ser chamada logo após o próprio processo gravar no disco, para
+    que a próxima leitura reaproveite os dados sem reler o arquivo.
+    """
+    global _VERSAO
+    _VERSAO += 1
+    entrada['versao'] = _VERSAO
+    entrada['assinatura'] = _assinatura(caminho_arquivo)
+    _ARMAZEM[caminho_arquivo] = entrada
+
+
+def _entrada_atualizada(caminho_arquivo):
+    """
+    Devolve a entrada do cache para o arquivo, recarregando se necessário.
+    
+    FUNCIONAMENTO:
+        1. Calcula a assinatura atual do arquivo (os.stat)
+        2. Se for igual à guardada, os dados em memória ainda valem
+        3. Caso contrário (primeira leitura ou outro processo alterou),
+           relê snapshot + journal e atualiza o cache
+    """
+    assinatura = _assinatura(caminho_arquivo)
+    entrada = _ARMAZEM.get(caminho_arquivo)
+    if entrada is None or entrada['assinatura'] != assinatura:
+        # Trava compartilhada: snapshot e journal são lidos de forma
+        # consistente, sem uma compactação acontecendo no meio
+        with transacao(caminho_arquivo, compartilhada=True):
+            assinatura = _assinatura(caminho_arquivo)
+            entrada = _nova_entrada(caminho_arquivo, _ler_snapshot(caminho_arquivo))
+            _aplicar_journal(caminho_arquivo, entrada)
+        _marcar_alterada(caminho_arquivo, entrada)
+        # Se o arquivo mudou depois da leitura, fica com a assinatura lida
+        # para que a próxima chamada recarregue novamente
+        entrada['assinatura'] = assinatura
+    return entrada
+
+
+def invalidar_cache(caminho_arquivo=None):
+    """
+    Descarta os dados em memória (de um arquivo ou de todos).
+    
+    PARÂMETROS:
+        caminho_arquivo (str, opcional): Arquivo a descartar; None = todos
+    
+    USO:
+        Útil quando o arquivo é alterado por fora do sistema e o mtime
+        não mudou (ex: restauração de backup preservando datas).
+    """
+    if caminho_arquivo is None:
+        _ARMAZEM.clear()
+        _BINARIOS.clear()
+    else:
+        _ARMAZEM.pop(caminho_arquivo, None)
+        _BINARIOS.pop(caminho_arquivo, None)
+
+
+def versao_dados(caminho_arquivo, grupo=None):
+    """
+    Retorna um número que muda sempre que os dados do arquivo mudam.
+    
+    PARÂMETROS:
+        grupo (opcional): Responsável cujos dados interessam. No modo
+            'shards' a versão é só a do shard dele; nos demais modos é a
+            do arquivo inteiro (muda também com alterações de outros)
+    
+    RETORNO:
+        int: Versão dos dados em memória (válida apenas neste processo);
+             no modo 'sqlite', contador gravado no próprio banco
+    
+    USO:
+        Parte da chave de caches de resultados (ex: relatórios): se a
+        versão não mudou, o resultado calculado antes ainda vale.
+    """
+    backend = _backend(caminho_arquivo)
+    if backend:
+        return backend.versao_dados(caminho_arquivo, grupo)
+    garantir_diretorio(caminho_arquivo)
+    with _leitura(caminho_arquivo):
+        return _entrada_atualizada(caminho_arquivo)['versao']
+
+
+def etiqueta_dados(caminho_arquivo, grupo=None):
+    """
+    Retorna uma etiqueta que muda sempre que os dados de um grupo mudam.
+    
+    PARÂMETROS:
+        grupo (opcional): Valor do campo de ETIQUETAS (ex: o ID do
+            responsável). None, ou arquivo sem ETIQUETAS = arquivo inteiro
+    
+    RETORNO:
+        str: Igual para os mesmos dados em QUALQUER processo (é calculada
+             do conteúdo, não de um contador em memória como
+             versao_dados()); no modo 'sqlite', contadores por grupo
+             gravados no próprio banco
+    
+    USO:
+        Base das ETags do app web: com vários processos (ex: gunicorn -w 4),
+        cada requisição pode cair em um diferente, e a etiqueta precisa
+        ser a mesma em todos. Alterações de outros responsáveis não mudam
+        a etiqueta de um grupo.
+    
+    DESEMPENHO:
+        O(1) depois da primeira consulta do grupo (ver _digital()).
+    """
+    backend = _backend(caminho_arquivo)
+    if backend:
+        return backend.etiqueta_dados(caminho_arquivo, grupo)
+    garantir_diretorio(caminho_arquivo)
+    with _leitura(caminho_arquivo):
+        entrada = _entrada_atualizada(caminho_arquivo)
+        if entrada['campo_etiqueta'] is None:
+            grupo = None
+        quantidade, digital = _digital(entrada, grupo)
+    return f'{quantidade}-{digital:016x}'
+
+
+def modificacao_dados(caminho_arquivo, grupo=None):
+    """
+    Retorna quando o arquivo foi alterado pela última vez.
+    
+    PARÂMETROS:
+        grupo (opcional): No modo 'shards', só o shard do responsável;
+            nos demais modos vale o arquivo inteiro
+    
+    RETORNO:
+        float: Timestamp (segundos desde a época) da última gravação do
+               snapshot ou do journal; 0.0 se nenhum dos dois existe
+    
+    USO:
+        Cabeçalho Last-Modified do app web. É a data de QUALQUER alteração
+        (pode ser mais nova que a última do grupo), nunca mais antiga.
+    """
+    backend = _backend(caminho_arquivo)
+    if backend:
+        return backend.modificacao_dados(caminho_arquivo, grupo)
+    modificacao = 0.0
+    for caminho in (caminho_arquivo, caminho_arquivo + SUFIXO_JOURNAL):
+        try:
+            modificacao = max(modificacao, os.path.getmtime(caminho))
+        except OSError:
+            pass
+    return modificacao
+
+
+def _backend(caminho_arquivo):
+    """
+    Retorna o módulo que atende o arquivo quando o modo não é JSON.
+    
+    RETORNO:
+        module: utils.banco, se o modo for 'sqlite' e o arquivo for um dos
+                arquivos de dados do sistema (usuários ou tarefas)
+                utils.shards, se o modo for 'shards' e o arquivo for o de
+                tarefas
+        None: O arquivo é tratado como JSON por este próprio módulo
+    """
+    # Importações tardias: utils.banco e utils.shards importam este módulo
+    if MODO_ARMAZENAMENTO == 'sqlite':
+        from utils import banco
+        if caminho_arquivo in banco.TABELAS:
+            return banco
+    elif MODO_ARMAZENAMENTO == 'shards':
+        from utils import shards
+        if caminho_arquivo in shards.CHAVES_SHARD:
+            return shards
+    return None
+
+
+def ler_dados(caminho_arquivo):
+    """
+    Lê e retorna os dados armazenados em um arquivo JSON.
+    
+    PARÂMETROS:
+        caminho_arquivo (str): Caminho do arquivo a ser lido
+    
+    RETORNO:
+        list: Lista de dicionários com os dados (usuários ou tarefas)
+              Retorna [] (lista vazia) se o arquivo não existir ou
+              estiver vazio
+              Usuários e tarefas vêm como Usuario/Tarefa (utils/modelos.py),
+              que se comportam como dicionários somente leitura
+    
+    TRATAMENTO DE ERROS:
+        - FileNotFoundError: Arquivo ainda não foi criado (primeira execução)
+        - JSONDecodeError: Arquivo está corrompido ou vazio
+        - Em ambos os casos, retorna lista vazia para não quebrar o sistema
+    
+    JOURNAL:
+        Se existir um '<arquivo>.journal', suas operações são aplicadas
+        sobre o snapshot, de modo que o resultado é sempre o estado atual.
+    
+    CACHE:
+        Os dados ficam guardados em memória e só são relidos quando o
+        arquivo muda no disco. A lista retornada é uma cópia, mas os
+        dicionários são compartilhados: NÃO os altere diretamente, use
+        atualizar_registro().
+    
+    IMPORTANTE:
+        Esta função garante que o sistema sempre tenha dados válidos,
+        mesmo na primeira execução ou em caso de problemas.
+    """
+    backend = _backend(caminho_arquivo)
+    if backend:
+        return backend.ler_dados(caminho_arquivo)
+    return ler_arquivo_json(caminho_arquivo)
+
+
+def ler_arquivo_json(caminho_arquivo):
+    """
+    Lê o arquivo JSON (snapshot + journal), qualquer que seja o modo.
+    
+    USO:
+        É o que ler_dados() faz nos modos 'json' e 'journal'. Também usado
+        pelo importador do SQLite para ler os arquivos originais.
+    """
+    garantir_diretorio(caminho_arquivo)
+    with _leitura(caminho_arquivo):
+        return list(_registros(_entrada_atualizada(caminho_arquivo)))
+
+
+def iterar_dados(caminho_arquivo):
+    """
+    Gera os registros do arquivo UM de cada vez (leitura em streaming).
+    
+    PARÂMETROS:
+        caminho_arquivo (str): Caminho do arquivo a ser lido
+    
+    RETORNO:
+        generator: Registros no mesmo formato de ler_dados()
+    
+    FUNCIONAMENTO:
+        - Se os dados já estão no cache e o arquivo não mudou, percorre
+          o cache (sem ler o disco nem copiar a lista)
+        - Caso contrário, lê o snapshot em blocos, sem carregar o arquivo
+          inteiro nem preencher o cache (um snapshot .tfb é decodificado
+          registro a registro do mmap); as operações do journal (se
+          houver) são aplicadas a cada registro conforme ele é lido
+    
+    CONSISTÊNCIA:
+        Snapshot e journal são abertos juntos sob trava compartilhada.
+        Depois disso a trava é liberada: como o snapshot só é trocado por
+        os.replace(), o arquivo aberto continua com o conteúdo da abertura
+        mesmo que outro processo grave durante a leitura.
+    
+    USO:
+        Relatórios e exportações, que só precisam filtrar e emitir os
+        registros, com memória constante qualquer que seja o tamanho do
+        arquivo.
+    """
+    backend = _backend(caminho_arquivo)
+    if backend:
+        yield from backend.iterar_dados(caminho_arquivo)
+        return
+    yield from iterar_arquivo_json(caminho_arquivo)
+
+
+def iterar_arquivo_json(caminho_arquivo):
+    """
+    Gera os registros do arquivo JSON (snapshot + journal), qualquer que
+    seja o modo.
+    
+    USO:
+        É o que iterar_dados() faz nos modos 'json' e 'journal'. Também
+        usado pela migração de esquema (utils/esquema.py), que precisa ler
+        o arquivo em streaming mesmo no modo 'sqlite'.
+    """
+    with _leitura(caminho_arquivo):
+        entrada = _ARMAZEM.get(caminho_arquivo)
+        em_dia = entrada is not None and entrada['assinatura'] == _assinatura(caminho_arquivo)
+        dados = entrada['dados'] if em_dia else None
+    if dados is not None:
+        # A compactação de _compactar_removidos() cria uma lista nova,
+        # então a lista percorrida aqui continua válida mesmo que o cache
+        # mude (posições removidas depois viram None e são puladas)
+        for registro in dados:
+            if registro is not None:
+                yield registro
+        return
+
+    with transacao(caminho_arquivo, compartilhada=True):
+        if eh_binario(caminho_arquivo):
+            # .tfb: cada registro é decodificado do mmap quando pedido
+            f = SnapshotBinario(caminho_arquivo)
+        else:
+            try:
+                f = open(caminho_arquivo, 'r', encoding='utf-8')
+            except FileNotFoundError:
+                f = None
+        operacoes = _ler_operacoes_por_id(caminho_arquivo)
+
+    configuracao = arquivo_de_configuracao(caminho_arquivo)
+    if f is not None:
+        with f:
+            registros = f if isinstance(f, SnapshotBinario) else _iterar_snapshot(f)
+            for registro in registros:
+                pendentes = operacoes.pop(registro.get('id'), None)
+                if pendentes:
+                    registro = _reaplicar(registro, pendentes)
+                if registro is not None:
+                    yield converter_registro(configuracao, registro)
+    # Registros que só existem no journal (inseridos após o snapshot)
+    for pendentes in operacoes.values():
+        registro = _reaplicar(None, pendentes)
+        if registro is not None:
+            yield converter_registro(configuracao, registro)
+
+
+def salvar_dados(caminho_arquivo, dados):
+    """
+    Salva uma lista de dados em um arquivo JSON formatado.
+    
+    PARÂMETROS:
+        caminho_arquivo (str): Caminho onde o arquivo será salvo
+        dados (list): Lista de dicionários a ser salva
+    
+    RETORNO:
+        bool: True se salvou com sucesso, False se houve erro
+    
+    FORMATAÇÃO:
+        - indent=4: Salva com indentação de 4 espaços (arquivo legível),
+          ou sem espaços se TASKFLOW_SNAPSHOT=compacto
+        - ensure_ascii=False: Permite acentos e caracteres especiais (UTF-8)
+        - encoding='utf-8': Garante compatibilidade com português
+    
+    JOURNAL:
+        O arquivo salvo passa a ser o snapshot completo, então o journal
+        (se existir) é esvaziado logo em seguida.
+    
+    SEGURANÇA:
+        - Trata exceções para evitar perda de dados em caso de erro
+          de escrita (disco cheio, permissões, etc.)
+        - Grava em arquivo temporário e troca de uma vez (atômico), com o
+          arquivo travado: outros processos nunca veem um JSON pela metade
+    """
+    backend = _backend(caminho_arquivo)
+    if backend:
+        return backend.salvar_dados(caminho_arquivo, dados)
+    garantir_diretorio(caminho_arquivo)
+    try:
+        with transacao(caminho_arquivo):
+            _gravar_atomicamente(caminho_arquivo, dados)
+            if os.path.exists(caminho_arquivo + SUFIXO_JOURNAL):
+                open(caminho_arquivo + SUFIXO_JOURNAL, 'w').close()
+            _marcar_alterada(caminho_arquivo, _nova_entrada(caminho_arquivo, dados))
+        return True
+    except Exception as e:
+        invalidar_cache(caminho_arquivo)
+        print(f"Erro ao salvar dados em {caminho_arquivo}: {e}")
+        return False
+
+
+def _usa_journal():
+    """
+    Indica se as alterações devem ser anexadas ao journal.
+    
+    No modo 'shards' cada arquivo de shard também usa journal.
+    """
+    return MODO_ARMAZENAMENTO in ('journal', 'shards')
+
+
+def _anexar_journal(caminho_arquivo, operacao):
+    """
+    Anexa UMA operação ao journal, em formato JSON compacto (uma por linha).
+    
+    PARÂMETROS:
+        caminho_arquivo (str): Caminho do snapshot correspondente
+        operacao (dict): Operação no formato {'op': ..., ...}
+    
+    RETORNO:
+        bool: True se gravou com sucesso, False se houve erro
+    
+    CUSTO:
+        Apenas uma escrita no final do arquivo, independente da quantidade
+        de registros já existentes. Quando o journal fica maior que o
+        snapshot, é feita uma compactação (custo amortizado continua O(1)).
+    """
+    garantir_diretorio(caminho_arquivo)
+    with transacao(caminho_arquivo):
+        # Só dá para atualizar o cache em memória se ele estiver em dia com
+        # o disco ANTES da escrita; senão ele é descartado e relido depois
+        entrada = _ARMAZEM.get(caminho_arquivo)
+        em_dia = entrada is not None and entrada['assinatura'] == _assinatura(caminho_arquivo)
+        try:
+            linha = json.dumps(operacao, ensure_ascii=False, separators=(',', ':'),
+                               default=para_json)
+            with open(caminho_arquivo + SUFIXO_JOURNAL, 'a', encoding='utf-8') as f:
+                f.write(linha + '\n')
+        except Exception as e:
+            invalidar_cache(caminho_arquivo)
+            print(f"Erro ao registrar operação em {caminho_arquivo}: {e}")
+            return False
+
+        if em_dia:
+            _aplicar_operacao(entrada, operacao)
+            _marcar_alterada(caminho_arquivo, entrada)
+        else:
+            invalidar_cache(caminho_arquivo)
+
+        if _journal_precisa_compactar(caminho_arquivo):
+            compactar_journal(caminho_arquivo)
+    return True
+
+
+def _regravar_com_operacao(caminho_arquivo, operacao):
+    """
+    Modo 'json': aplica UMA operação aos dados em memória e regrava o
+    arquivo inteiro com o resultado.
+    
+    PARÂMETROS:
+        caminho_arquivo (str): Caminho do arquivo de dados
+        operacao (dict): Operação no formato do journal (ver
+                         _aplicar_operacao())
+    
+    RETORNO:
+        bool: True se salvou com sucesso, False se houve erro
+    
+    DESEMPENHO:
+        A gravação continua O(n), mas o registro é encontrado pelo índice
+        de posições e a entrada do cache é a MESMA, alterada como no modo
+        'journal': índices, contadores e agregados seguem valendo, em vez
+        de serem recalculados do zero na próxima leitura.
+    """
+    garantir_diretorio(caminho_arquivo)
+    with transacao(caminho_arquivo):
+        try:
+            entrada = _entrada_atualizada(caminho_arquivo)
+            _aplicar_operacao(entrada, operacao)
+            _gravar_atomicamente(caminho_arquivo, _registros(entrada))
+            if os.path.exists(caminho_arquivo + SUFIXO_JOURNAL):
+                open(caminho_arquivo + SUFIXO_JOURNAL, 'w').close()
+        except Exception as e:
+            # A entrada pode ter sido alterada sem chegar ao disco
+            invalidar_cache(caminho_arquivo)
+            print(f"Erro ao salvar dados em {caminho_arquivo}: {e}")
+            return False
+        _marcar_alterada(caminho_arquivo, entrada)
+    return True
+
+
+def _journal_precisa_compactar(caminho_arquivo):
+    """
+    Decide se o journal já cresceu o suficiente para ser compactado.
+    
+    CRITÉRIO:
+        O journal precisa ter pelo menos LIMITE_MINIMO_JOURNAL bytes e ser
+        maior que o próprio snapshot. Como o snapshot cresce junto com os
+        dados, a compactação (O(n)) ocorre a cada ~n operações, mantendo o
+        custo amortizado de cada escrita constante.
+    """
+    try:
+        tamanho_journal = os.path.getsize(caminho_arquivo + SUFIXO_JOURNAL)
+    except OSError:
+        return False
+    try:
+        tamanho_snapshot = os.path.getsize(caminho_arquivo)
+    except OSError:
+        tamanho_snapshot = 0
+    return tamanho_journal >= max(LIMITE_MINIMO_JOURNAL, tamanho_snapshot)
+
+
+def compactar_journal(caminho_arquivo):
+    """
+    Incorpora o journal ao snapshot e esvazia o journal.
+    
+    PARÂMETROS:
+        caminho_arquivo (str): Caminho do snapshot
+    
+    RETORNO:
+        bool: True se compactou com sucesso, False se houve erro
+    """
+    with transacao(caminho_arquivo):
+        entrada = _entrada_atualizada(caminho_arquivo)
+        if not salvar_dados(caminho_arquivo, _registros(entrada)):
+            return False
+        # Os dados não mudaram: índices e contadores continuam valendo
+        _ARMAZEM[caminho_arquivo]['prazos'] = entrada['prazos']
+        _ARMAZEM[caminho_arquivo]['valores'] = entrada['valores']
+        _ARMAZEM[caminho_arquivo]['ordenacoes'] = entrada['ordenacoes']
+        _ARMAZEM[caminho_arquivo]['textos'] = entrada['textos']
+        _ARMAZEM[caminho_arquivo]['contagens'] = entrada['contagens']
+        _ARMAZEM[caminho_arquivo]['agregados'] = entrada['agregados']
+        _ARMAZEM[caminho_arquivo]['digitais'] = entrada['digitais']
+        return True
+
+
+def _proximo_id(caminho_arquivo):
+    """
+    Gera o próximo ID a partir da sequência gravada em '<arquivo>.seq'.
+    
+    FUNCIONAMENTO:
+        - O arquivo .seq guarda o último ID entregue, então IDs nunca são
+          reaproveitados, mesmo depois de excluir o registro mais recente
+        - Na primeira vez (sem .seq), a sequência parte do maior ID atual
+        - Se o .seq estiver defasado (ex: dados restaurados de backup) e o
+          ID já existir, volta a partir do maior ID atual
+    
+    IMPORTANTE:
+        Deve ser chamada com o arquivo travado (dentro de transacao()),
+        senão dois processos podem escolher o mesmo ID.
+    """
+    caminho_sequencia = caminho_arquivo + SUFIXO_SEQUENCIA
+    entrada = _entrada_atualizada(caminho_arquivo)
+    try:
+        with open(caminho_sequencia, 'r', encoding='utf-8') as f:
+            novo_id = int(f.read()) + 1
+    except (FileNotFoundError, ValueError):
+        novo_id = None
+    if novo_id is None or novo_id in _posicoes(entrada):
+        novo_id = max((r.get('id') or 0 for r in _registros(entrada)), default=0) + 1
+
+    temporario = caminho_sequencia + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write(str(novo_id))
+    os.replace(temporario, caminho_sequencia)
+    return novo_id
+
+
+def inserir_registro(caminho_arquivo, registro):
+    """
+    Adiciona um novo registro ao arquivo.
+    
+    PARÂMETROS:
+        caminho_arquivo (str): Caminho do arquivo de dados
+        registro (dict): Registro completo. Se não tiver 'id' (ou se for
+                         None), um ID novo é gerado com o arquivo travado.
+    
+    RETORNO:
+        dict: O registro salvo (já com o 'id' definitivo)
+        None: Se houve erro ao salvar
+    
+    MODOS:
+        - 'json': adiciona aos dados em memória e regrava o arquivo
+          (ver _regravar_com_operacao())
+        - 'journal': apenas anexa a operação ao journal
+        - 'sqlite': insere uma linha na tabela
+    """
+    backend = _backend(caminho_arquivo)
+    if backend:
+        return backend.inserir_registro(caminho_arquivo, registro)
+    with transacao(caminho_arquivo):
+        if registro.get('id') is None:
+            registro = {**registro, 'id': _proximo_id(caminho_arquivo)}
+        if _usa_journal():
+            ok = _anexar_journal(caminho_arquivo, {'op': OP_INSERIR, 'r': registro})
+        else:
+            ok = _regravar_com_operacao(caminho_arquivo, {'op': OP_INSERIR, 'r': registro})
+    return registro if ok else None
+
+
+def atualizar_registro(caminho_arquivo, registro_id, campos):
+    """
+    Altera campos de um registro existente, identificado pelo 'id'.
+    
+    PARÂMETROS:
+        caminho_arquivo (str): Caminho do arquivo de dados
+        registro_id (int): ID do registro a alterar
+        campos (dict): Campos a sobrescrever (ex: {'status': 'Concluída'})
+    
+    RETORNO:
+        bool: True se salvou com sucesso, False se houve erro
+    
+    OBSERVAÇÃO:
+        Não verifica se o registro existe; quem chama (tarefas.py,
+        usuarios.py) já faz essa validação antes.
+    """
+    backend = _backend(caminho_arquivo)
+    if backend:
+        return backend.atualizar_registro(caminho_arquivo, registro_id, campos)
+    operacao = {'op': OP_ATUALIZAR, 'id': registro_id, 'c': campos}
+    if _usa_journal():
+        return _anexar_journal(caminho_arquivo, operacao)
+    return _regravar_com_operacao(caminho_arquivo, operacao)
+
+
+def remover_registro(caminho_arquivo, registro_id):
+    """
+    Remove um registro do arquivo, identificado pelo 'id'.
+    
+    PARÂMETROS:
+        caminho_arquivo (str): Caminho do arquivo de dados
+        registro_id (int): ID do registro a remover
+    
+    RETORNO:
+        bool: True se salvou com sucesso, False se houve erro
+    """
+    backend = _backend(caminho_arquivo)
+    if backend:
+        return backend.remover_registro(caminho_arquivo, registro_id)
+    operacao = {'op': OP_REMOVER, 'id': registro_id}
+    if _usa_journal():
+        return _anexar_journal(caminho_arquivo, operacao)
+    return _regravar_com_operacao(caminho_arquivo, operacao)
+
+
+def obter_registro(caminho_arquivo, registro_id):
+    """
+    Busca um único registro pelo seu ID.
+    
+    PARÂMETROS:
+        caminho_arquivo (str): Caminho do arquivo de dados
+        registro_id (int): ID procurado
+    
+    RETORNO:
+        dict: O registro encontrado
+        None: Se não existir registro com esse ID
+    
+    DESEMPENHO:
+        O(1): usa o índice por ID mantido em memória (ou a chave primária
+        no modo SQLite), sem percorrer a lista de registros.
+        Com o cache vazio e o snapshot em .tfb (TASKFLOW_SNAPSHOT=binario),
+        decodifica só o registro pedido (ver _snapshot_binario()), sem
+        carregar o arquivo.
+    """
+    backend = _backend(caminho_arquivo)
+    if backend:
+        return backend.obter_registro(caminho_arquivo, registro_id)
+    garantir_diretorio(caminho_arquivo)
+    # Busca O(1) pelo índice ID -> posição mantido no armazém
+    with _leitura(caminho_arquivo):
+        assinatura = _assinatura(caminho_arquivo)
+        entrada = _ARMAZEM.get(caminho_arquivo)
+        if entrada is None or entrada['assinatura'] != assinatura:
+            aberto = _snapshot_binario(caminho_arquivo, assinatura)
+            if aberto is not None:
+                registro = aberto['snapshot'].por_id(registro_id)
+                pendentes = aberto['operacoes'].get(registro_id)
+                if pendentes:
+                    registro = _reaplicar(registro, pendentes)
+                return converter_registro(arquivo_de_configuracao(caminho_arquivo), registro)
+        entrada = _entrada_atualizada(caminho_arquivo)
+        posicao = _posicoes(entrada).get(registro_id)
+        return entrada['dados'][posicao] if posicao is not None else None
+
+
+def _snapshot_binario(caminho_arquivo, assinatura):
+    """
+    Snapshot .tfb do arquivo aberto para buscas por ID, sem o cache.
+    
+    FUNCIONAMENTO:
+        Abre o arquivo (mmap: só o cabeçalho é lido) e agrupa as operações
+        do journal por ID, sob trava compartilhada. O resultado fica em
+        _BINARIOS e é reaproveitado enquanto a assinatura do arquivo não
+        mudar; quando muda, o snapshot anterior é fechado e reaberto.
+    
+    RETORNO:
+        dict: {'assinatura', 'snapshot' (SnapshotBinario), 'operacoes'}
+        None: O snapshot não está no formato .tfb
+    
+    IMPORTANTE:
+        Deve ser chamada sob _leitura(caminho_arquivo): é essa trava que
+        garante que ninguém usa o snapshot anterior enquanto ele é fechado.
+    """
+    aberto = _BINARIOS.get(caminho_arquivo)
+    if aberto is not None and aberto['assinatura'] == assinatura:
+        return aberto
+    with transacao(caminho_arquivo, compartilhada=True):
+        if not eh_binario(caminho_arquivo):
+            return None
+        novo = {'assinatura': _assinatura(caminho_arquivo),
+                'snapshot': SnapshotBinario(caminho_arquivo),
+                'operacoes': _ler_operacoes_por_id(caminho_arquivo)}
+    if aberto is not None:
+        aberto['snapshot'].fechar()
+    _BINARIOS[caminho_arquivo] = novo
+    return novo
+
+
+def consultar_registros(caminho_arquivo, prazo_antes=None, prazo_desde=None, **iguais):
+    """
+    Busca os registros que atendem a todos os critérios informados.
+    
+    PARÂMETROS:
+        caminho_arquivo (str): Caminho do arquivo de dados
+        prazo_antes (int, opcional): Apenas registros cujo 'prazo' (como
+                                     ordinal, ver utils/datas.py) seja
+                                     MENOR que este valor. Registros com
+                                     prazo inválido são ignorados.
+        prazo_desde (int, opcional): Apenas registros cujo prazo seja
+                                     MAIOR OU IGUAL a este valor
+        **iguais: Campos que devem ter exatamente o valor informado
+                  (ex: responsavel_id=1, status='Pendente', login='ana')
+    
+    RETORNO:
+        list: Registros encontrados, na ordem em que estão armazenados
+    
+    EXEMPLO:
+        consultar_registros(ARQUIVO_TAREFAS, responsavel_id=1, status='Pendente')
+    
+    DESEMPENHO:
+        No modo 'sqlite' vira uma consulta que usa os índices do banco.
+        Nos modos JSON usa os índices em memória quando algum serve (ver
+        _consultar_indexado()) e só percorre todos os dados se nenhum servir.
+    """
+    backend = _backend(caminho_arquivo)
+    if backend:
+        return backend.consultar_registros(caminho_arquivo, prazo_antes, prazo_desde, **iguais)
+    garantir_diretorio(caminho_arquivo)
+    with _leitura(caminho_arquivo):
+        entrada = _entrada_atualizada(caminho_arquivo)
+        resultado = _consultar_indexado(entrada, prazo_desde, prazo_antes, iguais)
+        if resultado is not None:
+            return resultado
+        return list(_filtrar(_registros(entrada), prazo_desde, prazo_antes, iguais))
+
+
+def _consultar_indexado(entrada, prazo_desde, prazo_antes, iguais):
+    """
+    Responde a consulta pelos índices em memória, quando possível.
+    
+    ÍNDICES CANDIDATOS:
+        - Índice de prazos: se algum limite de prazo foi informado e o
+          filtro do índice está entre os critérios (ex: status='Pendente');
+          os IDs vêm de um recorte por busca binária
+        - Índices por campo: se um campo indexado está entre os critérios
+          (ex: responsavel_id=3); os IDs vêm direto do índice
+        Entre os candidatos, usa o que tiver MENOS IDs; os demais
+        critérios são conferidos só nesses registros.
+    
+    RETORNO:
+        list: Registros encontrados, na ordem em que estão armazenados
+        None: Nenhum índice serve para esta consulta
+    """
+    candidatos = []
+    filtro = entrada['filtro_prazo']
+    if (filtro is not None and (prazo_antes is not None or prazo_desde is not None)
+            and filtro[0] in iguais and iguais[filtro[0]] == filtro[1]):
+        prazos = _indice_prazos(entrada)
+        inicio = 0 if prazo_desde is None else bisect_left(prazos, (prazo_desde,))
+        fim = len(prazos) if prazo_antes is None else bisect_left(prazos, (prazo_antes,))
+        candidatos.append([registro_id for _, registro_id in prazos[inicio:fim]])
+    ids_campo = _ids_do_indice(entrada, iguais)
+    if ids_campo is not None:
+        candidatos.append(ids_campo)
+    if not candidatos:
+        return None
+
+    ids = min(candidatos, key=len)
+    posicoes = _posicoes(entrada)
+    dados = entrada['dados']
+    # set(): com IDs repetidos (dados antigos) a posição seria a mesma
+    encontrados = sorted({posicoes[i] for i in ids if i in posicoes})
+    return list(_filtrar((dados[i] for i in encontrados), prazo_desde, prazo_antes, iguais))
+
+
+def _ids_do_indice(entrada, iguais):
+    """
+    IDs (em ordem) do índice por campo mais seletivo entre os critérios.
+    
+    RETORNO:
+        list: IDs dos registros com o valor pedido no campo indexado
+        None: Nenhum campo indexado está entre os critérios
+    """
+    if not any(campo in iguais for campo in entrada['campos_indexados']):
+        return None
+    indices = _indice_valores(entrada)
+    if indices is None:
+        return None
+    melhor = None
+    for campo, indice in indices.items():
+        if campo in iguais:
+            try:
+                ids = indice.get(iguais[campo], ())
+            except TypeError:  # valor que não pode ser chave de dicionário
+                continue
+            if melhor is None or len(ids) < len(melhor):
+                melhor = ids
+    return melhor
+
+
+def paginar_registros(caminho_arquivo, apos=None, limite=50, decrescente=False,
+                      ordenar_por=None, prazo_antes=None, prazo_desde=None, **iguais):
+    """
+    Retorna UMA página da consulta, em ordem (paginação por chave).
+    
+    PARÂMETROS:
+        caminho_arquivo (str): Caminho do arquivo de dados
+        apos (opcional): Posição devolvida pela página anterior; a página
+                         começa logo depois dela (None = início)
+        limite (int): Quantidade máxima de registros na página
+        decrescente (bool): Se True, do maior para o menor
+        ordenar_por (str, opcional): Campo de INDICES_ORDENACAO (ex:
+                                     'prazo', 'titulo'); None = ordem de ID
+        prazo_antes, prazo_desde, **iguais: Critérios, como em
+                                            consultar_registros()
+    
+    RETORNO:
+        tuple: (registros da página, posição para pedir a próxima página
+               ou None se esta for a última)
+    
+    PAGINAÇÃO POR CHAVE:
+        Em vez de "pular N registros" (OFFSET), a página seguinte começa
+        depois do último registro visto: a posição é o ID (ou [valor do
+        campo ordenado, ID], ver posicao_na_ordem()). Como IDs nunca são
+        reaproveitados (ver _proximo_id()), inclusões e exclusões feitas
+        entre uma página e outra não fazem registros se repetirem nem
+        serem pulados.
+    
+    DESEMPENHO:
+        Com o campo de grupo do índice entre os critérios (ex:
+        responsavel_id), é uma busca binária nas listas já ordenadas
+        (_indice_ordenacao() ou _indice_valores()) + a leitura da página,
+        sem ordenar nada na hora. No modo 'sqlite' vira
+        WHERE (chave, id) > (?, ?) ORDER BY chave, id LIMIT ?.
+    """
+    backend = _backend(caminho_arquivo)
+    if backend:
+        return backend.paginar_registros(caminho_arquivo, apos, limite, decrescente, ordenar_por,
+                                         prazo_antes, prazo_desde, **iguais)
+    garantir_diretorio(caminho_arquivo)
+    with _leitura(caminho_arquivo):
+        entrada = _entrada_atualizada(caminho_arquivo)
+        ordem = _em_ordem_indexada(entrada, apos, decrescente, ordenar_por, iguais)
+        if ordem is None:
+            # Sem índice: percorre os dados guardando só os 'limite' primeiros
+            def posicao(registro):
+                return posicao_na_ordem(registro, ordenar_por)
+            registros = (r for r in _filtrar(_registros(entrada), prazo_desde, prazo_antes, iguais)
+                         if type(r.get('id')) is int and _depois_de(posicao(r), apos, decrescente))
+            escolher = heapq.nlargest if decrescente else heapq.nsmallest
+            pagina = escolher(limite + 1, registros, key=posicao)
+        else:
+            pagina = list(islice(_filtrar(ordem, prazo_desde, prazo_antes, iguais), limite + 1))
+    return fechar_pagina(pagina, limite, ordenar_por)
+
+
+def posicao_na_ordem(registro, ordenar_por=None):
+    """
+    Posição do registro na ordem da paginação (ver paginar_registros()).
+    
+    RETORNO:
+        int: O ID, na ordem de ID
+        list: [valor do campo para ordenar, ID] nas demais (o ID desempata
+              registros com o mesmo valor). Listas para virar JSON no cursor.
+    """
+    if ordenar_por is None:
+        return registro.get('id')
+    return [_chave_ordenacao(registro, ordenar_por), registro.get('id')]
+
+
+def fechar_pagina(registros, limite, ordenar_por=None):
+    """
+    Corta a página e calcula a posição da próxima.
+    
+    PARÂMETROS:
+        registros (list): Até limite + 1 registros, em ordem (o registro a
+                          mais só indica que existe próxima página)
+    
+    RETORNO:
+        tuple: (registros, posição do último ou None se não há próxima)
+    """
+    if len(registros) <= limite:
+        return registros, None
+    registros = registros[:limite]
+    return registros, posicao_na_ordem(registros[-1], ordenar_por)
+
+
+def _chave_ordenacao(registro, campo):
+    """Valor do campo para ordenar (ver Registro.chave_ordenacao())."""
+    if isinstance(registro, Registro):
+        return registro.chave_ordenacao(campo)
+    valor = registro.get(campo)
+    return '' if valor is None else valor
+
+
+def _depois_de(posicao, apos, decrescente):
+    """Indica se a posição vem depois de 'apos' na ordem da paginação."""
+    if apos is None:
+        return True
+    return posicao < apos if decrescente else posicao > apos
+
+
+def _em_ordem_indexada(entrada, apos, decrescente, ordenar_por, iguais):
+    """
+    Gera os registros candidatos já na ordem da paginação, pelos índices.
+    
+    FUNCIONAMENTO:
+        - Ordem de ID: a lista ordenada de IDs do índice por campo
+        - Ordem por campo: as listas (valor, ID) de _indice_ordenacao();
+          sem o subgrupo nos critérios (ex: sem status), as listas de
+          todos os subgrupos do grupo são intercaladas com heapq.merge
+        Em todos os casos a leitura começa por busca binária em 'apos'.
+    
+    RETORNO:
+        generator: Registros a partir da posição (sem os demais critérios)
+        None: Nenhum índice serve para esta consulta
+    """
+    if ordenar_por is None:
+        ids = _ids_do_indice(entrada, iguais)
+        if ids is None:
+            return None
+        listas = [ids]
+    else:
+        listas = _listas_ordenadas(entrada, ordenar_por, iguais)
+        if listas is None:
+            return None
+        if apos is not None:
+            apos = tuple(apos)
+
+    partes = []
+    for lista in listas:
+        # map() guarda a lista de cada volta (sem copiar o recorte)
+        if decrescente:
+            fim = len(lista) if apos is None else bisect_left(lista, apos)
+            partes.append(map(lista.__getitem__, range(fim - 1, -1, -1)))
+        else:
+            inicio = 0 if apos is None else bisect_right(lista, apos)
+            partes.append(map(lista.__getitem__, range(inicio, len(lista))))
+    chaves = partes[0] if len(partes) == 1 else heapq.merge(*partes, reverse=decrescente)
+
+    posicoes = _posicoes(entrada)
+    dados = entrada['dados']
+    if ordenar_por is None:
+        return (dados[posicoes[i]] for i in chaves if i in posicoes)
+    return (dados[posicoes[i]] for _, i in chaves if i in posicoes)
+
+
+def buscar_registros(caminho_arquivo, consulta, apos=None, limite=50, **iguais):
+    """
+    Busca textual: registros cujos textos contêm TODOS os termos da
+    consulta, dos mais relevantes para os menos relevantes.
+    
+    PARÂMETROS:
+        caminho_arquivo (str): Arquivo com índice textual (INDICES_TEXTO)
+        consulta (str): Texto digitado (ver utils/busca.py); cada termo
+                        casa com os termos que COMEÇAM com ele
+        apos (opcional): Posição devolvida pela página anterior
+        limite (int): Quantidade máxima de registros na página
+        **iguais: Demais critérios (ex: responsavel_id=3)
+    
+    RETORNO:
+        tuple: (registros da página, posição da próxima ou None)
+    
+    RELEVÂNCIA:
+        Soma, para cada termo da consulta, o peso do termo no registro
+        (título vale mais que descrição) vezes o quanto ele é raro no
+        grupo (IDF: log(1 + documentos / documentos com o termo)). Termos
+        encontrados só como prefixo valem metade. Empates ficam em ordem
+        de ID. A posição é [-relevância, ID].
+    
+    DESEMPENHO:
+        Não lê os textos na hora: o índice invertido leva direto aos IDs
+        que contêm cada termo. No modo 'sqlite' a busca usa uma tabela
+        FTS5 (ver utils/banco.py).
+    """
+    backend = _backend(caminho_arquivo)
+    if backend:
+        return backend.buscar_registros(caminho_arquivo, consulta, apos, limite, **iguais)
+    return fechar_busca(buscar_com_posicoes(caminho_arquivo, consulta, apos, limite, **iguais),
+                        limite)
+
+
+def buscar_com_posicoes(caminho_arquivo, consulta, apos=None, limite=50, **iguais):
+    """
+    Parte de buscar_registros() nos modos JSON: devolve a página ainda
+    com a posição de cada registro, para intercalar resultados de vários
+    arquivos (ver utils/shards.py).
+    
+    RETORNO:
+        list: Até limite + 1 tuplas ([-relevância, ID], registro), em ordem
+    """
+    termos_busca = termos_da_consulta(consulta)
+    if not termos_busca:
+        return []
+    garantir_diretorio(caminho_arquivo)
+    with _leitura(caminho_arquivo):
+        entrada = _entrada_atualizada(caminho_arquivo)
+        indice = _indice_texto(entrada)
+        campo_grupo, _ = entrada['texto']
+        if campo_grupo in iguais:
+            try:
+                grupos = [indice[iguais[campo_grupo]]] if iguais[campo_grupo] in indice else []
+            except TypeError:  # valor que não pode ser chave de dicionário
+                grupos = []
+        else:
+            grupos = list(indice.values())
+
+        posicoes = _posicoes(entrada)
+        dados = entrada['dados']
+        candidatos = []
+        for grupo in grupos:
+            for registro_id, relevancia in _relevancias(grupo, termos_busca).items():
+                posicao = posicoes.get(registro_id)
+                if posicao is None:
+                    continue
+                chave = [-relevancia, registro_id]
+                if apos is None or chave > list(apos):
+                    candidatos.append((chave, dados[posicao]))
+        candidatos = [c for c in candidatos
+                      if all(c[1].get(campo) == valor for campo, valor in iguais.items())]
+        return heapq.nsmallest(limite + 1, candidatos, key=lambda c: c[0])
+
+
+def fechar_busca(resultados, limite):
+    """
+    Corta a página da busca (tuplas (posição, registro), até limite + 1).
+    
+    RETORNO:
+        tuple: (registros, posição do último ou None se não há próxima)
+    """
+    registros = [registro for _, registro in resultados[:limite]]
+    if len(resultados) <= limite:
+        return registros, None
+    return registros, resultados[limite - 1][0]
+
+
+def _relevancias(grupo, termos_busca):
+    """
+    Relevância de cada registro do grupo que contém todos os termos.
+    
+    RETORNO:
+        dict: {ID: relevância} (vazio se algum termo não aparece)
+    """
+    vocabulario = grupo['vocabulario']
+    documentos = grupo['documentos']
+    resultado = None
+    for termo_busca in termos_busca:
+        pontos = {}
+        i = bisect_left(vocabulario, termo_busca)
+        while i < len(vocabulario) and vocabulario[i].startswith(termo_busca):
+            termo = vocabulario[i]
+            postagens = grupo['termos'][termo]
+            fator = math.log(1 + documentos / len(postagens))
+            if termo != termo_busca:
+                fator /= 2
+            for registro_id, peso in postagens.items():
+                pontos[registro_id] = pontos.get(registro_id, 0) + peso * fator
+            i += 1
+        if resultado is None:
+            resultado = pontos
+        else:
+            resultado = {registro_id: valor + pontos[registro_id]
+                         for registro_id, valor in resultado.items() if registro_id in pontos}
+        if not resultado:
+            return {}
+    return resultado
+
+
+def contar_registros(caminho_arquivo, grupo):
+    """
+    Retorna os contadores de um grupo de registros, sem percorrê-los.
+    
+    PARÂMETROS:
+        caminho_arquivo (str): Arquivo com contadores (ver CONTADORES)
+        grupo: Valor do campo de agrupamento (ex: o ID do responsável)
+    
+    RETORNO:
+        dict: {'total': n,
+               'valores': {valor do campo contado: n},
+               'atrasados': n (registros do índice de prazos vencidos)}
+    
+    EXEMPLO:
+        contar_registros(ARQUIVO_TAREFAS, 1)
+        -> {'total': 3, 'valores': {'Pendente': 2, 'Concluída': 1},
+            'atrasados': 1}
+    
+    DESEMPENHO:
+        O(1): os contadores ficam em memória e são atualizados a cada
+        alteração. No modo SQLite vira uma contagem indexada.
+    """
+    backend = _backend(caminho_arquivo)
+    if backend:
+        return backend.contar_registros(caminho_arquivo, grupo)
+    garantir_diretorio(caminho_arquivo)
+    with _leitura(caminho_arquivo):
+        contagem = _contagens(_entrada_atualizada(caminho_arquivo))['grupos'].get(grupo)
+        if contagem is None:
+            return {'total': 0, 'valores': {}, 'atrasados': 0}
+        return {'total': contagem['total'], 'valores': dict(contagem['valores']),
+                'atrasados': contagem['atrasados']}
+
+
+def agregar_registros(caminho_arquivo, grupo, desde=None, ate=None):
+    """
+    Retorna os totais por dia de um grupo, sem percorrer os registros.
+    
+    PARÂMETROS:
+        caminho_arquivo (str): Arquivo com agregados (ver AGREGADOS)
+        grupo: Valor do campo de agrupamento (ex: o ID do responsável)
+        desde, ate (int, opcionais): Primeiro e último dia (ordinais)
+    
+    RETORNO:
+        list: Pares (dia, [criados, concluídos, atrasados, soma dos
+              tempos até a conclusão em segundos, quantidade de tempos]),
+              em ordem de dia; dias sem eventos não aparecem
+    
+    EXEMPLO:
+        agregar_registros(ARQUIVO_TAREFAS, 1, desde=739000, ate=739006)
+        -> [(739001, [2, 1, 0, 5400, 1]), (739004, [0, 1, 1, 0, 0])]
+    
+    DESEMPENHO:
+        O(dias com eventos do grupo): os agregados ficam em memória e são
+        atualizados a cada alteração (ver eventos_agregados()). No modo
+        SQLite ficam em uma tabela própria, atualizada junto com a tarefa.
+    """
+    backend = _backend(caminho_arquivo)
+    if backend:
+        return backend.agregar_registros(caminho_arquivo, grupo, desde, ate)
+    garantir_diretorio(caminho_arquivo)
+    with _leitura(caminho_arquivo):
+        dias = _agregados(_entrada_atualizada(caminho_arquivo)).get(grupo, {})
+        return sorted((dia, list(vetor)) for dia, vetor in dias.items()
+                      if (desde is None or dia >= desde) and (ate is None or dia <= ate))
+
+
+def iterar_registros(caminho_arquivo, prazo_antes=None, prazo_desde=None, **iguais):
+    """
+    Versão em streaming de consultar_registros(): gera os registros
+    encontrados um de cada vez, lendo-os com iterar_dados().
+    
+    RETORNO:
+        generator: Registros que atendem a todos os critérios
+    
+    DESEMPENHO:
+        No modo 'sqlite' os registros vêm direto do cursor da consulta
+        indexada; nos demais, cada registro é filtrado assim que é lido.
+        Com os dados já em memória, usa os índices quando algum serve
+        para a consulta (como consultar_registros()).
+    """
+    backend = _backend(caminho_arquivo)
+    if backend:
+        yield from backend.iterar_registros(caminho_arquivo, prazo_antes, prazo_desde, **iguais)
+        return
+    resultado = None
+    with _leitura(caminho_arquivo):
+        entrada = _ARMAZEM.get(caminho_arquivo)
+        if entrada is not None and entrada['assinatura'] == _assinatura(caminho_arquivo):
+            resultado = _consultar_indexado(entrada, prazo_desde, prazo_antes, iguais)
+    if resultado is not None:
+        yield from resultado
+        return
+    yield from _filtrar(iterar_dados(caminho_arquivo), prazo_desde, prazo_antes, iguais)
+
+
+def _filtrar(registros, prazo_desde, prazo_antes, iguais):
+    """Gera os registros que atendem aos critérios de consultar_registros()."""
+    for registro in registros:
+        if any(registro.get(campo) != valor for campo, valor in iguais.items()):
+            continue
+        if prazo_antes is not None or prazo_desde is not None:
+            prazo = _prazo_de(registro)
+            if prazo is None:
+                continue
+            if prazo_antes is not None and prazo >= prazo_antes:
+                continue
+            if prazo_desde is not None and prazo < prazo_desde:
+                continue
+        yield registro
@@ -0,0 +1,771 @@
+"""
+================================================================================
+MÓDULO: utils/banco.py
+================================================================================
+DESCRIÇÃO:
+    Backend de armazenamento em SQLite (banco de dados em um único
+    arquivo local, incluído na biblioteca padrão do Python).
+    Oferece as MESMAS funções de utils/arquivos.py (ler_dados,
+    salvar_dados, inserir_registro, ...), de modo que tarefas.py,
+    usuarios.py e relatorios.py funcionam sem alteração.
+
+ATIVAÇÃO:
+    TASKFLOW_ARMAZENAMENTO=sqlite       (escolhe este backend)
+    TASKFLOW_BANCO=data/taskflow.db     (opcional: caminho do banco)
+
+ESTRUTURA DAS TABELAS:
+    Cada registro é guardado inteiro (JSON) na coluna 'dados', e os campos
+    usados em buscas são copiados para colunas próprias COM ÍNDICE:
+    - tarefas:  responsavel_id, status, prazo (como ordinal, ordenável)
+    - usuarios: login
+
+    Assim, listar as tarefas de um usuário, fazer login e gerar os três
+    relatórios viram consultas indexadas em vez de varrer todos os dados.
+
+    A busca textual usa a tabela FTS5 'tarefas_busca' (título e descrição,
+    sem acentos), mantida por gatilhos a cada alteração em 'tarefas'.
+
+IMPORTAÇÃO DOS ARQUIVOS JSON:
+    python -m utils.banco
+    Copia data/usuarios.json e data/tarefas.json para o banco (uma vez).
+================================================================================
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+from utils import arquivos
+from utils.arquivos import ARQUIVO_TAREFAS, ARQUIVO_USUARIOS
+from utils.busca import termos_da_consulta
+from utils.datas import data_para_ordinal, ordinal_hoje
+from utils.modelos import para_json
+
+# Caminho do arquivo do banco de dados
+ARQUIVO_BANCO = os.environ.get('TASKFLOW_BANCO', 'data/taskflow.db')
+
+# Arquivo JSON "lógico" -> (tabela, colunas indexadas)
+TABELAS = {
+    ARQUIVO_TAREFAS: ('tarefas', ('responsavel_id', 'status', 'prazo')),
+    ARQUIVO_USUARIOS: ('usuarios', ('login',)),
+}
+
+# Arquivo JSON "lógico" -> tabela dos agregados por dia (arquivos.AGREGADOS)
+TABELAS_AGREGADOS = {
+    ARQUIVO_TAREFAS: 'tarefas_agregados',
+}
+
+_COLUNAS_AGREGADOS = ('criadas', 'concluidas', 'atrasadas', 'soma_tempo', 'quantidade_tempo')
+
+# Ordenações de paginar_registros(): campo -> expressão SQL da chave (as
+# mesmas expressões dos índices do esquema, para que o SQLite os use).
+# Títulos usam casefold() (ver _casefold()), a mesma chave dos modos JSON
+ORDENACOES = {
+    ARQUIVO_TAREFAS: {
+        'criacao': 'id',
+        'prazo': 'COALESCE(prazo, 0)',
+        'titulo': "casefold(json_extract(dados, '$.titulo'))",
+    },
+}
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS tarefas (
+    id INTEGER PRIMARY KEY,
+    responsavel_id INTEGER,
+    status TEXT,
+    prazo INTEGER,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tarefas_responsavel ON tarefas (responsavel_id, status);
+CREATE INDEX IF NOT EXISTS idx_tarefas_status ON tarefas (status, prazo);
+CREATE INDEX IF NOT EXISTS idx_tarefas_prazo ON tarefas (prazo);
+CREATE INDEX IF NOT EXISTS idx_tarefas_responsavel_id ON tarefas (responsavel_id, id);
+CREATE INDEX IF NOT EXISTS idx_tarefas_responsavel_prazo
+    ON tarefas (responsavel_id, COALESCE(prazo, 0), id);
+DROP INDEX IF EXISTS idx_tarefas_responsavel_titulo;
+CREATE INDEX IF NOT EXISTS idx_tarefas_responsavel_titulo_casefold
+    ON tarefas (responsavel_id, casefold(json_extract(dados, '$.titulo')), id);
+
+-- Busca textual (ver buscar_registros()): rowid = id da tarefa
+CREATE VIRTUAL TABLE IF NOT EXISTS tarefas_busca USING fts5(
+    titulo, descricao, tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS tarefas_busca_inserir AFTER INSERT ON tarefas BEGIN
+    DELETE FROM tarefas_busca WHERE rowid = new.id;
+    INSERT INTO tarefas_busca (rowid, titulo, descricao)
+    VALUES (new.id, json_extract(new.dados, '$.titulo'), json_extract(new.dados, '$."descrição"'));
+END;
+CREATE TRIGGER IF NOT EXISTS tarefas_busca_alterar AFTER UPDATE ON tarefas BEGIN
+    DELETE FROM tarefas_busca WHERE rowid = old.id;
+    INSERT INTO tarefas_busca (rowid, titulo, descricao)
+    VALUES (new.id, json_extract(new.dados, '$.titulo'), json_extract(new.dados, '$."descrição"'));
+END;
+CREATE TRIGGER IF NOT EXISTS tarefas_busca_remover AFTER DELETE ON tarefas BEGIN
+    DELETE FROM tarefas_busca WHERE rowid = old.id;
+END;
+
+-- Versão dos dados de cada tabela (ver versao_dados()): qualquer
+-- alteração, de qualquer processo, avança o contador
+CREATE TABLE IF NOT EXISTS versoes (
+    tabela TEXT PRIMARY KEY,
+    versao INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS tarefas_versao_inserir AFTER INSERT ON tarefas BEGIN
+    INSERT INTO versoes (tabela, versao) VALUES ('tarefas', 1)
+    ON CONFLICT (tabela) DO UPDATE SET versao = versao + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS tarefas_versao_alterar AFTER UPDATE ON tarefas BEGIN
+    INSERT INTO versoes (tabela, versao) VALUES ('tarefas', 1)
+    ON CONFLICT (tabela) DO UPDATE SET versao = versao + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS tarefas_versao_remover AFTER DELETE ON tarefas BEGIN
+    INSERT INTO versoes (tabela, versao) VALUES ('tarefas', 1)
+    ON CONFLICT (tabela) DO UPDATE SET versao = versao + 1;
+END;
+
+-- Época do banco (ver etiqueta_dados()): sorteada uma única vez, na
+-- criação, para que um banco recriado não repita etiquetas antigas
+INSERT OR IGNORE INTO versoes (tabela, versao) VALUES ('_epoca', abs(random() % 1000000000000));
+
+-- Versão das tarefas de cada responsável (ver etiqueta_dados()): uma
+-- tarefa que muda de responsável avança a versão dos dois
+CREATE TABLE IF NOT EXISTS versoes_grupos (
+    tabela TEXT NOT NULL,
+    grupo INTEGER NOT NULL,
+    versao INTEGER NOT NULL,
+    PRIMARY KEY (tabela, grupo)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS tarefas_versao_grupo_inserir AFTER INSERT ON tarefas BEGIN
+    INSERT INTO versoes_grupos (tabela, grupo, versao)
+    SELECT 'tarefas', new.responsavel_id, 1 WHERE new.responsavel_id IS NOT NULL
+    ON CONFLICT (tabela, grupo) DO UPDATE SET versao = versao + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS tarefas_versao_grupo_alterar AFTER UPDATE ON tarefas BEGIN
+    INSERT INTO versoes_grupos (tabela, grupo, versao)
+    SELECT 'tarefas', new.responsavel_id, 1 WHERE new.responsavel_id IS NOT NULL
+    ON CONFLICT (tabela, grupo) DO UPDATE SET versao = versao + 1;
+    INSERT INTO versoes_grupos (tabela, grupo, versao)
+    SELECT 'tarefas', old.responsavel_id, 1
+    WHERE old.responsavel_id IS NOT NULL AND old.responsavel_id IS NOT new.responsavel_id
+    ON CONFLICT (tabela, grupo) DO UPDATE SET versao = versao + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS tarefas_versao_grupo_remover AFTER DELETE ON tarefas BEGIN
+    INSERT INTO versoes_grupos (tabela, grupo, versao)
+    SELECT 'tarefas', old.responsavel_id, 1 WHERE old.responsavel_id IS NOT NULL
+    ON CONFLICT (tabela, grupo) DO UPDATE SET versao = versao + 1;
+END;
+
+-- Totais por responsável e dia (ver agregar_registros()), atualizados
+-- junto com cada tarefa, na mesma transação
+CREATE TABLE IF NOT EXISTS tarefas_agregados (
+    grupo INTEGER NOT NULL,
+    dia INTEGER NOT NULL,
+    criadas INTEGER NOT NULL,
+    concluidas INTEGER NOT NULL,
+    atrasadas INTEGER NOT NULL,
+    soma_tempo INTEGER NOT NULL,
+    quantidade_tempo INTEGER NOT NULL,
+    PRIMARY KEY (grupo, dia)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INTEGER PRIMARY KEY,
+    login TEXT,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_usuarios_login ON usuarios (login);
+CREATE TRIGGER IF NOT EXISTS usuarios_versao_inserir AFTER INSERT ON usuarios BEGIN
+    INSERT INTO versoes (tabela, versao) VALUES ('usuarios', 1)
+    ON CONFLICT (tabela) DO UPDATE SET versao = versao + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS usuarios_versao_alterar AFTER UPDATE ON usuarios BEGIN
+    INSERT INTO versoes (tabela, versao) VALUES ('usuarios', 1)
+    ON CONFLICT (tabela) DO UPDATE SET versao = versao + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS usuarios_versao_remover AFTER DELETE ON usuarios BEGIN
+    INSERT INTO versoes (tabela, versao) VALUES ('usuarios', 1)
+    ON CONFLICT (tabela) DO UPDATE SET versao = versao + 1;
+END;
+
+CREATE TABLE IF NOT EXISTS sequencias (
+    tabela TEXT PRIMARY KEY,
+    ultimo INTEGER NOT NULL
+);
+"""
+
+
+def _casefold(valor):
+    """
+    Função SQL casefold(): chave de ordenação de textos, IGUAL à dos modos
+    JSON (Registro.chave_ordenacao()). COLLATE NOCASE só ignora maiúsculas
+    em ASCII ('É' e 'é' ficariam em posições diferentes), o que faria a
+    mesma consulta vir em outra ordem e os cursores de paginação não
+    valerem de um modo para o outro.
+    """
+    return valor.casefold() if isinstance(valor, str) else ''
+
+
+def _comandos(script):
+    """
+    Divide um script SQL em comandos, para executá-los um a um dentro de
+    uma transação (executescript() faria COMMIT antes de começar).
+    """
+    comandos, atual = [], ''
+    for linha in script.splitlines(keepends=True):
+        atual += linha
+        # Gatilhos têm ';' dentro do BEGIN ... END: só completa no END;
+        if sqlite3.complete_statement(atual):
+            comandos.append(atual.strip())
+            atual = ''
+    return comandos
+
+
+_COMANDOS_ESQUEMA = _comandos(_ESQUEMA)
+
+# Uma conexão por thread (conexões sqlite3 não podem ser compartilhadas)
+_local = threading.local()
+
+
+def _conexao():
+    """
+    Retorna a conexão da thread atual, criando banco e tabelas se preciso.
+    """
+    conexao = getattr(_local, 'conexao', None)
+    if conexao is None:
+        arquivos.garantir_diretorio(ARQUIVO_BANCO)
+        conexao = sqlite3.connect(ARQUIVO_BANCO, timeout=30)
+        # deterministic: pode ser usada no índice de títulos do esquema
+        conexao.create_function('casefold', 1, _casefold, deterministic=True)
+        # WAL permite leituras simultâneas a uma escrita (vários processos)
+        conexao.execute('PRAGMA journal_mode=WAL')
+        # Verificação, esquema e preenchimento na MESMA transação: BEGIN
+        # IMMEDIATE trava o banco para escrita, então, com vários processos
+        # abrindo o banco ao mesmo tempo, só o primeiro cria a busca textual
+        # e os agregados e os preenche; os demais já os encontram prontos
+        with conexao:
+            conexao.execute('BEGIN IMMEDIATE')
+            busca_existia = conexao.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'tarefas_busca'").fetchone()
+            agregados_existiam = conexao.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'tarefas_agregados'").fetchone()
+            for comando in _COMANDOS_ESQUEMA:
+                conexao.execute(comando)
+            if not busca_existia:
+                # Banco criado antes da busca textual: indexa as tarefas existentes
+                conexao.execute("""
+                    INSERT INTO tarefas_busca (rowid, titulo, descricao)
+                    SELECT id, json_extract(dados, '$.titulo'),
+                           json_extract(dados, '$."descrição"')
+                    FROM tarefas""")
+            if not agregados_existiam:
+                # Banco criado antes dos agregados: calcula a partir das tarefas
+                _reconstruir_agregados(conexao, ARQUIVO_TAREFAS)
+        _local.conexao = conexao
+    return conexao
+
+
+def _agregar(conexao, caminho_arquivo, registro, sinal):
+    """
+    Soma (sinal=1) ou subtrai (sinal=-1) os eventos de um registro na
+    tabela de agregados (mesmas regras de arquivos.eventos_agregados()).
+    """
+    tabela = TABELAS_AGREGADOS.get(caminho_arquivo)
+    configuracao = arquivos.AGREGADOS.get(caminho_arquivo)
+    if tabela is None or configuracao is None or registro is None:
+        return
+    grupo = registro.get(configuracao[0])
+    if grupo is None:
+        return
+    registro = arquivos.converter_registro(caminho_arquivo, registro)
+    atribuicoes = ', '.join(f'{c} = {c} + excluded.{c}' for c in _COLUNAS_AGREGADOS)
+    for dia, vetor in arquivos.eventos_agregados(configuracao, registro).items():
+        conexao.execute(
+            f"INSERT INTO {tabela} (grupo, dia, {', '.join(_COLUNAS_AGREGADOS)}) "
+            f"VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (grupo, dia) DO UPDATE SET {atribuicoes}",
+            (grupo, dia, *(sinal * valor for valor in vetor)))
+        conexao.execute(
+            f"DELETE FROM {tabela} WHERE grupo = ? AND dia = ? AND "
+            + ' AND '.join(f'{c} = 0' for c in _COLUNAS_AGREGADOS), (grupo, dia))
+
+
+def _reconstruir_agregados(conexao, caminho_arquivo):
+    """Recalcula toda a tabela de agregados a partir dos registros."""
+    tabela_agregados = TABELAS_AGREGADOS.get(caminho_arquivo)
+    configuracao = arquivos.AGREGADOS.get(caminho_arquivo)
+    if tabela_agregados is None or configuracao is None:
+        return
+    tabela, _ = TABELAS[caminho_arquivo]
+    totais = {}
+    for (dados,) in conexao.execute(f'SELECT dados FROM {tabela}'):
+        registro = arquivos.converter_registro(caminho_arquivo, json.loads(dados))
+        grupo = registro.get(configuracao[0])
+        if grupo is None:
+            continue
+        for dia, vetor in arquivos.eventos_agregados(configuracao, registro).items():
+            atual = totais.setdefault((grupo, dia), [0, 0, 0, 0, 0])
+            for i, valor in enumerate(vetor):
+                atual[i] += valor
+    conexao.execute(f'DELETE FROM {tabela_agregados}')
+    conexao.executemany(
+        f"INSERT INTO {tabela_agregados} (grupo, dia, {', '.join(_COLUNAS_AGREGADOS)}) "
+        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+        ((grupo, dia, *vetor) for (grupo, dia), vetor in totais.items()))
+
+
+def _valor_coluna(coluna, registro):
+    """Extrai do registro o valor da coluna indexada (prazo vira ordinal)."""
+    if coluna == 'prazo':
+        return data_para_ordinal(registro.get('prazo'))
+    return registro.get(coluna)
+
+
+def _linha(caminho_arquivo, registro):
+    """Monta os valores (id, colunas indexadas..., dados) de um registro."""
+    _, colunas = TABELAS[caminho_arquivo]
+    valores = [registro.get('id')]
+    valores += [_valor_coluna(c, registro) for c in colunas]
+    valores.append(json.dumps(registro, ensure_ascii=False, separators=(',', ':'),
+                              default=para_json))
+    return valores
+
+
+def _sql_inserir(caminho_arquivo):
+    """Comando INSERT OR REPLACE para a tabela do arquivo."""
+    tabela, colunas = TABELAS[caminho_arquivo]
+    nomes = ('id',) + colunas + ('dados',)
+    marcadores = ', '.join('?' * len(nomes))
+    return f"INSERT OR REPLACE INTO {tabela} ({', '.join(nomes)}) VALUES ({marcadores})"
+
+
+def ler_dados(caminho_arquivo):
+    """
+    Lê todos os registros da tabela correspondente ao arquivo.
+
+    RETORNO:
+        list: Lista de dicionários, em ordem de ID
+    """
+    return list(iterar_dados(caminho_arquivo))
+
+
+def iterar_dados(caminho_arquivo):
+    """
+    Gera os registros da tabela um de cada vez, direto do cursor.
+    
+    RETORNO:
+        generator: Registros em ordem de ID
+    """
+    tabela, _ = TABELAS[caminho_arquivo]
+    cursor = _conexao().execute(f'SELECT dados FROM {tabela} ORDER BY id')
+    for (dados,) in cursor:
+        yield arquivos.converter_registro(caminho_arquivo, json.loads(dados))
+
+
+def salvar_dados(caminho_arquivo, dados):
+    """
+    Substitui todo o conteúdo da tabela pela lista informada.
+
+    RETORNO:
+        bool: True se salvou com sucesso, False se houve erro
+    """
+    tabela, _ = TABELAS[caminho_arquivo]
+    try:
+        with _conexao() as conexao:
+            conexao.execute(f'DELETE FROM {tabela}')
+            conexao.executemany(_sql_inserir(caminho_arquivo),
+                                (_linha(caminho_arquivo, r) for r in dados))
+            _reconstruir_agregados(conexao, caminho_arquivo)
+        return True
+    except sqlite3.Error as e:
+        print(f"Erro ao salvar dados em {ARQUIVO_BANCO} ({tabela}): {e}")
+        return False
+
+
+def _proximo_id(conexao, tabela):
+    """
+    Avança e retorna a sequência de IDs da tabela.
+
+    Na primeira vez, a sequência parte do maior ID já existente (útil
+    depois de importar os arquivos JSON).
+    """
+    conexao.execute(
+        'INSERT OR IGNORE INTO sequencias (tabela, ultimo) '
+        f'SELECT ?, COALESCE(MAX(id), 0) FROM {tabela}', (tabela,))
+    conexao.execute('UPDATE sequencias SET ultimo = ultimo + 1 WHERE tabela = ?', (tabela,))
+    (ultimo,) = conexao.execute('SELECT ultimo FROM sequencias WHERE tabela = ?',
+                                (tabela,)).fetchone()
+    return ultimo
+
+
+def inserir_registro(caminho_arquivo, registro):
+    """
+    Insere um registro (uma única linha, sem reescrever a tabela).
+
+    RETORNO:
+        dict: O registro salvo (com o 'id' gerado, se não havia)
+        None: Se houve erro ao salvar
+
+    ID AUTOMÁTICO:
+        Sem 'id', o próximo ID vem da tabela 'sequencias' (IDs nunca são
+        reaproveitados). Tudo acontece em uma transação BEGIN IMMEDIATE,
+        que bloqueia outros escritores até o commit.
+    """
+    tabela, _ = TABELAS[caminho_arquivo]
+    try:
+        conexao = _conexao()
+        with conexao:
+            conexao.execute('BEGIN IMMEDIATE')
+            if registro.get('id') is None:
+                registro = {**registro, 'id': _proximo_id(conexao, tabela)}
+            else:
+                # ID informado: o INSERT OR REPLACE pode substituir um registro
+                _agregar(conexao, caminho_arquivo, _ler_linha(conexao, tabela, registro['id']), -1)
+            conexao.execute(_sql_inserir(caminho_arquivo),
+                            _linha(caminho_arquivo, registro))
+            _agregar(conexao, caminho_arquivo, registro, 1)
+        return registro
+    except sqlite3.Error as e:
+        print(f"Erro ao inserir registro em {ARQUIVO_BANCO}: {e}")
+        return None
+
+
+def atualizar_registro(caminho_arquivo, registro_id, campos):
+    """
+    Altera campos de um registro, mantendo as colunas indexadas em dia.
+
+    RETORNO:
+        bool: True se salvou com sucesso, False se houve erro
+    """
+    tabela, _ = TABELAS[caminho_arquivo]
+    try:
+        conexao = _conexao()
+        with conexao:
+            conexao.execute('BEGIN IMMEDIATE')
+            linha = conexao.execute(f'SELECT dados FROM {tabela} WHERE id = ?',
+                                    (registro_id,)).fetchone()
+            if linha is None:
+                return True
+            antigo = json.loads(linha[0])
+            registro = {**antigo, **campos}
+            conexao.execute(_sql_inserir(caminho_arquivo),
+                            _linha(caminho_arquivo, registro))
+            _agregar(conexao, caminho_arquivo, antigo, -1)
+            _agregar(conexao, caminho_arquivo, registro, 1)
+        return True
+    except sqlite3.Error as e:
+        print(f"Erro ao atualizar registro em {ARQUIVO_BANCO}: {e}")
+        return False
+
+
+def remover_registro(caminho_arquivo, registro_id):
+    """
+    Remove um registro pelo ID.
+
+    RETORNO:
+        bool: True se removeu com sucesso, False se houve erro
+    """
+    tabela, _ = TABELAS[caminho_arquivo]
+    try:
+        conexao = _conexao()
+        with conexao:
+            conexao.execute('BEGIN IMMEDIATE')
+            _agregar(conexao, caminho_arquivo, _ler_linha(conexao, tabela, registro_id), -1)
+            conexao.execute(f'DELETE FROM {tabela} WHERE id = ?', (registro_id,))
+        return True
+    except sqlite3.Error as e:
+        print(f"Erro ao remover registro em {ARQUIVO_BANCO}: {e}")
+        return False
+
+
+def _ler_linha(conexao, tabela, registro_id):
+    """Registro gravado com o ID (dicionário), ou None."""
+    linha = conexao.execute(f'SELECT dados FROM {tabela} WHERE id = ?',
+                            (registro_id,)).fetchone()
+    return json.loads(linha[0]) if linha else None
+
+
+def obter_registro(caminho_arquivo, registro_id):
+    """
+    Busca um registro pelo ID (chave primária).
+
+    RETORNO:
+        dict: O registro, ou None se não existir
+    """
+    tabela, _ = TABELAS[caminho_arquivo]
+    linha = _conexao().execute(f'SELECT dados FROM {tabela} WHERE id = ?',
+                               (registro_id,)).fetchone()
+    return arquivos.converter_registro(caminho_arquivo, json.loads(linha[0])) if linha else None
+
+
+def consultar_registros(caminho_arquivo, prazo_antes=None, prazo_desde=None, **iguais):
+    """
+    Busca registros usando as colunas indexadas sempre que possível.
+
+    PARÂMETROS:
+        caminho_arquivo (str): Arquivo lógico (define a tabela)
+        prazo_antes (int, opcional): Apenas registros com prazo (ordinal)
+                                     menor que este valor
+        prazo_desde (int, opcional): Apenas registros com prazo maior ou
+                                     igual a este valor
+        **iguais: Campos que devem ser iguais ao valor informado
+                  (ex: responsavel_id=1, status='Pendente', login='ana')
+
+    RETORNO:
+        list: Registros encontrados, em ordem de ID
+
+    OBSERVAÇÃO:
+        Campos sem coluna própria são filtrados em Python depois da
+        consulta (continua correto, apenas sem ajuda do índice).
+    """
+    return list(iterar_registros(caminho_arquivo, prazo_antes, prazo_desde, **iguais))
+
+
+def iterar_registros(caminho_arquivo, prazo_antes=None, prazo_desde=None, **iguais):
+    """
+    Versão em streaming de consultar_registros(): os registros são
+    decodificados um de cada vez, conforme o cursor avança.
+    """
+    tabela, condicoes, valores, restantes = _condicoes(caminho_arquivo, prazo_antes,
+                                                       prazo_desde, iguais)
+    sql = f'SELECT dados FROM {tabela}'
+    if condicoes:
+        sql += ' WHERE ' + ' AND '.join(condicoes)
+    cursor = _conexao().execute(sql + ' ORDER BY id', valores)
+    for (dados,) in cursor:
+        registro = json.loads(dados)
+        if all(registro.get(c) == v for c, v in restantes.items()):
+            yield arquivos.converter_registro(caminho_arquivo, registro)
+
+
+def paginar_registros(caminho_arquivo, apos=None, limite=50, decrescente=False,
+                      ordenar_por=None, prazo_antes=None, prazo_desde=None, **iguais):
+    """
+    Uma página da consulta (ver arquivos.paginar_registros()): a condição
+    '(chave, id) > (?, ?)' e o LIMIT vão para o SQL, que percorre os
+    índices (responsavel_id, chave, id) a partir da última posição vista.
+    
+    OBSERVAÇÃO:
+        A chave de cada ordenação é a expressão de ORDENACOES: na ordem de
+        criação é o próprio ID (gerado em ordem de criação) e os títulos
+        são comparados por casefold() (ver _casefold()).
+    """
+    tabela, condicoes, valores, restantes = _condicoes(caminho_arquivo, prazo_antes,
+                                                       prazo_desde, iguais)
+    chave = 'id' if ordenar_por is None else ORDENACOES[caminho_arquivo][ordenar_por]
+    comparacao = '<' if decrescente else '>'
+    if apos is not None:
+        if ordenar_por is None:
+            condicoes.append(f'id {comparacao} ?')
+            valores.append(apos)
+        else:
+            condicoes.append(f'({chave}, id) {comparacao} (?, ?)')
+            valores.extend(apos)
+    direcao = ' DESC' if decrescente else ''
+    sql = f'SELECT dados, {chave} FROM {tabela}'
+    if condicoes:
+        sql += ' WHERE ' + ' AND '.join(condicoes)
+    sql += f' ORDER BY {chave}{direcao}'
+    if ordenar_por is not None:
+        sql += f', id{direcao}'
+    if not restantes:
+        # Sem filtros em Python, o próprio banco corta a página
+        sql += ' LIMIT ?'
+        valores.append(limite + 1)
+
+    pagina, chaves = [], []
+    for dados, valor_chave in _conexao().execute(sql, valores):
+        registro = json.loads(dados)
+        if all(registro.get(c) == v for c, v in restantes.items()):
+            pagina.append(arquivos.converter_registro(caminho_arquivo, registro))
+            chaves.append(valor_chave)
+            if len(pagina) > limite:
+                break
+    if len(pagina) <= limite:
+        return pagina, None
+    ultimo = pagina[limite - 1]
+    if ordenar_por is None:
+        return pagina[:limite], ultimo['id']
+    return pagina[:limite], [chaves[limite - 1], ultimo['id']]
+
+
+def buscar_registros(caminho_arquivo, consulta, apos=None, limite=50, **iguais):
+    """
+    Busca textual (ver arquivos.buscar_registros()) pela tabela FTS5.
+    
+    Cada termo vira uma consulta de prefixo ("termo"*) e a relevância é a
+    função bm25() do SQLite, com o título valendo 3x a descrição (quanto
+    MENOR o valor, mais relevante). A posição é [bm25, ID].
+    """
+    termos_busca = termos_da_consulta(consulta)
+    if not termos_busca:
+        return [], None
+    tabela, condicoes, valores, restantes = _condicoes(caminho_arquivo, None, None, iguais)
+    # Os termos só têm letras e dígitos (utils/busca.py): seguros entre aspas
+    valores.insert(0, ' '.join(f'"{termo}"*' for termo in termos_busca))
+    condicoes.insert(0, 'tarefas_busca MATCH ?')
+    sql = (f'SELECT id, dados, relevancia FROM ('
+           f'SELECT {tabela}.id AS id, {tabela}.dados AS dados, '
+           f'bm25(tarefas_busca, 3.0, 1.0) AS relevancia '
+           f'FROM tarefas_busca JOIN {tabela} ON {tabela}.id = tarefas_busca.rowid '
+           f'WHERE ' + ' AND '.join(condicoes) + ')')
+    if apos is not None:
+        sql += ' WHERE (relevancia, id) > (?, ?)'
+        valores.extend(apos)
+    sql += ' ORDER BY relevancia, id'
+    if not restantes:
+        sql += ' LIMIT ?'
+        valores.append(limite + 1)
+
+    pagina = []
+    for registro_id, dados, relevancia in _conexao().execute(sql, valores):
+        registro = json.loads(dados)
+        if all(registro.get(c) == v for c, v in restantes.items()):
+            pagina.append((relevancia, arquivos.converter_registro(caminho_arquivo, registro)))
+            if len(pagina) > limite:
+                break
+    registros = [registro for _, registro in pagina[:limite]]
+    if len(pagina) <= limite:
+        return registros, None
+    relevancia, ultimo = pagina[limite - 1]
+    return registros, [relevancia, ultimo['id']]
+
+
+def agregar_registros(caminho_arquivo, grupo, desde=None, ate=None):
+    """
+    Totais por dia de um grupo (ver arquivos.agregar_registros()), lidos
+    da tabela de agregados pela chave primária (grupo, dia).
+    """
+    tabela = TABELAS_AGREGADOS[caminho_arquivo]
+    condicoes, valores = ['grupo = ?'], [grupo]
+    if desde is not None:
+        condicoes.append('dia >= ?')
+        valores.append(desde)
+    if ate is not None:
+        condicoes.append('dia <= ?')
+        valores.append(ate)
+    cursor = _conexao().execute(
+        f"SELECT dia, {', '.join(_COLUNAS_AGREGADOS)} FROM {tabela} "
+        f"WHERE {' AND '.join(condicoes)} ORDER BY dia", valores)
+    return [(dia, list(vetor)) for dia, *vetor in cursor]
+
+
+def versao_dados(caminho_arquivo, grupo=None):
+    """
+    Versão dos dados da tabela (contador da tabela 'versoes').
+
+    OBSERVAÇÃO:
+        O contador é avançado por triggers a cada INSERT/UPDATE/DELETE,
+        então vale entre processos. É um por tabela: 'grupo' é aceito
+        pela interface comum, mas não separa responsáveis.
+    """
+    tabela, _ = TABELAS[caminho_arquivo]
+    linha = _conexao().execute('SELECT versao FROM versoes WHERE tabela = ?',
+                               (tabela,)).fetchone()
+    return linha[0] if linha else 0
+
+
+def etiqueta_dados(caminho_arquivo, grupo=None):
+    """
+    Etiqueta dos dados (ver arquivos.etiqueta_dados()): época do banco +
+    versão do grupo (tabela 'versoes_grupos') ou, sem grupo, da tabela.
+
+    OBSERVAÇÃO:
+        As versões são avançadas por triggers, então valem entre
+        processos. A época evita que um banco apagado e recriado, com os
+        contadores de volta ao início, repita etiquetas já entregues.
+    """
+    tabela, _ = TABELAS[caminho_arquivo]
+    conexao = _conexao()
+    epoca = conexao.execute("SELECT versao FROM versoes WHERE tabela = '_epoca'").fetchone()
+    if grupo is None or caminho_arquivo not in arquivos.ETIQUETAS:
+        versao = versao_dados(caminho_arquivo)
+    else:
+        linha = conexao.execute('SELECT versao FROM versoes_grupos WHERE tabela = ? AND grupo = ?',
+                                (tabela, grupo)).fetchone()
+        versao = linha[0] if linha else 0
+    return f'{epoca[0] if epoca else 0}-{versao}'
+
+
+def modificacao_dados(caminho_arquivo, grupo=None):
+    """
+    Última gravação no banco (o arquivo ou o seu WAL, onde as alterações
+    ficam até o checkpoint). Vale o banco inteiro: 'grupo' é aceito pela
+    interface comum.
+    """
+    modificacao = 0.0
+    for caminho in (ARQUIVO_BANCO, ARQUIVO_BANCO + '-wal'):
+        try:
+            modificacao = max(modificacao, os.path.getmtime(caminho))
+        except OSError:
+            pass
+    return modificacao
+
+
+def _condicoes(caminho_arquivo, prazo_antes, prazo_desde, iguais):
+    """
+    Monta o WHERE de uma consulta.
+    
+    RETORNO:
+        tuple: (tabela, condições SQL, valores dos '?', campos sem coluna
+               própria, que são conferidos em Python)
+    """
+    tabela, colunas = TABELAS[caminho_arquivo]
+    condicoes, valores, restantes = [], [], {}
+    for campo, valor in iguais.items():
+        if campo == 'id' or (campo in colunas and campo != 'prazo'):
+            condicoes.append(f'{campo} = ?')
+            valores.append(valor)
+        else:
+            restantes[campo] = valor
+    if prazo_antes is not None:
+        condicoes.append('prazo < ?')
+        valores.append(prazo_antes)
+    if prazo_desde is not None:
+        condicoes.append('prazo >= ?')
+        valores.append(prazo_desde)
+    return tabela, condicoes, valores, restantes
+
+
+def contar_registros(caminho_arquivo, grupo):
+    """
+    Contadores de um grupo (ver arquivos.contar_registros()) por consultas
+    COUNT nas colunas indexadas.
+    """
+    tabela, _ = TABELAS[caminho_arquivo]
+    campo_grupo, campo_contado = arquivos.CONTADORES[caminho_arquivo]
+    conexao = _conexao()
+    valores = dict(conexao.execute(
+        f'SELECT {campo_contado}, COUNT(*) FROM {tabela} WHERE {campo_grupo} = ? '
+        f'GROUP BY {campo_contado}', (grupo,)))
+    atrasados = 0
+    filtro = arquivos.INDICES_PRAZO.get(caminho_arquivo)
+    if filtro is not None:
+        campo, valor = filtro
+        (atrasados,) = conexao.execute(
+            f'SELECT COUNT(*) FROM {tabela} WHERE {campo_grupo} = ? AND {campo} = ? '
+            'AND prazo < ?', (grupo, valor, ordinal_hoje())).fetchone()
+    return {'total': sum(valores.values()), 'valores': valores, 'atrasados': atrasados}
+
+
+def importar_json():
+    """
+    Importa os arquivos JSON atuais (data/*.json) para o banco SQLite.
+
+    RETORNO:
+        dict: Quantidade de registros importados por tabela
+
+    OBSERVAÇÃO:
+        O conteúdo atual das tabelas é substituído pelo dos arquivos.
+        Os arquivos JSON não são alterados (servem de backup).
+    """
+    resultado = {}
+    for caminho_arquivo, (tabela, _) in TABELAS.items():
+        dados = arquivos.ler_arquivo_json(caminho_arquivo)
+        if salvar_dados(caminho_arquivo, dados):
+            resultado[tabela] = len(dados)
+    return resultado
+
+
+if __name__ == '__main__':
+    for tabela, quantidade in importar_json().items():
+        print(f"✓ {quantidade} registro(s) importado(s) para '{tabela}' em {ARQUIVO_BANCO}")
@@ -0,0 +1,389 @@
+"""
+================================================================================
+MÓDULO: utils/binario.py
+================================================================================
+DESCRIÇÃO:
+    Formato BINÁRIO COMPACTO para snapshots de dados (extensão .tfb),
+    alternativo ao JSON. Permite abrir um arquivo com milhões de tarefas
+    quase instantaneamente e decodificar apenas o registro (ou até apenas
+    o campo) que for necessário, sem carregar tudo na memória.
+
+ESTRUTURA DO ARQUIVO:
+    [cabeçalho fixo - 40 bytes]
+        'TFB1' | versão (u16) | flags (u16) | nº de registros (u64)
+        posição da tabela de campos (u64) | posição da tabela de
+        deslocamentos (u64) | posição da tabela de IDs (u64)
+    [registros]
+        Cada registro: nº de campos (u16), pares (campo u16, deslocamento
+        u32) e em seguida os valores codificados
+    [tabela de campos]      nomes dos campos ('id', 'titulo', ...) uma vez só
+    [tabela de deslocamentos] posição (u64) de cada registro no arquivo
+    [tabela de IDs]         ID (i64) de cada registro, na mesma ordem
+
+    Os nomes dos campos não se repetem em cada registro (como no JSON) e
+    números são gravados em 8 bytes, o que deixa o arquivo bem menor que
+    o JSON com indentação.
+
+USO PELO SISTEMA:
+    Com TASKFLOW_SNAPSHOT=binario, utils/arquivos.py grava os snapshots
+    (data/tarefas.json, data/usuarios.json, os shards) neste formato, no
+    mesmo caminho; a leitura reconhece o formato pelo cabeçalho, então
+    arquivos JSON e .tfb convivem. Ver FORMATO DO SNAPSHOT em arquivos.py.
+
+LEITURA SOB DEMANDA:
+    O arquivo é mapeado na memória (mmap); só as páginas realmente lidas
+    são carregadas pelo sistema operacional.
+
+        with SnapshotBinario('data/tarefas.tfb') as snap:
+            len(snap)                      # nº de registros, sem decodificar
+            snap.campo(10, 'status')       # decodifica UM campo
+            snap.registro(10)              # decodifica UM registro
+            snap.por_id(42)                # busca pelo ID (busca binária)
+
+CONVERSÃO:
+    python -m utils.binario para-binario data/tarefas.json data/tarefas.tfb
+    python -m utils.binario para-json    data/tarefas.tfb data/tarefas.json
+================================================================================
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+
+MAGICO = b'TFB1'
+VERSAO_FORMATO = 1
+
+# Cabeçalho: mágico, versão, flags, registros, pos. campos, deslocamentos, IDs
+_CABECALHO = struct.Struct('<4sHHQQQQ')
+
+# Flag: IDs gravados em ordem crescente (permite busca binária)
+_FLAG_IDS_ORDENADOS = 1
+
+# ID gravado para registros sem 'id' inteiro
+_SEM_ID = -(2 ** 63)
+
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+_PAR = struct.Struct('<HI')
+
+
+def _codificar_valor(valor):
+    """
+    Codifica um valor como: marcador (1 byte) + conteúdo.
+
+    MARCADORES:
+        N = None, T/F = booleano, i = inteiro (8 bytes), f = real,
+        s = texto UTF-8, j = qualquer outro valor em JSON (listas, etc.)
+    """
+    if valor is None:
+        return b'N'
+    if valor is True:
+        return b'T'
+    if valor is False:
+        return b'F'
+    if isinstance(valor, int) and -(2 ** 63) <= valor < 2 ** 63:
+        return b'i' + _I64.pack(valor)
+    if isinstance(valor, float):
+        return b'f' + _F64.pack(valor)
+    if isinstance(valor, str):
+        texto = valor.encode('utf-8')
+        return b's' + _U32.pack(len(texto)) + texto
+    texto = json.dumps(valor, ensure_ascii=False).encode('utf-8')
+    return b'j' + _U32.pack(len(texto)) + texto
+
+
+def _decodificar_valor(buffer, posicao):
+    """Decodifica o valor gravado em 'posicao' (inverso de _codificar_valor)."""
+    marcador = buffer[posicao:posicao + 1]
+    posicao += 1
+    if marcador == b'N':
+        return None
+    if marcador == b'T':
+        return True
+    if marcador == b'F':
+        return False
+    if marcador == b'i':
+        return _I64.unpack_from(buffer, posicao)[0]
+    if marcador == b'f':
+        return _F64.unpack_from(buffer, posicao)[0]
+    (tamanho,) = _U32.unpack_from(buffer, posicao)
+    texto = bytes(buffer[posicao + 4:posicao + 4 + tamanho]).decode('utf-8')
+    return texto if marcador == b's' else json.loads(texto)
+
+
+def eh_binario(caminho_arquivo):
+    """
+    Verifica, pelos primeiros bytes, se o arquivo está no formato .tfb.
+
+    RETORNO:
+        bool: False também se o arquivo não existir
+    """
+    try:
+        with open(caminho_arquivo, 'rb') as f:
+            return f.read(len(MAGICO)) == MAGICO
+    except FileNotFoundError:
+        return False
+
+
+def gravar_binario(caminho_arquivo, registros):
+    """
+    Grava uma sequência de registros (dicionários) no formato .tfb.
+
+    PARÂMETROS:
+        caminho_arquivo (str): Arquivo de destino
+        registros (iterable): Registros a gravar (pode ser um gerador:
+                              cada registro é gravado e descartado)
+
+    RETORNO:
+        int: Quantidade de registros gravados
+
+    SEGURANÇA:
+        Grava em um arquivo temporário (nome único, na mesma pasta) e
+        renomeia no final (atômico); se algo falhar, o temporário é
+        apagado e o arquivo original fica intacto.
+    """
+    diretorio = os.path.dirname(caminho_arquivo) or '.'
+    descritor, temporario = tempfile.mkstemp(dir=diretorio, suffix='.tmp')
+    try:
+        with os.fdopen(descritor, 'wb') as f:
+            quantidade = _gravar_registros(f, registros)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, caminho_arquivo)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return quantidade
+
+
+def _gravar_registros(f, registros):
+    """Escreve cabeçalho, registros e tabelas em 'f' (ver gravar_binario())."""
+    campos = {}
+    deslocamentos = array('Q')
+    ids = array('q')
+    ordenados = True
+
+    f.write(b'\0' * _CABECALHO.size)
+    posicao = _CABECALHO.size
+    for registro in registros:
+        pares, valores, tamanho = [], [], 0
+        for nome, valor in registro.items():
+            indice = campos.setdefault(nome, len(campos))
+            codificado = _codificar_valor(valor)
+            pares.append(_PAR.pack(indice, tamanho))
+            valores.append(codificado)
+            tamanho += len(codificado)
+        bloco = _U16.pack(len(pares)) + b''.join(pares) + b''.join(valores)
+        f.write(bloco)
+
+        registro_id = registro.get('id')
+        if not isinstance(registro_id, int) or isinstance(registro_id, bool):
+            registro_id = _SEM_ID
+        if ids and registro_id <= ids[-1]:
+            ordenados = False
+        deslocamentos.append(posicao)
+        ids.append(registro_id)
+        posicao += len(bloco)
+
+    pos_campos = posicao
+    for nome in campos:
+        texto = nome.encode('utf-8')
+        f.write(_U16.pack(len(texto)) + texto)
+        posicao += 2 + len(texto)
+    pos_deslocamentos = posicao
+    f.write(deslocamentos.tobytes())
+    pos_ids = pos_deslocamentos + len(deslocamentos) * 8
+    f.write(ids.tobytes())
+
+    flags = _FLAG_IDS_ORDENADOS if ordenados else 0
+    f.seek(0)
+    f.write(_CABECALHO.pack(MAGICO, VERSAO_FORMATO, flags, len(deslocamentos),
+                            pos_campos, pos_deslocamentos, pos_ids))
+    return len(deslocamentos)
+
+
+class SnapshotBinario:
+    """
+    Leitor de um arquivo .tfb com decodificação sob demanda.
+
+    Abrir o arquivo lê apenas o cabeçalho e a tabela de campos; nenhum
+    registro é decodificado até ser pedido. Deve ser fechado depois do uso
+    (ou usado com 'with').
+    """
+
+    __slots__ = ('_arquivo', '_mapa', '_visao', '_deslocamentos', '_ids',
+                 '_ids_ordenados', '_posicoes_id', '_nomes', '_indice_nomes')
+
+    def __init__(self, caminho_arquivo):
+        self._arquivo = open(caminho_arquivo, 'rb')
+        self._mapa = None
+        self._visao = None
+        try:
+            self._mapa = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+            (magico, versao, flags, total, pos_campos,
+             pos_deslocamentos, pos_ids) = _CABECALHO.unpack_from(self._mapa, 0)
+            if magico != MAGICO or versao != VERSAO_FORMATO:
+                raise ValueError(f"{caminho_arquivo} não é um snapshot .tfb válido")
+        except BaseException:
+            self.fechar()
+            raise
+
+        self._nomes = []
+        posicao = pos_campos
+        while posicao < pos_deslocamentos:
+            (tamanho,) = _U16.unpack_from(self._mapa, posicao)
+            self._nomes.append(self._mapa[posicao + 2:posicao + 2 + tamanho].decode('utf-8'))
+            posicao += 2 + tamanho
+        self._indice_nomes = {nome: i for i, nome in enumerate(self._nomes)}
+
+        # Tabelas de deslocamentos e IDs lidas direto do mmap, sem cópia
+        self._visao = memoryview(self._mapa)
+        self._deslocamentos = self._visao[pos_deslocamentos:pos_deslocamentos + 8 * total].cast('Q')
+        self._ids = self._visao[pos_ids:pos_ids + 8 * total].cast('q')
+        self._ids_ordenados = bool(flags & _FLAG_IDS_ORDENADOS)
+        self._posicoes_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+    def __len__(self):
+        return len(self._deslocamentos)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.registro(i)
+
+    def fechar(self):
+        """Libera o mapeamento em memória e fecha o arquivo."""
+        if self._visao is not None:
+            self._deslocamentos.release()
+            self._ids.release()
+            self._visao.release()
+            self._visao = None
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
+        self._arquivo.close()
+
+    def _pares(self, i):
+        """Retorna (início dos valores, [(campo, deslocamento), ...]) do registro i."""
+        inicio = self._deslocamentos[i]
+        (quantidade,) = _U16.unpack_from(self._mapa, inicio)
+        pares = [_PAR.unpack_from(self._mapa, inicio + 2 + 6 * k) for k in range(quantidade)]
+        return inicio + 2 + 6 * quantidade, pares
+
+    def registro(self, i):
+        """
+        Decodifica o registro na posição i.
+
+        RETORNO:
+            dict: O registro completo, com os campos na ordem original
+        """
+        base, pares = self._pares(i)
+        return {self._nomes[campo]: _decodificar_valor(self._mapa, base + deslocamento)
+                for campo, deslocamento in pares}
+
+    def campo(self, i, nome, padrao=None):
+        """
+        Decodifica apenas UM campo do registro na posição i.
+
+        RETORNO:
+            O valor do campo, ou 'padrao' se o registro não tiver o campo
+        """
+        indice = self._indice_nomes.get(nome)
+        if indice is None:
+            return padrao
+        base, pares = self._pares(i)
+        for campo, deslocamento in pares:
+            if campo == indice:
+                return _decodificar_valor(self._mapa, base + deslocamento)
+        return padrao
+
+    def posicao_do_id(self, registro_id):
+        """
+        Encontra a posição do registro com o ID informado.
+
+        DESEMPENHO:
+            Busca binária na tabela de IDs (O(log n)) quando os IDs foram
+            gravados em ordem; senão um dicionário é montado na 1ª busca.
+
+        RETORNO:
+            int: Posição do registro, ou None se não existir
+        """
+        if self._ids_ordenados:
+            i = bisect_left(self._ids, registro_id)
+            return i if i < len(self._ids) and self._ids[i] == registro_id else None
+        if self._posicoes_id is None:
+            self._posicoes_id = {}
+            for i, valor in enumerate(self._ids):
+                self._posicoes_id.setdefault(valor, i)
+        return self._posicoes_id.get(registro_id)
+
+    def por_id(self, registro_id):
+        """
+        Decodifica o registro com o ID informado.
+
+        RETORNO:
+            dict: O registro, ou None se não existir
+        """
+        i = self.posicao_do_id(registro_id)
+        return self.registro(i) if i is not None else None
+
+
+def json_para_binario(caminho_json, caminho_binario):
+    """
+    Converte um arquivo de dados JSON (lista de registros) para .tfb.
+
+    RETORNO:
+        int: Quantidade de registros convertidos
+    """
+    # Importação tardia: utils.arquivos importa este módulo
+    from utils.arquivos import ler_arquivo_json
+    return gravar_binario(caminho_binario, ler_arquivo_json(caminho_json))
+
+
+def binario_para_json(caminho_binario, caminho_json):
+    """
+    Converte um arquivo .tfb de volta para o JSON usado pelo sistema.
+
+    DESTINO:
+        Sempre um arquivo JSON, qualquer que seja TASKFLOW_ARMAZENAMENTO
+        (não passa por salvar_dados(), que no modo 'sqlite' ou 'shards'
+        gravaria no banco ou nos shards) e mesmo com
+        TASKFLOW_SNAPSHOT=binario. Um journal ao lado do destino é
+        esvaziado: o arquivo convertido passa a ser o conteúdo completo.
+
+    RETORNO:
+        int: Quantidade de registros convertidos
+    """
+    from utils import arquivos
+    formato = 'compacto' if arquivos.FORMATO_SNAPSHOT == 'compacto' else 'legivel'
+    with SnapshotBinario(caminho_binario) as snapshot:
+        dados = list(snapshot)
+    arquivos.garantir_diretorio(caminho_json)
+    with arquivos.transacao(caminho_json):
+        arquivos._gravar_atomicamente(caminho_json, dados, formato)
+        if os.path.exists(caminho_json + arquivos.SUFIXO_JOURNAL):
+            open(caminho_json + arquivos.SUFIXO_JOURNAL, 'w').close()
+        arquivos.invalidar_cache(caminho_json)
+    return len(dados)
+
+
+if __name__ == '__main__':
+    comandos = {'para-binario': json_para_binario, 'para-json': binario_para_json}
+    if len(sys.argv) != 4 or sys.argv[1] not in comandos:
+        print("Uso: python -m utils.binario para-binario|para-json <origem> <destino>")
+        sys.exit(1)
+    quantidade = comandos[sys.argv[1]](sys.argv[2], sys.argv[3])
+    print(f"✓ {quantidade} registro(s) convertido(s) para {sys.argv[3]}")
@@ -0,0 +1,77 @@
+"""
+================================================================================
+MÓDULO: utils/busca.py
+================================================================================
+DESCRIÇÃO:
+    Preparação de textos para a BUSCA TEXTUAL das tarefas (título e
+    descrição). Transforma um texto em termos ("tokens") comparáveis:
+
+        'Revisão do Relatório FINAL'  ->  ['revisao', 'do', 'relatorio', 'final']
+
+REGRAS (português):
+    - Sem acentos nem cedilha: 'revisão' e 'revisao' são o mesmo termo
+    - Sem diferença entre maiúsculas e minúsculas (casefold)
+    - Termos são sequências de letras e dígitos; o resto separa termos
+    - Palavras muito comuns (PALAVRAS_VAZIAS: 'de', 'para', 'com'...) são
+      ignoradas na consulta, a menos que ela só tenha palavras assim
+
+    As mesmas regras valem para o índice em memória (utils/arquivos.py)
+    e para o índice FTS5 do modo SQLite (utils/banco.py, tokenizador
+    unicode61 com remove_diacritics).
+
+USO:
+    termos('Relatório final')          ->  ['relatorio', 'final']
+    termos_da_consulta('tarefas de rel')  ->  ['tarefas', 'rel']
+    Na busca, cada termo da consulta casa com qualquer termo do texto que
+    COMECE com ele ('rel' encontra 'relatorio').
+================================================================================
+"""
+
+import re
+import unicodedata
+
+# Termo: sequência de letras e dígitos (o '_' também separa, como no FTS5)
+_PADRAO_TERMO = re.compile(r'[^\W_]+')
+
+# Palavras comuns do português ignoradas nas consultas
+PALAVRAS_VAZIAS = frozenset((
+    'a', 'o', 'as', 'os', 'um', 'uma', 'de', 'da', 'do', 'das', 'dos',
+    'e', 'em', 'na', 'no', 'nas', 'nos', 'para', 'por', 'com', 'sem',
+    'ao', 'aos', 'que', 'se',
+))
+
+
+def normalizar(texto):
+    """
+    Remove acentos e diferenças de maiúsculas/minúsculas.
+
+    EXEMPLO:
+        normalizar('Ação URGENTE')  ->  'acao urgente'
+    """
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+def termos(texto):
+    """
+    Divide um texto em termos normalizados (na ordem em que aparecem).
+
+    RETORNO:
+        list: Termos do texto ([] se o texto for vazio ou não for str)
+    """
+    if not isinstance(texto, str) or not texto:
+        return []
+    return _PADRAO_TERMO.findall(normalizar(texto))
+
+
+def termos_da_consulta(consulta):
+    """
+    Termos de uma consulta de busca, sem repetições e sem palavras vazias.
+
+    RETORNO:
+        list: Termos na ordem digitada; se TODOS forem palavras vazias
+              (ex: 'de'), eles são mantidos para a busca não ficar vazia
+    """
+    unicos = list(dict.fromkeys(termos(consulta)))
+    relevantes = [t for t in unicos if t not in PALAVRAS_VAZIAS]
+    return relevantes or unicos
@@ -0,0 +1,134 @@
+"""
+================================================================================
+MÓDULO: utils/cache.py
+================================================================================
+DESCRIÇÃO:
+    Cache em memória de resultados já calculados, com tamanho limitado e
+    descarte do item usado há mais tempo (LRU: "least recently used").
+
+USO:
+    cache = CacheLRU(capacidade=1000)
+    resultado = cache.obter(chave, lambda: calcular())   # calcula 1 vez
+    resultado = cache.obter(chave, lambda: calcular())   # vem da memória
+
+    A CHAVE deve mudar sempre que o resultado puder mudar (ex: incluir a
+    versão dos dados e a data de hoje); chaves antigas deixam de ser
+    usadas e acabam descartadas pelo LRU.
+
+CAPACIDADE:
+    Medida em "peso" (por padrão, len() do resultado): um cache de
+    relatórios com capacidade 1000 guarda no máximo ~1000 tarefas, não
+    importa em quantos relatórios elas estejam. Resultados mais pesados
+    que a capacidade inteira não são guardados.
+
+THREADS:
+    Seguro para uso por várias threads (um Lock protege o dicionário). O
+    cálculo acontece FORA do Lock: duas threads com a mesma chave podem
+    calcular ao mesmo tempo, mas nenhuma espera pela outra.
+================================================================================
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """
+    Cache chave -> resultado com descarte LRU.
+
+    ATRIBUTOS:
+        capacidade (int): Peso máximo somado de todos os itens
+        acertos, falhas, descartes (int): Contadores (ver estatisticas())
+    """
+
+    def __init__(self, capacidade, peso=len):
+        self.capacidade = capacidade
+        self._peso = peso
+        self._itens = OrderedDict()      # chave -> (resultado, peso)
+        self._peso_total = 0
+        self._mutex = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+
+    def obter(self, chave, calcular):
+        """
+        Retorna o resultado guardado para a chave ou o calcula.
+
+        PARÂMETROS:
+            chave: Qualquer valor "hashable" (ex: tupla)
+            calcular (callable): Função sem parâmetros que gera o resultado
+
+        RETORNO:
+            O resultado (o mesmo objeto para chamadas com a mesma chave;
+            use valores imutáveis, como tuplas)
+
+        ERROS:
+            Exceções de calcular() são repassadas e nada é guardado
+        """
+        with self._mutex:
+            item = self._itens.get(chave)
+            if item is not None:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return item[0]
+            self.falhas += 1
+
+        resultado = calcular()
+        peso = max(self._peso(resultado), 1)
+        if peso > self.capacidade:
+            return resultado
+
+        with self._mutex:
+            anterior = self._itens.pop(chave, None)
+            if anterior is not None:
+                self._peso_total -= anterior[1]
+            self._itens[chave] = (resultado, peso)
+            self._peso_total += peso
+            while self._peso_total > self.capacidade:
+                _, (_, peso_descartado) = self._itens.popitem(last=False)
+                self._peso_total -= peso_descartado
+                self.descartes += 1
+        return resultado
+
+    def invalidar(self, condicao=None):
+        """
+        Remove itens do cache.
+
+        PARÂMETROS:
+            condicao (callable, opcional): Recebe a chave e retorna True
+                para remover o item; None remove todos
+
+        RETORNO:
+            int: Quantidade de itens removidos
+        """
+        with self._mutex:
+            if condicao is None:
+                removidos = len(self._itens)
+                self._itens.clear()
+                self._peso_total = 0
+                return removidos
+            chaves = [chave for chave in self._itens if condicao(chave)]
+            for chave in chaves:
+                self._peso_total -= self._itens.pop(chave)[1]
+            return len(chaves)
+
+    def estatisticas(self):
+        """
+        Contadores do cache.
+
+        RETORNO:
+            dict: {'itens', 'peso', 'capacidade', 'acertos', 'falhas',
+                   'descartes', 'taxa_acerto'} (taxa entre 0 e 1)
+        """
+        with self._mutex:
+            consultas = self.acertos + self.falhas
+            return {
+                'itens': len(self._itens),
+                'peso': self._peso_total,
+                'capacidade': self.capacidade,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'descartes': self.descartes,
+                'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+            }
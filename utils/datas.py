@@ -0,0 +1,126 @@
+"""
+================================================================================
+MÓDULO: utils/datas.py
+================================================================================
+DESCRIÇÃO:
+    Funções utilitárias para conversão das datas usadas pelo sistema.
+    As tarefas guardam datas como texto no formato brasileiro
+    ('DD/MM/AAAA'), que não pode ser ordenado nem comparado diretamente.
+    Aqui as datas são convertidas para um número inteiro (ordinal: dias
+    desde 01/01/0001), que pode ser comparado, ordenado e indexado.
+
+    A data/hora de criação ('DD/MM/AAAA HH:MM:SS') vira, do mesmo modo,
+    um número de segundos (ordinal * 86400 + segundos do dia).
+
+EXEMPLO:
+    data_para_ordinal('25/12/2099')  ->  766638
+    ordinal_hoje()                   ->  ordinal da data atual
+================================================================================
+"""
+
+from datetime import date, datetime
+
+# Formato de data usado em todo o sistema (prazo e início de 'criacao')
+FORMATO_DATA = '%d/%m/%Y'
+
+# Formato da data/hora de criação das tarefas
+FORMATO_DATA_HORA = '%d/%m/%Y %H:%M:%S'
+
+SEGUNDOS_POR_DIA = 86400
+
+
+def data_para_ordinal(texto):
+    """
+    Converte uma data 'DD/MM/AAAA' para um número inteiro comparável.
+
+    PARÂMETROS:
+        texto (str): Data no formato DD/MM/AAAA. Se houver hora depois
+                     da data (ex: '13/11/2025 17:48:05'), ela é ignorada.
+
+    RETORNO:
+        int: Ordinal da data (date.toordinal())
+        None: Se o texto for vazio ou estiver em formato inválido
+    """
+    if not texto:
+        return None
+    try:
+        return datetime.strptime(texto[:10], FORMATO_DATA).toordinal()
+    except (ValueError, TypeError):
+        return None
+
+
+def ordinal_para_data(ordinal):
+    """
+    Converte um ordinal de volta para o texto 'DD/MM/AAAA'.
+
+    RETORNO:
+        str: Data formatada, ou '' se o ordinal for None
+    """
+    if ordinal is None:
+        return ''
+    return date.fromordinal(ordinal).strftime(FORMATO_DATA)
+
+
+def data_para_ordinal_exata(texto):
+    """
+    Versão rápida e estrita de data_para_ordinal().
+    
+    Aceita apenas o formato exato 'DD/MM/AAAA' (dois dígitos para dia e
+    mês, quatro para o ano), sem hora. Assim ordinal_para_data() devolve
+    exatamente o mesmo texto, e a conversão não usa strptime().
+    
+    RETORNO:
+        int: Ordinal da data, ou None se o texto não estiver no formato
+    """
+    # Anos antes de 1000 não teriam quatro dígitos na volta (strftime)
+    if (type(texto) is not str or len(texto) != 10 or texto[2] != '/'
+            or texto[5] != '/' or texto[6] == '0'):
+        return None
+    try:
+        return date(int(texto[6:]), int(texto[3:5]), int(texto[:2])).toordinal()
+    except ValueError:
+        return None
+
+
+def data_hora_para_segundos(texto):
+    """
+    Converte 'DD/MM/AAAA HH:MM:SS' (formato exato) em segundos.
+    
+    RETORNO:
+        int: ordinal da data * 86400 + segundos do dia
+        None: Se o texto não estiver exatamente no formato
+    """
+    if (type(texto) is not str or len(texto) != 19 or texto[10] != ' '
+            or texto[13] != ':' or texto[16] != ':'):
+        return None
+    ordinal = data_para_ordinal_exata(texto[:10])
+    if ordinal is None:
+        return None
+    try:
+        horas, minutos, segundos = int(texto[11:13]), int(texto[14:16]), int(texto[17:])
+    except ValueError:
+        return None
+    if not (0 <= horas < 24 and 0 <= minutos < 60 and 0 <= segundos < 60):
+        return None
+    return ordinal * SEGUNDOS_POR_DIA + horas * 3600 + minutos * 60 + segundos
+
+
+def segundos_para_data_hora(segundos):
+    """
+    Converte segundos (ver data_hora_para_segundos) para 'DD/MM/AAAA HH:MM:SS'.
+    """
+    ordinal, resto = divmod(segundos, SEGUNDOS_POR_DIA)
+    horas, resto = divmod(resto, 3600)
+    minutos, segundos = divmod(resto, 60)
+    return f'{ordinal_para_data(ordinal)} {horas:02d}:{minutos:02d}:{segundos:02d}'
+
+
+def ordinal_hoje():
+    """
+    Retorna o ordinal da data atual.
+
+    USO:
+        Uma tarefa pendente está atrasada quando o ordinal do seu prazo
+        é MENOR que ordinal_hoje() (mesma regra usada em todo o sistema).
+    """
+    return date.today().toordinal()
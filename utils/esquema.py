@@ -0,0 +1,362 @@
+"""
+================================================================================
+MÓDULO: utils/esquema.py
+================================================================================
+DESCRIÇÃO:
+    Versões do FORMATO EM DISCO dos arquivos de dados (data/tarefas.json e
+    data/usuarios.json) e a ferramenta que converte um arquivo de uma
+    versão para outra.
+
+ESQUEMA 1 (original):
+    Uma lista JSON com todos os registros, datas no formato brasileiro:
+        [{"id": 1, "prazo": "25/12/2099", "descrição": "...", ...}, ...]
+
+ESQUEMA 2:
+    JSON Lines: a primeira linha é um cabeçalho com a versão e cada linha
+    seguinte é UM registro, com datas em ISO-8601 e nomes de campo ASCII:
+        {"esquema": 2, "formato": "taskflow"}
+        {"id": 1, "prazo": "2099-12-25", "descricao": "...", ...}
+
+    - prazo:            'DD/MM/AAAA'          -> 'AAAA-MM-DD'
+    - criacao/conclusao: 'DD/MM/AAAA HH:MM:SS' -> 'AAAA-MM-DDTHH:MM:SS'
+    - 'descrição'        -> 'descricao'
+    Um registro por linha permite ler e gravar o arquivo em streaming
+    (sem localizar o fim de cada objeto dentro de uma lista gigante) e as
+    datas ISO podem ser comparadas e ordenadas como texto por outras
+    ferramentas.
+
+COMPATIBILIDADE:
+    Em memória os registros continuam no formato do esquema 1 (é o que o
+    resto do sistema usa): utils/arquivos.py reconhece a versão de cada
+    arquivo pelo primeiro caractere ('[' = 1, '{' = 2), converte na
+    leitura e, ao regravar, mantém a versão que o arquivo já tinha.
+    Assim os dois formatos funcionam durante a migração. O journal
+    ('<arquivo>.journal') guarda as operações no formato em memória, em
+    qualquer versão.
+
+USO (linha de comando):
+    python -m utils.esquema migrar                 (usuários e tarefas -> 2)
+    python -m utils.esquema migrar data/tarefas.json
+    python -m utils.esquema reverter data/tarefas.json   (volta para 1)
+    python -m utils.esquema versao data/tarefas.json
+
+    A conversão lê e grava um registro por vez (memória constante),
+    aplica o journal ao snapshot e troca o arquivo por os.replace().
+================================================================================
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+ESQUEMA_1 = 1
+ESQUEMA_2 = 2
+
+# Versão mais recente, usada por padrão na migração
+ESQUEMA_ATUAL = ESQUEMA_2
+
+# Nome do formato gravado no cabeçalho do esquema 2
+FORMATO = 'taskflow'
+
+# Campos renomeados no esquema 2: nome no esquema 1 -> nome no esquema 2
+CAMPOS_RENOMEADOS = {'descrição': 'descricao'}
+_CAMPOS_ORIGINAIS = {novo: antigo for antigo, novo in CAMPOS_RENOMEADOS.items()}
+
+# Campos de data ('DD/MM/AAAA') e de data/hora ('DD/MM/AAAA HH:MM:SS')
+CAMPOS_DATA = ('prazo',)
+CAMPOS_DATA_HORA = ('criacao', 'conclusao')
+
+_DIGITOS = frozenset('0123456789')
+
+
+def _so_digitos(texto, posicoes):
+    """True se os caracteres do texto nas posições dadas forem dígitos."""
+    return all(texto[i] in _DIGITOS for i in posicoes)
+
+
+def data_para_iso(texto):
+    """
+    Converte 'DD/MM/AAAA' em 'AAAA-MM-DD'.
+
+    RETORNO:
+        str: A data em ISO-8601, ou o próprio valor se ele não estiver
+             exatamente no formato brasileiro (nada se perde)
+    """
+    if (isinstance(texto, str) and len(texto) == 10 and texto[2] == '/'
+            and texto[5] == '/' and _so_digitos(texto, (0, 1, 3, 4, 6, 7, 8, 9))):
+        return f'{texto[6:10]}-{texto[3:5]}-{texto[0:2]}'
+    return texto
+
+
+def iso_para_data(texto):
+    """Converte 'AAAA-MM-DD' em 'DD/MM/AAAA' (o inverso de data_para_iso())."""
+    if (isinstance(texto, str) and len(texto) == 10 and texto[4] == '-'
+            and texto[7] == '-' and _so_digitos(texto, (0, 1, 2, 3, 5, 6, 8, 9))):
+        return f'{texto[8:10]}/{texto[5:7]}/{texto[0:4]}'
+    return texto
+
+
+def data_hora_para_iso(texto):
+    """Converte 'DD/MM/AAAA HH:MM:SS' em 'AAAA-MM-DDTHH:MM:SS'."""
+    if isinstance(texto, str) and len(texto) == 19 and texto[10] == ' ':
+        data = data_para_iso(texto[:10])
+        if data != texto[:10]:
+            return f'{data}T{texto[11:]}'
+    return texto
+
+
+def iso_para_data_hora(texto):
+    """Converte 'AAAA-MM-DDTHH:MM:SS' em 'DD/MM/AAAA HH:MM:SS'."""
+    if isinstance(texto, str) and len(texto) == 19 and texto[10] == 'T':
+        data = iso_para_data(texto[:10])
+        if data != texto[:10]:
+            return f'{data} {texto[11:]}'
+    return texto
+
+
+def para_v2(registro):
+    """
+    Converte um registro do formato em memória (esquema 1) para o esquema 2.
+
+    PARÂMETROS:
+        registro (Mapping): dict ou Registro (utils/modelos.py)
+
+    RETORNO:
+        dict: Novo dicionário (o registro original não é alterado)
+    """
+    convertido = {}
+    for chave, valor in registro.items():
+        if chave in CAMPOS_DATA:
+            valor = data_para_iso(valor)
+        elif chave in CAMPOS_DATA_HORA:
+            valor = data_hora_para_iso(valor)
+        convertido[CAMPOS_RENOMEADOS.get(chave, chave)] = valor
+    return convertido
+
+
+def de_v2(registro):
+    """
+    Converte um registro do esquema 2 para o formato em memória.
+
+    OBSERVAÇÃO:
+        para_v2() e de_v2() são inversas: datas fora do formato padrão
+        passam sem conversão nos dois sentidos. (As telas só aceitam
+        prazos 'DD/MM/AAAA', então um prazo já em ISO no esquema 1 não
+        acontece na prática.)
+    """
+    convertido = {}
+    for chave, valor in registro.items():
+        chave = _CAMPOS_ORIGINAIS.get(chave, chave)
+        if chave in CAMPOS_DATA:
+            valor = iso_para_data(valor)
+        elif chave in CAMPOS_DATA_HORA:
+            valor = iso_para_data_hora(valor)
+        convertido[chave] = valor
+    return convertido
+
+
+def cabecalho(versao=ESQUEMA_2):
+    """Primeira linha de um arquivo no esquema 2 (com o '\\n' final)."""
+    return json.dumps({'esquema': versao, 'formato': FORMATO}) + '\n'
+
+
+def versao_do_cabecalho(linha):
+    """
+    Lê a versão na linha de cabeçalho de um arquivo JSON Lines.
+
+    ERROS:
+        ValueError: Cabeçalho inválido ou versão que este código não conhece
+                    (ex: arquivo gravado por uma versão mais nova do sistema)
+    """
+    cabecalho_lido = json.loads(linha)
+    if not isinstance(cabecalho_lido, dict) or 'esquema' not in cabecalho_lido:
+        raise ValueError('Arquivo sem cabeçalho de esquema')
+    versao = cabecalho_lido['esquema']
+    if versao != ESQUEMA_2:
+        raise ValueError(f'Esquema {versao} não suportado (esperado: {ESQUEMA_2})')
+    return versao
+
+
+def versao_do_arquivo(caminho_arquivo):
+    """
+    Descobre a versão do esquema de um arquivo de dados.
+
+    RETORNO:
+        int: ESQUEMA_1 ou ESQUEMA_2
+        None: Arquivo ausente, vazio ou ilegível (inclusive um snapshot
+              binário .tfb, que não é JSON)
+    """
+    try:
+        f = open(caminho_arquivo, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        return None
+    with f:
+        # Lê só o começo: no esquema 1 compacto o arquivo é UMA linha
+        try:
+            inicio = f.read(1)
+            while inicio.isspace():
+                inicio = f.read(1)
+        except UnicodeDecodeError:
+            return None
+        if inicio == '[':
+            return ESQUEMA_1
+        if inicio == '{':
+            try:
+                return versao_do_cabecalho(inicio + f.readline())
+            except ValueError:
+                return None
+    return None
+
+
+def iterar_v2(linhas):
+    """
+    Gera os registros (formato em memória) de um arquivo no esquema 2.
+
+    PARÂMETROS:
+        linhas (iterável de str): Linhas do arquivo, começando pelo
+                                  cabeçalho (ex: o próprio arquivo aberto)
+
+    ERROS:
+        ValueError: Cabeçalho inválido ou versão desconhecida
+        json.JSONDecodeError: Linha de registro corrompida (é subclasse de
+                              ValueError; quem lê decide se ignora)
+    """
+    linhas = iter(linhas)
+    for linha in linhas:
+        if linha.strip():
+            versao_do_cabecalho(linha)
+            break
+    else:
+        return
+    for linha in linhas:
+        if linha.strip():
+            yield de_v2(json.loads(linha))
+
+
+def linhas_v2(registros):
+    """
+    Gera as linhas de um arquivo no esquema 2 (cabeçalho + registros).
+
+    PARÂMETROS:
+        registros (iterável): Registros no formato em memória
+    """
+    yield cabecalho()
+    for registro in registros:
+        yield json.dumps(para_v2(registro), ensure_ascii=False,
+                         separators=(',', ':')) + '\n'
+
+
+def linhas_v1(registros, compacto=False):
+    """
+    Gera o texto de um arquivo no esquema 1 (lista JSON) em partes.
+
+    RETORNO:
+        generator: Partes que, concatenadas, formam o mesmo JSON de
+                   json.dump() com indent=4 (ou compacto)
+    """
+    from utils.modelos import para_json
+    separador = ',' if compacto else ',\n'
+    primeiro = True
+    for registro in registros:
+        if compacto:
+            texto = json.dumps(registro, ensure_ascii=False, separators=(',', ':'),
+                               default=para_json)
+        else:
+            texto = json.dumps(registro, ensure_ascii=False, indent=4, default=para_json)
+            texto = '    ' + texto.replace('\n', '\n    ')
+        if primeiro:
+            yield '[' if compacto else '[\n'
+            primeiro = False
+        else:
+            yield separador
+        yield texto
+    if primeiro:
+        yield '[]'
+    else:
+        yield ']' if compacto else '\n]'
+
+
+def migrar_arquivo(caminho_arquivo, versao=ESQUEMA_ATUAL):
+    """
+    Regrava um arquivo de dados (snapshot + journal) na versão pedida.
+
+    PARÂMETROS:
+        caminho_arquivo (str): Arquivo JSON de dados (ex: data/tarefas.json)
+        versao (int): ESQUEMA_2 (migrar) ou ESQUEMA_1 (reverter)
+
+    RETORNO:
+        int: Quantidade de registros gravados
+
+    FUNCIONAMENTO:
+        1. Trava o arquivo para escrita (ninguém altera durante a conversão)
+        2. Lê os registros em streaming (snapshot + journal) e grava cada
+           um, já convertido, em um arquivo temporário na mesma pasta
+        3. fsync + os.replace(): quem lê vê o arquivo antigo ou o novo,
+           nunca um pela metade; só então o journal é esvaziado
+
+    DESEMPENHO:
+        Memória constante: nenhum momento guarda a lista inteira (só as
+        operações do journal, que a compactação mantém pequeno).
+
+    ERROS:
+        ValueError: Versão desconhecida
+    """
+    if versao not in (ESQUEMA_1, ESQUEMA_2):
+        raise ValueError(f'Esquema {versao} não suportado')
+    # Importação tardia: utils.arquivos importa este módulo
+    from utils import arquivos
+
+    quantidade = 0
+
+    def contar(registros):
+        nonlocal quantidade
+        for registro in registros:
+            quantidade += 1
+            yield registro
+
+    with arquivos.transacao(caminho_arquivo):
+        if not (os.path.exists(caminho_arquivo)
+                or os.path.exists(caminho_arquivo + arquivos.SUFIXO_JOURNAL)):
+            return 0
+        registros = contar(arquivos.iterar_arquivo_json(caminho_arquivo))
+        if versao == ESQUEMA_2:
+            partes = linhas_v2(registros)
+        else:
+            partes = linhas_v1(registros, arquivos.FORMATO_SNAPSHOT == 'compacto')
+
+        arquivos.garantir_diretorio(caminho_arquivo)
+        diretorio = os.path.dirname(caminho_arquivo) or '.'
+        descritor, temporario = tempfile.mkstemp(dir=diretorio, suffix='.tmp')
+        try:
+            with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+                for parte in partes:
+                    f.write(parte)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporario, caminho_arquivo)
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+        # O journal já está aplicado no snapshot novo
+        if os.path.exists(caminho_arquivo + arquivos.SUFIXO_JOURNAL):
+            open(caminho_arquivo + arquivos.SUFIXO_JOURNAL, 'w').close()
+        arquivos.invalidar_cache(caminho_arquivo)
+    return quantidade
+
+
+if __name__ == '__main__':
+    from utils.arquivos import ARQUIVO_TAREFAS, ARQUIVO_USUARIOS
+
+    comandos = {'migrar': ESQUEMA_2, 'reverter': ESQUEMA_1, 'versao': None}
+    if len(sys.argv) < 2 or sys.argv[1] not in comandos:
+        print("Uso: python -m utils.esquema migrar|reverter|versao [arquivo ...]")
+        sys.exit(1)
+    caminhos = sys.argv[2:] or [ARQUIVO_USUARIOS, ARQUIVO_TAREFAS]
+    for caminho in caminhos:
+        if comandos[sys.argv[1]] is None:
+            print(f"{caminho}: esquema {versao_do_arquivo(caminho) or '-'}")
+            continue
+        quantidade = migrar_arquivo(caminho, comandos[sys.argv[1]])
+        print(f"✓ {caminho}: {quantidade} registro(s) no esquema {comandos[sys.argv[1]]}")
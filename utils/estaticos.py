@@ -0,0 +1,217 @@
+"""
+================================================================================
+MÓDULO: utils/estaticos.py
+================================================================================
+DESCRIÇÃO:
+    Arquivos estáticos (CSS, JavaScript) com NOME VERSIONADO e versão
+    comprimida (gzip) pronta, sem etapa de build: tudo é preparado em
+    memória quando o servidor inicia.
+
+NOME VERSIONADO:
+    'style.css' -> 'style.3f2a9c1b0d.css' (hash do conteúdo). Como o nome
+    muda sempre que o conteúdo muda, o navegador pode guardar o arquivo
+    "para sempre" (CACHE_IMUTAVEL) e nunca mais perguntar ao servidor: uma
+    nova versão do arquivo chega com outro nome, pelo HTML.
+
+GZIP:
+    Os tipos de TIPOS_COMPRIMIVEIS são comprimidos uma única vez (nível
+    máximo, já que não é por requisição) e a versão comprimida é enviada a
+    quem aceitar gzip. Se a compressão não diminuir o arquivo, não é usada.
+
+ALTERAÇÕES COM O SERVIDOR RODANDO:
+    nome_versionado() e obter_estatico() conferem a assinatura do arquivo
+    (mtime e tamanho, como em utils/arquivos.py) e preparam de novo o que
+    mudou. O nome versionado antigo deixa de existir (404): ele só pode
+    significar o conteúdo antigo.
+
+USO (ver app.py):
+    carregar_estaticos('static')
+    nome_versionado('static', 'style.css')       -> 'style.3f2a9c1b0d.css'
+    obter_estatico('static', 'style.3f2a9c1b0d.css')
+        -> {'conteudo', 'gzip', 'tipo', 'etag', 'modificacao', 'versionado'}
+================================================================================
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+# Extensões comprimidas com gzip (imagens e fontes já são comprimidas)
+TIPOS_COMPRIMIVEIS = ('.css', '.js', '.html', '.svg', '.json', '.txt')
+
+# Cache-Control dos nomes versionados: 1 ano, sem revalidar
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+
+# Caracteres do hash no nome versionado
+TAMANHO_HASH = 10
+
+# Caminho do arquivo original -> arquivo preparado (ver _preparar())
+_ARQUIVOS = {}
+
+# Caminho versionado -> caminho do arquivo original
+_VERSIONADOS = {}
+
+_MUTEX = threading.Lock()
+
+
+def _assinatura(caminho):
+    """(mtime, tamanho) do arquivo, ou None se ele não existe."""
+    try:
+        st = os.stat(caminho)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _caminho_seguro(pasta, nome):
+    """
+    Caminho de 'nome' dentro de 'pasta', ou None se 'nome' sair dela
+    (ex: '../app.py'): o nome vem da URL.
+    """
+    pasta = os.path.abspath(pasta)
+    caminho = os.path.normpath(os.path.join(pasta, nome))
+    if not caminho.startswith(pasta + os.sep):
+        return None
+    return caminho
+
+
+def _original(caminho):
+    """
+    'pasta/style.3f2a9c1b0d.css' -> 'pasta/style.css' (None se o nome não
+    tem o formato versionado). Para nomes que este processo ainda não
+    preparou (ex: arquivo criado depois que o servidor iniciou).
+    """
+    base, extensao = os.path.splitext(caminho)
+    base, digital = os.path.splitext(base)
+    if len(digital) != TAMANHO_HASH + 1 or any(c not in '0123456789abcdef' for c in digital[1:]):
+        return None
+    return base + extensao
+
+
+def _preparar(caminho, assinatura):
+    """
+    Lê o arquivo e prepara tudo o que as requisições vão usar.
+
+    RETORNO:
+        dict: {'conteudo': bytes, 'gzip': bytes ou None, 'tipo': tipo MIME,
+               'etag': hash do conteúdo, 'modificacao': timestamp,
+               'versionado': caminho com o hash no nome,
+               'assinatura': ver _assinatura()}
+    """
+    with open(caminho, 'rb') as f:
+        conteudo = f.read()
+    digital = hashlib.sha256(conteudo).hexdigest()
+    base, extensao = os.path.splitext(caminho)
+    comprimido = None
+    if extensao.lower() in TIPOS_COMPRIMIVEIS:
+        # mtime=0: o mesmo conteúdo gera sempre os mesmos bytes
+        comprimido = gzip.compress(conteudo, compresslevel=9, mtime=0)
+        if len(comprimido) >= len(conteudo):
+            comprimido = None
+    return {
+        'conteudo': conteudo,
+        'gzip': comprimido,
+        'tipo': mimetypes.guess_type(caminho)[0] or 'application/octet-stream',
+        'etag': digital[:32],
+        'modificacao': assinatura[0] / 1e9,
+        'versionado': f'{base}.{digital[:TAMANHO_HASH]}{extensao}',
+        'assinatura': assinatura,
+    }
+
+
+def _arquivo(caminho):
+    """
+    Arquivo preparado, conferindo se mudou no disco.
+
+    RETORNO:
+        dict: Ver _preparar()
+        None: O arquivo não existe
+    """
+    assinatura = _assinatura(caminho)
+    arquivo = _ARQUIVOS.get(caminho)
+    if arquivo is not None and arquivo['assinatura'] == assinatura:
+        return arquivo
+    with _MUTEX:
+        arquivo = _ARQUIVOS.get(caminho)
+        if arquivo is not None:
+            if arquivo['assinatura'] == assinatura:
+                return arquivo
+            del _ARQUIVOS[caminho]
+            _VERSIONADOS.pop(arquivo['versionado'], None)
+        if assinatura is None or not os.path.isfile(caminho):
+            return None
+        arquivo = _preparar(caminho, assinatura)
+        _ARQUIVOS[caminho] = arquivo
+        _VERSIONADOS[arquivo['versionado']] = caminho
+        return arquivo
+
+
+def carregar_estaticos(pasta):
+    """
+    Prepara todos os arquivos da pasta (e subpastas) de uma vez.
+
+    PARÂMETROS:
+        pasta (str): Pasta dos arquivos estáticos
+
+    RETORNO:
+        int: Quantidade de arquivos preparados
+
+    OBSERVAÇÃO:
+        Chamada ao iniciar o servidor, para que nenhuma requisição pague a
+        leitura e a compressão. Arquivos criados depois são preparados na
+        primeira vez que forem pedidos.
+    """
+    quantidade = 0
+    for diretorio, _, nomes in os.walk(os.path.abspath(pasta)):
+        for nome in nomes:
+            if _arquivo(os.path.join(diretorio, nome)) is not None:
+                quantidade += 1
+    return quantidade
+
+
+def nome_versionado(pasta, nome):
+    """
+    Nome com o hash do conteúdo, para montar URLs.
+
+    PARÂMETROS:
+        pasta (str): Pasta dos arquivos estáticos
+        nome (str): Nome dentro da pasta (ex: 'style.css', 'img/logo.svg')
+
+    RETORNO:
+        str: Ex: 'style.3f2a9c1b0d.css'; o próprio 'nome' se o arquivo não
+             existir (a URL continua funcionando como antes: 404)
+    """
+    caminho = _caminho_seguro(pasta, nome)
+    arquivo = _arquivo(caminho) if caminho else None
+    if arquivo is None:
+        return nome
+    return os.path.relpath(arquivo['versionado'], os.path.abspath(pasta)).replace(os.sep, '/')
+
+
+def obter_estatico(pasta, nome):
+    """
+    Arquivo pedido por uma URL, pelo nome versionado ou pelo original.
+
+    RETORNO:
+        dict: Ver _preparar(), com 'versionado' = True se o nome pedido é
+              o versionado (pode ser guardado com CACHE_IMUTAVEL)
+        None: Arquivo inexistente, fora da pasta ou versão antiga
+    """
+    caminho = _caminho_seguro(pasta, nome)
+    if caminho is None:
+        return None
+    original = _VERSIONADOS.get(caminho)
+    if original is None and not os.path.isfile(caminho):
+        original = _original(caminho)
+    if original is not None:
+        arquivo = _arquivo(original)
+        if arquivo is None or arquivo['versionado'] != caminho:
+            # Mudou no disco: este nome era da versão anterior
+            return None
+        return dict(arquivo, versionado=True)
+    arquivo = _arquivo(caminho)
+    if arquivo is None:
+        return None
+    return dict(arquivo, versionado=False)
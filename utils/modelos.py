@@ -0,0 +1,200 @@
+"""
+================================================================================
+MÓDULO: utils/modelos.py
+================================================================================
+DESCRIÇÃO:
+    Classes COMPACTAS para os registros mantidos em memória (tarefas e
+    usuários), usadas no lugar de dicionários.
+
+VANTAGENS:
+    - __slots__: cada registro guarda apenas os seus valores, sem o
+      dicionário interno de um objeto comum (bem menos memória por tarefa)
+    - Datas convertidas UMA vez, na leitura: o prazo fica como ordinal
+      (tarefa.prazo_ordinal) e a criação como segundos
+      (tarefa.criacao_segundos), prontos para comparar e ordenar sem
+      chamar datetime.strptime() de novo
+
+COMPATIBILIDADE COM DICIONÁRIOS:
+    Os registros se comportam como um dicionário somente leitura:
+        tarefa['prazo']        -> '25/12/2099' (texto, como no arquivo)
+        tarefa.get('status')   -> 'Pendente'
+        dict(tarefa)           -> dicionário completo
+        {**tarefa, 'status': 'Concluída'}
+    Nos templates, {{ tarefa.prazo }} também devolve o texto.
+    Para gravar em JSON use para_dict() ou json.dumps(..., default=para_json).
+
+CAMPOS DESCONHECIDOS:
+    Campos que a classe não conhece (ou datas fora do formato padrão) são
+    guardados como vieram, para que nada se perca ao regravar o arquivo.
+================================================================================
+"""
+
+from collections.abc import Mapping
+
+from utils.datas import (
+    data_para_ordinal, data_para_ordinal_exata, ordinal_para_data,
+    data_hora_para_segundos, segundos_para_data_hora
+)
+
+
+class Registro(Mapping):
+    """
+    Base dos registros: um "dicionário somente leitura" com __slots__.
+
+    As subclasses definem CAMPOS: tuplas (chave, atributo, para_valor,
+    para_texto). para_valor converte o texto do arquivo no valor guardado
+    e para_texto faz o caminho inverso (None = guarda o valor como veio).
+    """
+
+    __slots__ = ('_extras',)
+
+    CAMPOS = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Índice chave -> (atributo, para_valor, para_texto) para acesso O(1)
+        cls._POR_CHAVE = {chave: (atributo, para_valor, para_texto)
+                          for chave, atributo, para_valor, para_texto in cls.CAMPOS}
+
+    def __init__(self, dados):
+        extras = None
+        por_chave = self._POR_CHAVE
+        for chave, valor in dados.items():
+            campo = por_chave.get(chave)
+            if campo is not None:
+                atributo, para_valor, _ = campo
+                if para_valor is None or valor is None:
+                    setattr(self, atributo, valor)
+                    continue
+                convertido = para_valor(valor)
+                if convertido is not None:
+                    setattr(self, atributo, convertido)
+                    continue
+            # Campo desconhecido ou valor fora do formato: guarda como veio
+            if extras is None:
+                extras = {}
+            extras[chave] = valor
+        self._extras = extras
+
+    def __getitem__(self, chave):
+        campo = self._POR_CHAVE.get(chave)
+        if campo is not None:
+            atributo, _, para_texto = campo
+            try:
+                valor = getattr(self, atributo)
+            except AttributeError:
+                pass
+            else:
+                if para_texto is None or valor is None:
+                    return valor
+                return para_texto(valor)
+        if self._extras is not None and chave in self._extras:
+            return self._extras[chave]
+        raise KeyError(chave)
+
+    def __iter__(self):
+        for chave, atributo, _, _ in self.CAMPOS:
+            if hasattr(self, atributo):
+                yield chave
+        if self._extras is not None:
+            yield from self._extras
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.para_dict()!r})'
+
+    def chave_ordenacao(self, chave):
+        """
+        Valor do campo pronto para ORDENAR registros.
+        
+        RETORNO:
+            - Datas: o número já convertido (ordinal / segundos); 0 se a
+              data estiver ausente ou fora do formato
+            - Textos: o texto sem diferença de maiúsculas/minúsculas
+              (casefold); '' se ausente
+        """
+        atributo, _, para_texto = self._POR_CHAVE[chave]
+        valor = getattr(self, atributo, None)
+        if para_texto is not None:
+            return valor if valor is not None else 0
+        return valor.casefold() if isinstance(valor, str) else ''
+
+    def para_dict(self):
+        """
+        Converte o registro de volta para o dicionário gravado no arquivo.
+
+        RETORNO:
+            dict: Campos na ordem padrão, com as datas em texto
+        """
+        return {chave: self[chave] for chave in self}
+
+
+class Tarefa(Registro):
+    """
+    Tarefa em memória.
+
+    ATRIBUTOS:
+        id, titulo, descricao, responsavel_id, responsavel_nome, status
+        prazo_ordinal (int): Prazo como ordinal (ver utils/datas.py)
+        criacao_segundos (int): Data/hora de criação em segundos
+        conclusao_segundos (int): Data/hora de conclusão em segundos
+                                  (ausente se não concluída, ou concluída
+                                  antes de a data passar a ser gravada)
+    """
+
+    __slots__ = ('id', 'titulo', 'descricao', 'responsavel_id', 'responsavel_nome',
+                 'prazo_ordinal', 'status', 'criacao_segundos', 'conclusao_segundos')
+
+    CAMPOS = (
+        ('id', 'id', None, None),
+        ('titulo', 'titulo', None, None),
+        ('descrição', 'descricao', None, None),
+        ('responsavel_id', 'responsavel_id', None, None),
+        ('responsavel_nome', 'responsavel_nome', None, None),
+        ('prazo', 'prazo_ordinal', data_para_ordinal_exata, ordinal_para_data),
+        ('status', 'status', None, None),
+        ('criacao', 'criacao_segundos', data_hora_para_segundos, segundos_para_data_hora),
+        ('conclusao', 'conclusao_segundos', data_hora_para_segundos, segundos_para_data_hora),
+    )
+
+    def prazo_vencido(self, hoje):
+        """
+        Indica se o prazo é anterior ao dia 'hoje' (ordinal).
+
+        OBSERVAÇÃO:
+            Não olha o status; quem chama decide se a tarefa conta como
+            atrasada (apenas pendentes). Prazo inválido nunca vence.
+        """
+        prazo = getattr(self, 'prazo_ordinal', None)
+        if prazo is None:
+            # Prazo fora do formato exato (guardado como texto)
+            prazo = data_para_ordinal(self.get('prazo'))
+        return prazo is not None and prazo < hoje
+
+
+class Usuario(Registro):
+    """Usuário em memória (id, nome, email, login, senha_hash)."""
+
+    __slots__ = ('id', 'nome', 'email', 'login', 'senha_hash')
+
+    CAMPOS = (
+        ('id', 'id', None, None),
+        ('nome', 'nome', None, None),
+        ('email', 'email', None, None),
+        ('login', 'login', None, None),
+        ('senha_hash', 'senha_hash', None, None),
+    )
+
+
+def para_json(objeto):
+    """
+    Função 'default' para json.dump/json.dumps gravarem registros.
+
+    EXEMPLO:
+        json.dumps(tarefas, default=para_json)
+    """
+    if isinstance(objeto, Registro):
+        return objeto.para_dict()
+    raise TypeError(f'Objeto do tipo {type(objeto).__name__} não é serializável em JSON')
@@ -0,0 +1,80 @@
+"""
+================================================================================
+MÓDULO: utils/paginacao.py
+================================================================================
+DESCRIÇÃO:
+    Cursores OPACOS para a paginação por chave (ver
+    arquivos.paginar_registros()).
+
+    O cursor guarda onde a página anterior terminou (ex: o último ID) em
+    um texto curto, seguro para URLs, que o cliente apenas devolve na
+    próxima requisição, sem precisar saber o que há dentro:
+
+        codificar_cursor({'id': 42})   ->  'eyJpZCI6NDJ9'
+        decodificar_cursor('eyJpZCI6NDJ9')  ->  {'id': 42}
+
+ERROS:
+    decodificar_cursor() lança ValueError para textos que não são um
+    cursor válido (ex: alterados à mão pelo cliente).
+================================================================================
+"""
+
+import base64
+import binascii
+import json
+
+# Quantidade de tarefas por página (padrão e máximo aceito da API)
+TAMANHO_PAGINA = 50
+TAMANHO_PAGINA_MAXIMO = 200
+
+
+def codificar_cursor(posicao):
+    """
+    Converte a posição (dicionário pequeno) em um cursor opaco.
+
+    RETORNO:
+        str: Base64 (variante para URLs, sem '=' no final) do JSON compacto
+    """
+    texto = json.dumps(posicao, separators=(',', ':'), sort_keys=True)
+    return base64.urlsafe_b64encode(texto.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """
+    Converte um cursor de volta para a posição.
+
+    RETORNO:
+        dict: A posição gravada por codificar_cursor()
+
+    ERROS:
+        ValueError: Se o cursor não for válido
+    """
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        posicao = json.loads(bruto.decode('utf-8'))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError('Cursor de paginação inválido') from None
+    if not isinstance(posicao, dict):
+        raise ValueError('Cursor de paginação inválido')
+    return posicao
+
+
+def tamanho_da_pagina(texto):
+    """
+    Lê o parâmetro 'limit' da URL, limitado a TAMANHO_PAGINA_MAXIMO.
+
+    RETORNO:
+        int: Tamanho da página (TAMANHO_PAGINA se não informado)
+
+    ERROS:
+        ValueError: Se não for um número inteiro positivo
+    """
+    if texto is None or texto == '':
+        return TAMANHO_PAGINA
+    try:
+        limite = int(texto)
+    except ValueError:
+        raise ValueError('O parâmetro limit deve ser um número inteiro') from None
+    if limite < 1:
+        raise ValueError('O parâmetro limit deve ser maior que zero')
+    return min(limite, TAMANHO_PAGINA_MAXIMO)
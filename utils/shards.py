@@ -0,0 +1,397 @@
+"""
+================================================================================
+MÓDULO: utils/shards.py
+================================================================================
+DESCRIÇÃO:
+    Armazenamento de tarefas DIVIDIDO POR USUÁRIO ("shards").
+    Em vez de um único data/tarefas.json com as tarefas de todos, cada
+    responsável tem o seu próprio arquivo:
+
+        data/tarefas/usuario_1.json     (tarefas do usuário 1)
+        data/tarefas/usuario_2.json     (tarefas do usuário 2)
+        data/tarefas/indice.json        (índice global: ID -> usuário)
+
+    Cada arquivo usa a mesma persistência de utils/arquivos.py (cache em
+    memória, journal, travas e gravação atômica).
+
+VANTAGENS:
+    - O painel de um usuário lê apenas o arquivo dele
+    - Alterações de usuários diferentes travam arquivos diferentes, então
+      não disputam o mesmo arquivo (só inclusões e exclusões passam,
+      rapidamente, pelo índice global)
+
+ATIVAÇÃO:
+    TASKFLOW_ARMAZENAMENTO=shards
+    Para dividir um data/tarefas.json já existente: python -m utils.shards
+================================================================================
+"""
+
+import hashlib
+import heapq
+import os
+import re
+from itertools import islice
+
+from utils import arquivos
+from utils.arquivos import ARQUIVO_TAREFAS
+
+# Arquivo lógico -> campo usado para escolher o shard de cada registro
+CHAVES_SHARD = {
+    ARQUIVO_TAREFAS: 'responsavel_id',
+}
+
+# Nome dos arquivos de shard dentro do diretório (ex: 'usuario_7.json')
+_PADRAO_SHARD = re.compile(r'^usuario_(-?\d+)\.json')
+
+
+def _diretorio(caminho_arquivo):
+    """Diretório dos shards: 'data/tarefas.json' -> 'data/tarefas'."""
+    return os.path.splitext(caminho_arquivo)[0]
+
+
+def _caminho_shard(caminho_arquivo, chave):
+    """
+    Caminho do arquivo de shard de um responsável.
+    
+    OBSERVAÇÃO:
+        O shard usa a mesma classe de registro (arquivos.MODELOS), os mesmos
+        índices (arquivos.INDICES_PRAZO, INDICES_CAMPOS, INDICES_ORDENACAO e
+        INDICES_TEXTO), os mesmos contadores (arquivos.CONTADORES),
+        agregados (arquivos.AGREGADOS) e etiquetas (arquivos.ETIQUETAS) do
+        arquivo lógico: utils/arquivos.py os procura pelo arquivo lógico
+        (ver arquivo_logico()), nada é copiado para o caminho do shard.
+    """
+    return os.path.join(_diretorio(caminho_arquivo), f'usuario_{chave}.json')
+
+
+def arquivo_logico(caminho_arquivo):
+    """
+    Arquivo lógico de um shard: 'data/tarefas/usuario_3.json' -> 'data/tarefas.json'.
+    
+    RETORNO:
+        str: O arquivo lógico, ou None se o caminho não for de um shard
+             (inclusive o índice global, que não segue a configuração
+             das tarefas)
+    
+    USO:
+        arquivos.arquivo_de_configuracao(), ao carregar um arquivo.
+    """
+    diretorio, nome = os.path.split(caminho_arquivo)
+    if not _PADRAO_SHARD.fullmatch(nome):
+        return None
+    for logico in CHAVES_SHARD:
+        if _diretorio(logico) == diretorio:
+            return logico
+    return None
+
+
+def _caminho_indice(caminho_arquivo):
+    """Caminho do índice global ID -> shard."""
+    return os.path.join(_diretorio(caminho_arquivo), 'indice.json')
+
+
+def _shards_existentes(caminho_arquivo):
+    """
+    Lista os caminhos de todos os shards existentes.
+
+    OBSERVAÇÃO:
+        Um shard novo pode existir apenas como journal
+        ('usuario_3.json.journal'), por isso o padrão aceita sufixos.
+    """
+    diretorio = _diretorio(caminho_arquivo)
+    try:
+        nomes = os.listdir(diretorio)
+    except FileNotFoundError:
+        return []
+    chaves = {int(m.group(1)) for m in map(_PADRAO_SHARD.match, nomes) if m}
+    return [_caminho_shard(caminho_arquivo, chave) for chave in sorted(chaves)]
+
+
+def _shard_do_registro(caminho_arquivo, registro_id):
+    """
+    Descobre, pelo índice global, em qual shard está o registro.
+
+    RETORNO:
+        str: Caminho do shard, ou None se o ID não existir
+    """
+    referencia = arquivos.obter_registro(_caminho_indice(caminho_arquivo), registro_id)
+    if referencia is None:
+        return None
+    return _caminho_shard(caminho_arquivo, referencia['shard'])
+
+
+def ler_dados(caminho_arquivo):
+    """
+    Lê as tarefas de TODOS os shards.
+
+    RETORNO:
+        list: Registros de todos os responsáveis, em ordem de ID
+    """
+    dados = []
+    for shard in _shards_existentes(caminho_arquivo):
+        dados.extend(arquivos.ler_dados(shard))
+    dados.sort(key=lambda r: r.get('id') or 0)
+    return dados
+
+
+def iterar_dados(caminho_arquivo):
+    """
+    Gera as tarefas de todos os shards, um shard de cada vez.
+    
+    OBSERVAÇÃO:
+        Diferente de ler_dados(), a ordem é por shard (responsável) e,
+        dentro de cada shard, por ordem de gravação.
+    """
+    for shard in _shards_existentes(caminho_arquivo):
+        yield from arquivos.iterar_dados(shard)
+
+
+def salvar_dados(caminho_arquivo, dados):
+    """
+    Redistribui a lista completa de registros entre os shards.
+
+    FUNCIONAMENTO:
+        1. Agrupa os registros pelo campo de shard (responsável)
+        2. Grava cada grupo no seu arquivo; shards que ficaram sem
+           registros são esvaziados
+        3. Reconstrói o índice global ID -> shard
+
+    RETORNO:
+        bool: True se salvou tudo com sucesso, False se houve erro
+    """
+    campo = CHAVES_SHARD[caminho_arquivo]
+    grupos = {}
+    for registro in dados:
+        grupos.setdefault(registro.get(campo), []).append(registro)
+
+    novos = {_caminho_shard(caminho_arquivo, chave): registros
+             for chave, registros in grupos.items()}
+    indice = _caminho_indice(caminho_arquivo)
+    with arquivos.transacao(indice):
+        ok = True
+        for shard in _shards_existentes(caminho_arquivo):
+            if shard not in novos:
+                ok = arquivos.salvar_dados(shard, []) and ok
+        for shard, registros in novos.items():
+            ok = arquivos.salvar_dados(shard, registros) and ok
+        referencias = [{'id': r.get('id'), 'shard': r.get(campo)} for r in dados]
+        return arquivos.salvar_dados(indice, referencias) and ok
+
+
+def inserir_registro(caminho_arquivo, registro):
+    """
+    Insere o registro no shard do seu responsável.
+
+    ID:
+        O ID é gerado pela sequência do índice global, garantindo que seja
+        único entre todos os shards.
+
+    RETORNO:
+        dict: O registro salvo (com 'id'), ou None se houve erro
+    """
+    chave = registro.get(CHAVES_SHARD[caminho_arquivo])
+    indice = _caminho_indice(caminho_arquivo)
+    with arquivos.transacao(indice):
+        referencia = arquivos.inserir_registro(indice, {'id': registro.get('id'), 'shard': chave})
+        if referencia is None:
+            return None
+        registro = {**registro, 'id': referencia['id']}
+        salvo = arquivos.inserir_registro(_caminho_shard(caminho_arquivo, chave), registro)
+        if salvo is None:
+            arquivos.remover_registro(indice, referencia['id'])
+        return salvo
+
+
+def atualizar_registro(caminho_arquivo, registro_id, campos):
+    """
+    Altera um registro no seu shard (trava apenas o arquivo do responsável).
+
+    TROCA DE RESPONSÁVEL:
+        Se o campo de shard mudar, o registro é movido para o shard do
+        novo responsável e o índice é atualizado.
+
+    RETORNO:
+        bool: True se salvou com sucesso, False se houve erro
+    """
+    shard = _shard_do_registro(caminho_arquivo, registro_id)
+    if shard is None:
+        return True
+    campo = CHAVES_SHARD[caminho_arquivo]
+    atual = arquivos.obter_registro(shard, registro_id)
+    if campo not in campos or atual is None or atual.get(campo) == campos[campo]:
+        return arquivos.atualizar_registro(shard, registro_id, campos)
+
+    indice = _caminho_indice(caminho_arquivo)
+    with arquivos.transacao(indice):
+        novo_shard = _caminho_shard(caminho_arquivo, campos[campo])
+        return (arquivos.inserir_registro(novo_shard, {**atual, **campos}) is not None
+                and arquivos.remover_registro(shard, registro_id)
+                and arquivos.atualizar_registro(indice, registro_id, {'shard': campos[campo]}))
+
+
+def remover_registro(caminho_arquivo, registro_id):
+    """
+    Remove o registro do seu shard e do índice global.
+
+    RETORNO:
+        bool: True se removeu com sucesso, False se houve erro
+    """
+    indice = _caminho_indice(caminho_arquivo)
+    with arquivos.transacao(indice):
+        shard = _shard_do_registro(caminho_arquivo, registro_id)
+        if shard is None:
+            return True
+        return (arquivos.remover_registro(shard, registro_id)
+                and arquivos.remover_registro(indice, registro_id))
+
+
+def obter_registro(caminho_arquivo, registro_id):
+    """
+    Busca um registro pelo ID: índice global -> shard -> registro (O(1)).
+    """
+    shard = _shard_do_registro(caminho_arquivo, registro_id)
+    if shard is None:
+        return None
+    return arquivos.obter_registro(shard, registro_id)
+
+
+def consultar_registros(caminho_arquivo, prazo_antes=None, prazo_desde=None, **iguais):
+    """
+    Busca registros; se o campo de shard for informado, lê só aquele shard.
+
+    EXEMPLO:
+        consultar_registros(ARQUIVO_TAREFAS, responsavel_id=3)
+        -> lê apenas data/tarefas/usuario_3.json
+
+    RETORNO:
+        list: Registros encontrados, em ordem de ID
+    """
+    shards = _shards_da_consulta(caminho_arquivo, iguais)
+    resultado = []
+    for shard in shards:
+        resultado.extend(arquivos.consultar_registros(shard, prazo_antes, prazo_desde, **iguais))
+    if len(shards) > 1:
+        resultado.sort(key=lambda r: r.get('id') or 0)
+    return resultado
+
+
+def contar_registros(caminho_arquivo, grupo):
+    """
+    Contadores de um responsável: lidos só do shard dele.
+    
+    OBSERVAÇÃO:
+        O agrupamento dos contadores (arquivos.CONTADORES) é o mesmo campo
+        que escolhe o shard, então o grupo inteiro está em um único arquivo.
+    """
+    return arquivos.contar_registros(_caminho_shard(caminho_arquivo, grupo), grupo)
+
+
+def agregar_registros(caminho_arquivo, grupo, desde=None, ate=None):
+    """Totais por dia de um responsável: lidos só do shard dele."""
+    return arquivos.agregar_registros(_caminho_shard(caminho_arquivo, grupo), grupo, desde, ate)
+
+
+def versao_dados(caminho_arquivo, grupo=None):
+    """
+    Versão dos dados: do shard do responsável ou, sem ele, a maior entre
+    todos os shards (cada alteração recebe um número maior que todos os
+    anteriores, então a maior muda quando qualquer shard muda).
+    """
+    if grupo is not None:
+        return arquivos.versao_dados(_caminho_shard(caminho_arquivo, grupo))
+    return max((arquivos.versao_dados(shard) for shard in _shards_existentes(caminho_arquivo)),
+               default=0)
+
+
+def etiqueta_dados(caminho_arquivo, grupo=None):
+    """
+    Etiqueta dos dados (ver arquivos.etiqueta_dados()): a do shard do
+    responsável ou, sem ele, um hash das etiquetas de todos os shards.
+    """
+    if grupo is not None:
+        return arquivos.etiqueta_dados(_caminho_shard(caminho_arquivo, grupo), grupo)
+    etiquetas = ','.join(f'{shard}={arquivos.etiqueta_dados(shard)}'
+                         for shard in _shards_existentes(caminho_arquivo))
+    return hashlib.blake2b(etiquetas.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def modificacao_dados(caminho_arquivo, grupo=None):
+    """Última alteração: do shard do responsável ou do mais recente."""
+    if grupo is not None:
+        return arquivos.modificacao_dados(_caminho_shard(caminho_arquivo, grupo))
+    return max((arquivos.modificacao_dados(shard) for shard in _shards_existentes(caminho_arquivo)),
+               default=0.0)
+
+
+def iterar_registros(caminho_arquivo, prazo_antes=None, prazo_desde=None, **iguais):
+    """
+    Versão em streaming de consultar_registros(): percorre os shards um
+    de cada vez (a ordem é por shard, não por ID).
+    """
+    for shard in _shards_da_consulta(caminho_arquivo, iguais):
+        yield from arquivos.iterar_registros(shard, prazo_antes, prazo_desde, **iguais)
+
+
+def paginar_registros(caminho_arquivo, apos=None, limite=50, decrescente=False,
+                      ordenar_por=None, prazo_antes=None, prazo_desde=None, **iguais):
+    """
+    Uma página da consulta (ver arquivos.paginar_registros()).
+    
+    Com o responsável informado, é a página do shard dele. Sem ele, pega
+    uma página de cada shard e intercala pela posição na ordem
+    (heapq.merge), ficando com os 'limite' primeiros.
+    """
+    shards = _shards_da_consulta(caminho_arquivo, iguais)
+    if len(shards) == 1:
+        return arquivos.paginar_registros(shards[0], apos, limite, decrescente, ordenar_por,
+                                          prazo_antes, prazo_desde, **iguais)
+    paginas = [arquivos.paginar_registros(shard, apos, limite + 1, decrescente, ordenar_por,
+                                          prazo_antes, prazo_desde, **iguais)[0]
+               for shard in shards]
+    intercaladas = heapq.merge(*paginas, reverse=decrescente,
+                               key=lambda r: arquivos.posicao_na_ordem(r, ordenar_por))
+    return arquivos.fechar_pagina(list(islice(intercaladas, limite + 1)), limite, ordenar_por)
+
+
+def buscar_registros(caminho_arquivo, consulta, apos=None, limite=50, **iguais):
+    """
+    Busca textual (ver arquivos.buscar_registros()): no shard do
+    responsável, se informado; senão intercala os resultados de todos os
+    shards pela posição [-relevância, ID].
+    """
+    shards = _shards_da_consulta(caminho_arquivo, iguais)
+    if len(shards) == 1:
+        return arquivos.buscar_registros(shards[0], consulta, apos, limite, **iguais)
+    resultados = [arquivos.buscar_com_posicoes(shard, consulta, apos, limite, **iguais)
+                  for shard in shards]
+    pagina = list(islice(heapq.merge(*resultados, key=lambda r: r[0]), limite + 1))
+    return arquivos.fechar_busca(pagina, limite)
+
+
+def _shards_da_consulta(caminho_arquivo, iguais):
+    """Shards que podem ter resultados: só o do responsável, se informado."""
+    campo = CHAVES_SHARD[caminho_arquivo]
+    if campo in iguais:
+        return [_caminho_shard(caminho_arquivo, iguais[campo])]
+    return _shards_existentes(caminho_arquivo)
+
+
+def dividir_arquivo(caminho_arquivo=ARQUIVO_TAREFAS):
+    """
+    Divide um arquivo JSON único existente em shards (uma vez).
+
+    RETORNO:
+        int: Quantidade de registros distribuídos
+
+    OBSERVAÇÃO:
+        O arquivo original não é alterado (serve de backup).
+    """
+    dados = arquivos.ler_arquivo_json(caminho_arquivo)
+    if salvar_dados(caminho_arquivo, dados):
+        return len(dados)
+    return 0
+
+
+if __name__ == '__main__':
+    quantidade = dividir_arquivo()
+    print(f"✓ {quantidade} tarefa(s) distribuída(s) em {_diretorio(ARQUIVO_TAREFAS)}/")